@@ -0,0 +1,200 @@
+# backend/admission.py
+"""Admission control: per route class concurrency limits with bounded,
+prioritised wait queues (per worker).
+
+Every request is put in a class by method and path (`route_class`):
+
+- read        GETs (cached pages, lists, uploads): cheap, generous limits
+- submission  public quote / contact / review form posts
+- upload      portfolio creates and edits (multipart images)
+- auth        bcrypt logins
+- admin       every other write, and the admin API
+
+Health checks, readiness and the live SSE stream are never queued.
+
+A class runs at most `limit` requests at once; the next `queue` requests
+wait for a slot, and anything past that is shed at once with a 503 and
+Retry-After, before the body is read. A request that waits longer than
+ADMISSION_QUEUE_TIMEOUT_SECONDS is shed the same way. Requests with a
+valid admin token are queued ahead of public ones and are never shed for
+a full queue, so the dashboard keeps working through a spike.
+
+`snapshot()` (GET /api/v1/health/admission) reports in-flight and queued
+requests per class, the peak queue depth, admissions, rejections and the
+time spent waiting, to size the limits from real traffic.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.auth import has_admin_token
+from backend.config import settings
+from backend.resilience import _error_response
+
+logger = logging.getLogger(__name__)
+
+ADMIN_PRIORITY = 0
+PUBLIC_PRIORITY = 1
+
+EXEMPT_PATHS = ("/api/v1/health", "/api/v1/ready", "/api/v1/db-check", "/api/v1/live")
+SUBMISSION_PATHS = ("/api/v1/quotes/", "/api/v1/contacts/", "/api/v1/reviews/")
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    """The class of a request, or None when it is never queued"""
+    if path == "/" or path.startswith(EXEMPT_PATHS):
+        return None
+    if method in ("GET", "HEAD", "OPTIONS"):
+        return "read"
+    if path.startswith("/api/v1/auth/login"):
+        return "auth"
+    if path.startswith("/api/v1/portfolio") and method in ("POST", "PUT"):
+        return "upload"
+    if method == "POST" and path in SUBMISSION_PATHS:
+        return "submission"
+    return "admin"
+
+
+class Shed(Exception):
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Limiter:
+    """A concurrency limit with a priority wait queue (lower first, FIFO
+    within a priority). Event loop only; not thread-safe."""
+
+    def __init__(self, name: str, limit: int, queue: int):
+        self.name = name
+        self.limit = limit
+        self.queue = queue
+        self.in_flight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self.admitted = 0
+        self.rejected = {"queue_full": 0, "timeout": 0}
+        self.peak_queued = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self._warned_at = 0.0
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+
+    async def acquire(self, priority: int, timeout: float):
+        if self.in_flight < self.limit and not self.queued:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+        if priority != ADMIN_PRIORITY and self.queued >= self.queue:
+            self.rejected["queue_full"] += 1
+            raise Shed("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), waiter))
+        self.peak_queued = max(self.peak_queued, self.queued)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                waiter.cancel()
+                self.rejected["timeout"] += 1
+                raise Shed("timeout")
+        except asyncio.CancelledError:
+            # Client went away while queued; hand over a slot it was just given
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+            raise
+        waited = time.monotonic() - started
+        self.wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self.admitted += 1  # in_flight was handed over by release()
+
+    def release(self):
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)  # the slot passes straight to the waiter
+                return
+        self.in_flight -= 1
+
+    def should_warn(self) -> bool:
+        """At most one shedding warning per class every 10 seconds"""
+        now = time.monotonic()
+        if now - self._warned_at < 10:
+            return False
+        self._warned_at = now
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "queue": self.queue,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "avg_wait_ms": round(self.wait_seconds / self.admitted * 1000, 2) if self.admitted else 0.0,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+        }
+
+
+def _parse_limits(spec: str) -> Dict[str, Tuple[int, int]]:
+    """"read=64:256,upload=2:4" -> {"read": (64, 256), "upload": (2, 4)}"""
+    limits = {}
+    for item in spec.split(","):
+        name, _, values = item.strip().partition("=")
+        if not name:
+            continue
+        limit, _, queue = values.partition(":")
+        limits[name.strip()] = (int(limit), int(queue or 0))
+    return limits
+
+
+limiters: Dict[str, Limiter] = {
+    name: Limiter(name, limit, queue) for name, (limit, queue) in _parse_limits(settings.ADMISSION_LIMITS).items()
+}
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    return {name: limiter.snapshot() for name, limiter in limiters.items()}
+
+
+class AdmissionMiddleware:
+    """Holds a class slot for the whole request, response body included"""
+
+    def __init__(self, app, queue_timeout: float, retry_after: float):
+        self.app = app
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        limiter = limiters.get(route_class(scope["method"], scope["path"]))
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        priority = ADMIN_PRIORITY if has_admin_token(dict(scope["headers"])) else PUBLIC_PRIORITY
+        try:
+            await limiter.acquire(priority, self.queue_timeout)
+        except Shed as e:
+            if limiter.should_warn():
+                logger.warning(f"⚠️ Shedding {limiter.name} requests ({e.reason}): {limiter.snapshot()}")
+            await _error_response(send, 503, "Server is busy, please retry", retry_after=self.retry_after)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
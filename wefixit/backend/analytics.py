@@ -0,0 +1,224 @@
+# backend/analytics.py
+"""Quote and contact rollups: `python -m backend.analytics recompute [--since YYYY-MM-DD]`
+
+`create_quote` and `create_contact` bump counters in an hourly and a daily
+bucket (naive UTC bucket starts) of the `analytics_rollups` collection:
+
+    {"granularity": "day", "bucket": 2024-05-01T00:00, "quotes": 12,
+     "service_type": {"web_development": 7, ...}, "budget": {"1000-5000": 3, ...},
+     "timeline": {"1_month": 4, ...}, "contacts": 5}
+
+The analytics endpoint reads only these documents, so a dashboard costs
+the same however many quotes there are. Counting happens after the
+submission is stored and never fails it; `recompute` rebuilds every bucket
+from `--since` up to the start of today (hot and archived documents alike)
+to backfill history or repair a missed increment.
+"""
+import argparse
+import asyncio
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from backend.config import settings
+from backend.jobs import job
+from backend.storage import open_storage, close_storage
+from backend.storage.base import Doc
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+
+# ----------------------------
+# Counters
+# ----------------------------
+def key(value) -> str:
+    """A free-text form value as a counter name (no dots or dollars for Mongo)"""
+    text = re.sub(r"[\s.$]+", "_", str(value or "").strip().lower()).strip("_")
+    return text[:64] or "unspecified"
+
+
+def budget_band(value) -> str:
+    """A plain number ("2500", "$2,500") falls in one of ANALYTICS_BUDGET_BANDS;
+    a range or label picked in the form ("1000-5000") is kept as it is"""
+    text = str(value or "").strip()
+    digits = re.sub(r"[\s$,]", "", text)
+    try:
+        amount = float(digits)
+    except ValueError:
+        return key(text)
+    bands = settings.ANALYTICS_BUDGET_BANDS
+    lower = 0
+    for upper in bands:
+        if amount < upper:
+            return f"{lower}-{upper}"
+        lower = upper
+    return f"{lower}+"
+
+
+def quote_counters(quote: Doc) -> Dict[str, int]:
+    return {
+        "quotes": 1,
+        f"service_type.{key(quote.get('serviceType'))}": 1,
+        f"budget.{budget_band(quote.get('budget'))}": 1,
+        f"timeline.{key(quote.get('timeline'))}": 1,
+    }
+
+
+def contact_counters(contact: Doc) -> Dict[str, int]:
+    return {"contacts": 1}
+
+
+def bucket_start(granularity: str, when: datetime) -> datetime:
+    when = when.replace(minute=0, second=0, microsecond=0)
+    return when.replace(hour=0) if granularity == "day" else when
+
+
+def rollup_id(granularity: str, bucket: datetime) -> str:
+    return f"{granularity}:{bucket.isoformat()}"
+
+
+# ----------------------------
+# Incremental updates
+# ----------------------------
+async def _record(storage, counters: Dict[str, int], when: Optional[datetime]):
+    when = when or datetime.utcnow()
+    try:
+        await asyncio.gather(*(
+            storage.rollups.increment(granularity, bucket_start(granularity, when), counters)
+            for granularity in GRANULARITIES
+        ))
+    except Exception as e:  # the submission is already stored; `recompute` catches up
+        logger.error(f"❌ Could not update analytics rollups: {e!r}")
+
+
+async def record_quote(storage, quote: Doc):
+    await _record(storage, quote_counters(quote), quote.get("created_at"))
+
+
+async def record_contact(storage, contact: Doc):
+    await _record(storage, contact_counters(contact), contact.get("created_at"))
+
+
+# ----------------------------
+# Reading
+# ----------------------------
+def merge(into: Doc, counters: Doc):
+    """Adds nested counters (as stored) into `into`"""
+    for name, value in counters.items():
+        if isinstance(value, dict):
+            merge(into.setdefault(name, {}), value)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            into[name] = into.get(name, 0) + value
+
+
+def counters_of(doc: Doc) -> Doc:
+    return {name: value for name, value in doc.items() if name not in ("_id", "granularity", "bucket")}
+
+
+async def report(storage, granularity: str, start: datetime, end: datetime) -> Doc:
+    docs = await storage.rollups.list(granularity, bucket_start(granularity, start), end)
+    totals: Doc = {"quotes": 0, "contacts": 0, "service_type": {}, "budget": {}, "timeline": {}}
+    buckets = []
+    for doc in docs:
+        counters = counters_of(doc)
+        merge(totals, counters)
+        buckets.append({"bucket": doc["bucket"], **counters})
+    return {"granularity": granularity, "start": start, "end": end, "totals": totals, "buckets": buckets}
+
+
+# ----------------------------
+# Recompute / backfill
+# ----------------------------
+async def _hot(storage, collection: str, batch_size: int):
+    after_id = None
+    while True:
+        batch = await storage.migrations.scan(collection, after_id, batch_size)
+        for doc in batch:
+            yield doc
+        if len(batch) < batch_size:
+            return
+        after_id = str(batch[-1]["_id"])
+
+
+async def _archived(repository, batch_size: int):
+    offset = 0
+    while True:
+        batch = await repository.list_archived(limit=batch_size, offset=offset)
+        for doc in batch:
+            yield doc
+        if len(batch) < batch_size:
+            return
+        offset += batch_size
+
+
+def _add(rollups: Dict[str, Doc], when: datetime, counters: Dict[str, int]):
+    for granularity in GRANULARITIES:
+        bucket = bucket_start(granularity, when)
+        doc = rollups.setdefault(
+            rollup_id(granularity, bucket), {"_id": rollup_id(granularity, bucket), "granularity": granularity, "bucket": bucket}
+        )
+        for name, amount in counters.items():
+            target = doc
+            *parents, leaf = name.split(".")
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[leaf] = target.get(leaf, 0) + amount
+
+
+async def recompute(storage, since: datetime, batch_size: int = 500) -> Tuple[int, int]:
+    """Rebuilds the buckets in [since, start of today); returns
+    (documents counted, buckets written). Today is left to the live
+    increments, which would otherwise race with the rebuild."""
+    start, end = bucket_start("day", since), bucket_start("day", datetime.utcnow())
+    rollups: Dict[str, Doc] = {}
+    counted = 0
+    for collection, counters in (("quotes", quote_counters), ("contacts", contact_counters)):
+        repository = getattr(storage, collection)
+        for documents in (_hot(storage, collection, batch_size), _archived(repository, batch_size)):
+            async for doc in documents:
+                when = doc.get("created_at")
+                if isinstance(when, datetime) and start <= when < end:
+                    _add(rollups, when, counters(doc))
+                    counted += 1
+    docs: List[Doc] = sorted(rollups.values(), key=lambda doc: (doc["granularity"], doc["bucket"]))
+    await storage.rollups.replace_range(start, end, docs)
+    return counted, len(docs)
+
+
+@job("analytics.recompute")
+async def recompute_job(payload: Doc):
+    """Nightly (JOB_CRON): rebuild yesterday from the stored documents, so
+    increments lost to an error do not stay missing"""
+    from backend.storage import get_storage
+    since = payload.get("since")
+    if since is None:
+        since = bucket_start("day", datetime.utcnow()) - timedelta(days=1)
+    elif isinstance(since, str):  # enqueued from the CLI or by hand
+        since = datetime.fromisoformat(since)
+    elif not isinstance(since, datetime):
+        raise ValueError(f"since must be an ISO date or datetime, not {type(since).__name__}")
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    await recompute(await get_storage(), since)
+
+
+async def _main(args):
+    since = datetime.fromisoformat(args.since) if args.since else datetime(1970, 1, 1)
+    storage = await open_storage()
+    try:
+        counted, written = await recompute(storage, since, args.batch_size)
+    finally:
+        await close_storage()
+    print(f"📊 Counted {counted} submissions into {written} rollup buckets since {since.date()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Quote and contact analytics rollups")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rebuild = commands.add_parser("recompute", help="rebuild rollups from the stored quotes and contacts")
+    rebuild.add_argument("--since", help="first day to rebuild, YYYY-MM-DD (default: everything)")
+    rebuild.add_argument("--batch-size", type=int, default=500, help="documents per read")
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,128 @@
+# backend/archival.py
+"""Hot/cold archival: `python -m backend.archival [--dry-run]`
+
+Moves handled submissions (read contacts, replied-to quotes) older than
+ARCHIVE_AFTER_DAYS into `<collection>_archive`, so that the hot collections
+and their indexes only hold recent and open work. Works in small batches
+with a pause between them, and backs off while the health monitor reports
+the database as degraded; after ARCHIVE_MAX_WAIT_SECONDS of that the pass
+is given up until the next one. With ARCHIVE_ENABLED the app also runs it
+every ARCHIVE_INTERVAL_SECONDS.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from backend.config import settings
+from backend.health import monitor, OK
+from backend.storage import get_storage, open_storage, close_storage
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED = ("contacts", "quotes")
+
+
+class DatabaseBusy(Exception):
+    pass
+
+
+def _database_healthy() -> bool:
+    # Only the database check: SMTP or disk trouble is no reason to wait.
+    # Outside the app the monitor is not running and there is nothing to go by.
+    if monitor.checked_at is None:
+        return True
+    return monitor.checks.get("database", {}).get("status") == OK
+
+
+async def _wait_until_healthy():
+    deadline = time.monotonic() + settings.ARCHIVE_MAX_WAIT_SECONDS
+    while not _database_healthy():
+        if time.monotonic() >= deadline:
+            raise DatabaseBusy(f"database degraded for over {settings.ARCHIVE_MAX_WAIT_SECONDS:g}s")
+        await asyncio.sleep(settings.HEALTH_CHECK_INTERVAL_SECONDS)
+
+
+async def archive_collection(repository, cutoff: datetime, batch_size: int, pause: float) -> int:
+    moved = 0
+    while True:
+        await _wait_until_healthy()
+        count = await repository.archive_batch(cutoff, batch_size)
+        moved += count
+        if count < batch_size:
+            return moved
+        await asyncio.sleep(pause)  # leave room for live traffic
+
+
+async def run_once(
+    storage,
+    days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    dry_run: bool = False,
+) -> Dict[str, int]:
+    """Archive every eligible document; returns {collection: moved (or eligible on a dry run)}"""
+    days = settings.ARCHIVE_AFTER_DAYS if days is None else days
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    results = {}
+    for name in ARCHIVED:
+        repository = getattr(storage, name)
+        if dry_run:
+            results[name] = await repository.count_archivable(cutoff)
+        else:
+            results[name] = await archive_collection(
+                repository, cutoff, batch_size or settings.ARCHIVE_BATCH_SIZE, settings.ARCHIVE_BATCH_PAUSE_SECONDS
+            )
+    return results
+
+
+class Archiver:
+    """Periodic in-app run (ARCHIVE_ENABLED); a cron'd CLI run works as well"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None and settings.ARCHIVE_ENABLED:
+            self._task = asyncio.create_task(self._run(), name="archiver")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.ARCHIVE_INTERVAL_SECONDS)
+            try:
+                results = await run_once(await get_storage())
+                if any(results.values()):
+                    logger.info(f"🗄️ Archived {results}")
+            except DatabaseBusy as e:
+                logger.warning(f"⚠️ Archival pass skipped: {e}")
+            except Exception as e:  # try again next interval
+                logger.error(f"❌ Archival run failed: {e!r}")
+
+
+archiver = Archiver()
+
+
+async def _main(args):
+    storage = await open_storage()
+    try:
+        results = await run_once(storage, days=args.days, batch_size=args.batch_size, dry_run=args.dry_run)
+    finally:
+        await close_storage()
+    verb = "Would archive" if args.dry_run else "Archived"
+    for name, count in results.items():
+        print(f"🗄️ {verb} {count} {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move handled contacts and quotes to the archive")
+    parser.add_argument("--dry-run", action="store_true", help="only count what would be archived")
+    parser.add_argument("--days", type=int, help=f"age threshold (default ARCHIVE_AFTER_DAYS={settings.ARCHIVE_AFTER_DAYS})")
+    parser.add_argument("--batch-size", type=int, help=f"documents per batch (default {settings.ARCHIVE_BATCH_SIZE})")
+    asyncio.run(_main(parser.parse_args()))
@@ -1,25 +1,35 @@
 ﻿#backend/auth.py
+import secrets
 from datetime import datetime, timedelta, timezone
-from jose import jwt, JWTError
-from passlib.context import CryptContext
+from functools import lru_cache
 from fastapi import HTTPException, status
 from typing import Optional
 
 from .config import settings
-from backend.database import db  # ✅ MongoDB
+from backend.storage import get_storage
+from backend.tracing import span
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# passlib and jose are slow to import; load them on the first login/token
+# check instead of during a cold start
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    with span("auth.hash_password"):
+        return get_pwd_context().hash(password)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+    with span("auth.verify_password"):
+        return get_pwd_context().verify(plain, hashed)
 
 
 def create_access_token(subject: str) -> str:
+    from jose import jwt
     expire = datetime.now(timezone.utc) + timedelta(
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
     )
@@ -27,18 +37,39 @@ def create_access_token(subject: str) -> str:
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
+def create_sse_ticket(subject: str) -> str:
+    """A short-lived JWT the browser can put in an EventSource URL in place
+    of the access token. Redeemed once (see deps.get_current_admin_sse), so
+    a copy in an access log is worthless."""
+    from jose import jwt
+    expire = datetime.now(timezone.utc) + timedelta(seconds=settings.SSE_TICKET_EXPIRE_SECONDS)
+    to_encode = {"sub": subject, "exp": expire, "jti": secrets.token_hex(16), "typ": "sse"}
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
 def decode_token(token: str) -> str:
+    return decode_claims(token)["sub"]
+
+
+def decode_claims(token: str, typ: Optional[str] = None) -> dict:
+    """Verified claims of a token of kind `typ` (None: an access token)"""
+    from jose import jwt, JWTError
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
+        if payload.get("typ") != typ:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+            )
         sub: str = payload.get("sub")
         if sub is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token (no subject)",
             )
-        return sub
+        return payload
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -46,9 +77,23 @@ def decode_token(token: str) -> str:
         )
 
 
-# ✅ MongoDB versions
+def has_admin_token(headers: dict) -> bool:
+    """Whether raw ASGI headers carry a valid admin bearer token (signature
+    and expiry only, no database lookup), for middleware"""
+    scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        decode_token(token)
+    except HTTPException:
+        return False
+    return True
+
+
+# ✅ Storage-backed versions (Mongo or SQLite)
 async def get_admin_by_username(username: str):
-    return await db.admins.find_one({"username": username})
+    storage = await get_storage()
+    return await storage.admins.get_by_username(username)
 
 
 async def authenticate_admin(username: str, password: str):
@@ -1,10 +1,10 @@
 #backend/config.py
 import os
-from typing import List
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
-# Load environment variables from .env
+# Load environment variables from .env (the only place it is read)
 load_dotenv()
 
 class Settings(BaseModel):
@@ -16,12 +16,22 @@ class Settings(BaseModel):
     SECRET_KEY: str = os.getenv("SECRET_KEY", "change-me-super-secret")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+    SSE_TICKET_EXPIRE_SECONDS: int = int(os.getenv("SSE_TICKET_EXPIRE_SECONDS", "30"))  # single-use, for EventSource URLs
 
     # Database (MongoDB)
     MONGO_URI: str = os.getenv("MONGO_URI", "mongodb://localhost:27017")
     MONGO_DB: str = os.getenv("MONGO_DB", "wefixit")
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+    MONGO_CONNECT_TIMEOUT_MS: int = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+    # Per-route read/write profiles (see PROFILES in database.py)
+    MONGO_PUBLIC_READ_PREFERENCE: str = os.getenv("MONGO_PUBLIC_READ_PREFERENCE", "secondaryPreferred")
+    MONGO_PUBLIC_MAX_STALENESS_SECONDS: int = int(os.getenv("MONGO_PUBLIC_MAX_STALENESS_SECONDS", "90"))
+    MONGO_SUBMISSION_WRITE_CONCERN: str = os.getenv("MONGO_SUBMISSION_WRITE_CONCERN", "1")
+    MONGO_ADMIN_WRITE_CONCERN: str = os.getenv("MONGO_ADMIN_WRITE_CONCERN", "majority")
 
-    # Optional: SQLite fallback (if you ever want hybrid or testing db)
+    # Storage backend: "mongo" (default) or "sqlite" (single node / CI, uses DATABASE_URL)
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "mongo").lower()
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./wefixit.db")
 
     # CORS
@@ -33,6 +43,184 @@ class Settings(BaseModel):
     BOOTSTRAP_ADMIN_USERNAME: str = os.getenv("BOOTSTRAP_ADMIN_USERNAME", "admin")
     BOOTSTRAP_ADMIN_PASSWORD: str = os.getenv("BOOTSTRAP_ADMIN_PASSWORD", "admin123")
 
+    # Duplicate-submission suppression (contacts, quotes, reviews)
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", "86400"))
+    IDEMPOTENCY_DEDUP_WINDOW_SECONDS: int = int(os.getenv("IDEMPOTENCY_DEDUP_WINDOW_SECONDS", "120"))
+    IDEMPOTENCY_PENDING_TIMEOUT_SECONDS: int = int(os.getenv("IDEMPOTENCY_PENDING_TIMEOUT_SECONDS", "60"))
+
+    # Response compression (JSON API)
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_ENABLED: bool = os.getenv("COMPRESSION_BROTLI_ENABLED", "true").lower() == "true"
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+    COMPRESSION_CONTENT_TYPES: List[str] = [
+        t.strip() for t in os.getenv("COMPRESSION_CONTENT_TYPES", "application/json").split(",")
+    ]
+
+    # Static uploads
+    UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads")
+    STATIC_CACHE_MAX_AGE: int = int(os.getenv("STATIC_CACHE_MAX_AGE", "31536000"))
+
+    # Production server (python -m backend.server)
+    HOST: str = os.getenv("HOST", "0.0.0.0")
+    PORT: int = int(os.getenv("PORT", "8000"))
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "0"))  # 0 = size from CPU count
+    WEB_MAX_WORKERS: int = int(os.getenv("WEB_MAX_WORKERS", "4"))
+    WEB_TIMEOUT: int = int(os.getenv("WEB_TIMEOUT", "60"))
+    WEB_GRACEFUL_TIMEOUT: int = int(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))
+    WEB_KEEPALIVE: int = int(os.getenv("WEB_KEEPALIVE", "5"))
+    WEB_MAX_REQUESTS: int = int(os.getenv("WEB_MAX_REQUESTS", "5000"))
+    WEB_PRELOAD: bool = os.getenv("WEB_PRELOAD", "true").lower() == "true"
+    OUTBOX_DRAIN_TIMEOUT: float = float(os.getenv("OUTBOX_DRAIN_TIMEOUT", "20"))
+
+    # Email (SMTP relay)
+    SMTP_HOST: str = os.getenv("SMTP_HOST", "smtp.gmail.com")
+    SMTP_PORT: int = int(os.getenv("SMTP_PORT", "465"))
+    SMTP_TIMEOUT_SECONDS: float = float(os.getenv("SMTP_TIMEOUT_SECONDS", "10"))
+    EMAIL_USER: Optional[str] = os.getenv("EMAIL_USER")
+    EMAIL_PASSWORD: Optional[str] = os.getenv("EMAIL_PASSWORD")
+    EMAIL_TO: Optional[str] = os.getenv("EMAIL_TO")
+    EMAIL_FROM_NAME: Optional[str] = os.getenv("EMAIL_FROM_NAME")  # routers have their own defaults
+
+    # Admin notification digest (one summary email per interval / batch)
+    EMAIL_DIGEST_ENABLED: bool = os.getenv("EMAIL_DIGEST_ENABLED", "false").lower() == "true"
+    EMAIL_DIGEST_INTERVAL_SECONDS: float = float(os.getenv("EMAIL_DIGEST_INTERVAL_SECONDS", "900"))
+    EMAIL_DIGEST_MAX_ITEMS: int = int(os.getenv("EMAIL_DIGEST_MAX_ITEMS", "50"))
+    # Quotes for these service types are always emailed right away
+    EMAIL_DIGEST_IMMEDIATE_SERVICE_TYPES: List[str] = [
+        t.strip().lower() for t in os.getenv("EMAIL_DIGEST_IMMEDIATE_SERVICE_TYPES", "").split(",") if t.strip()
+    ]
+
+    # Deadlines and circuit breakers (Mongo, SMTP)
+    REQUEST_DEADLINE_SECONDS: float = float(os.getenv("REQUEST_DEADLINE_SECONDS", "8"))
+    REQUEST_DEADLINE_EXCLUDE_PATHS: List[str] = [
+        p.strip() for p in os.getenv("REQUEST_DEADLINE_EXCLUDE_PATHS", "/api/v1/live").split(",") if p.strip()
+    ]
+    BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+    BREAKER_RESET_SECONDS: float = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+
+    # Admission control: "class=concurrency:queue" per route class, per worker (see admission.py)
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    ADMISSION_LIMITS: str = os.getenv(
+        "ADMISSION_LIMITS", "read=64:256,admin=16:64,submission=8:32,upload=2:8,auth=2:8"
+    )
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "5"))
+    ADMISSION_RETRY_AFTER_SECONDS: float = float(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "2"))
+
+    # Logging: JSON lines (or "text") on stdout through a non-blocking queue (see logs.py)
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json").lower()
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # records beyond this are dropped
+    LOG_DEBUG_SAMPLE_RATE: float = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.01"))
+    LOG_ACCESS: bool = os.getenv("LOG_ACCESS", "true").lower() == "true"  # one record per request
+
+    # Request tracing: "none", "console" (JSON lines on stdout) or "file" (JSON lines in TRACE_FILE)
+    TRACE_EXPORTER: str = os.getenv("TRACE_EXPORTER", "none").lower()
+    TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+    TRACE_FILE: str = os.getenv("TRACE_FILE", "traces.jsonl")
+
+    # Data migrations (python -m backend.migrations)
+    MIGRATION_BATCH_SIZE: int = int(os.getenv("MIGRATION_BATCH_SIZE", "200"))
+    MIGRATION_MAX_OPS_PER_SECOND: float = float(os.getenv("MIGRATION_MAX_OPS_PER_SECOND", "500"))
+    READY_REQUIRES_MIGRATIONS: bool = os.getenv("READY_REQUIRES_MIGRATIONS", "true").lower() == "true"  # else pending ones only degrade /ready
+
+    # Durable background jobs (see jobs.py; `python -m backend.jobs status`)
+    JOBS_ENABLED: bool = os.getenv("JOBS_ENABLED", "false").lower() == "true"  # notification emails go through jobs
+    JOBS_RUN_IN_APP: bool = os.getenv("JOBS_RUN_IN_APP", "true").lower() == "true"  # else `python -m backend.jobs run`
+    JOB_QUEUES: Dict[str, int] = {
+        name.strip(): int(slots)
+        for name, _, slots in (q.partition("=") for q in os.getenv("JOB_QUEUES", "default=2,email=1").split(","))
+        if name.strip()
+    }  # concurrent jobs per queue, per process
+    JOB_LEASE_SECONDS: float = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+    JOB_POLL_INTERVAL_SECONDS: float = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "2"))
+    JOB_TIMEOUT_SECONDS: float = float(os.getenv("JOB_TIMEOUT_SECONDS", "300"))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+    JOB_BACKOFF_BASE_SECONDS: float = float(os.getenv("JOB_BACKOFF_BASE_SECONDS", "10"))
+    JOB_BACKOFF_MAX_SECONDS: float = float(os.getenv("JOB_BACKOFF_MAX_SECONDS", "3600"))
+    JOB_RETENTION_HOURS: float = float(os.getenv("JOB_RETENTION_HOURS", "72"))  # finished jobs
+    JOB_DRAIN_TIMEOUT: float = float(os.getenv("JOB_DRAIN_TIMEOUT", "20"))
+    # "job name=cron expression" entries separated by ";" (UTC)
+    JOB_CRON: Dict[str, str] = {
+        name.strip(): expression.strip()
+        for name, _, expression in (c.partition("=") for c in os.getenv("JOB_CRON", "analytics.recompute=15 0 * * *").split(";"))
+        if name.strip()
+    }
+
+    # Batch multi-get (GET /portfolio/batch, /reviews/batch)
+    BATCH_MAX_IDS: int = int(os.getenv("BATCH_MAX_IDS", "100"))
+
+    # Quote / contact analytics rollups (python -m backend.analytics recompute)
+    ANALYTICS_BUDGET_BANDS: List[int] = sorted(
+        int(b) for b in os.getenv("ANALYTICS_BUDGET_BANDS", "500,1000,5000,10000").split(",") if b.strip()
+    )  # upper bounds for numeric budgets; form labels are counted as they are
+
+    # Static JSON snapshots of public content, served from /uploads/<SNAPSHOT_SUBDIR>/
+    SNAPSHOT_ENABLED: bool = os.getenv("SNAPSHOT_ENABLED", "false").lower() == "true"
+    SNAPSHOT_SUBDIR: str = os.getenv("SNAPSHOT_SUBDIR", "snapshots").strip("/")
+    SNAPSHOT_DEBOUNCE_SECONDS: float = float(os.getenv("SNAPSHOT_DEBOUNCE_SECONDS", "2"))
+    SNAPSHOT_MAX_AGE: int = int(os.getenv("SNAPSHOT_MAX_AGE", "60"))  # not immutable, unlike other uploads
+    SNAPSHOT_MAX_ITEMS: int = int(os.getenv("SNAPSHOT_MAX_ITEMS", "1000"))
+    SNAPSHOT_REFRESH_SECONDS: float = float(os.getenv("SNAPSHOT_REFRESH_SECONDS", "3600"))  # 0: only on admin edits
+
+    # Orphaned upload GC (files a portfolio item owned, deleted a grace period after release)
+    GC_ENABLED: bool = os.getenv("GC_ENABLED", "false").lower() == "true"  # run in the app too
+    GC_GRACE_HOURS: float = float(os.getenv("GC_GRACE_HOURS", "72"))
+    GC_BATCH_SIZE: int = int(os.getenv("GC_BATCH_SIZE", "200"))
+    GC_BATCH_PAUSE_SECONDS: float = float(os.getenv("GC_BATCH_PAUSE_SECONDS", "0.2"))
+    GC_INTERVAL_SECONDS: float = float(os.getenv("GC_INTERVAL_SECONDS", "86400"))
+    GC_EXCLUDE_DIRS: List[str] = [
+        d.strip().strip("/") for d in os.getenv("GC_EXCLUDE_DIRS", "").split(",") if d.strip()
+    ]  # more subdirectories of UPLOAD_DIR to leave alone (SNAPSHOT_SUBDIR always is)
+
+    # Slow-query log with sampled explain plans (Mongo backend)
+    SLOW_QUERY_LOG_ENABLED: bool = os.getenv("SLOW_QUERY_LOG_ENABLED", "true").lower() == "true"
+    SLOW_QUERY_THRESHOLD_MS: float = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", "0.2"))
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS: float = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS", "600"))  # per shape
+    SLOW_QUERY_EXPLAIN_TIMEOUT_SECONDS: float = float(os.getenv("SLOW_QUERY_EXPLAIN_TIMEOUT_SECONDS", "5"))
+    SLOW_QUERY_LOG_SIZE_MB: int = int(os.getenv("SLOW_QUERY_LOG_SIZE_MB", "16"))  # capped collection size
+    SLOW_QUERY_QUEUE_SIZE: int = int(os.getenv("SLOW_QUERY_QUEUE_SIZE", "1000"))
+
+    # On-demand profiling endpoints and per-request profiling header (admins only)
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "true").lower() == "true"
+    PROFILING_HEADER: str = os.getenv("PROFILING_HEADER", "X-Profile")
+    # Each sample walks the stack while holding the GIL, stalling the event loop:
+    # at 1 ms that is a sizeable share of a short request; 10 ms keeps it small
+    PROFILING_REQUEST_INTERVAL_MS: float = float(os.getenv("PROFILING_REQUEST_INTERVAL_MS", "10"))
+    PROFILING_KEEP: int = int(os.getenv("PROFILING_KEEP", "20"))  # request profiles / memory snapshots kept
+
+    # Hot/cold archival of handled contacts (read) and quotes (replied to)
+    ARCHIVE_ENABLED: bool = os.getenv("ARCHIVE_ENABLED", "false").lower() == "true"  # run in the app too
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+    ARCHIVE_BATCH_SIZE: int = int(os.getenv("ARCHIVE_BATCH_SIZE", "200"))
+    ARCHIVE_BATCH_PAUSE_SECONDS: float = float(os.getenv("ARCHIVE_BATCH_PAUSE_SECONDS", "0.5"))
+    ARCHIVE_INTERVAL_SECONDS: float = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "21600"))
+    ARCHIVE_MAX_WAIT_SECONDS: float = float(os.getenv("ARCHIVE_MAX_WAIT_SECONDS", "300"))  # for a degraded database
+
+    # Health monitor (probes are answered from its cached state)
+    HEALTH_CHECK_INTERVAL_SECONDS: float = float(os.getenv("HEALTH_CHECK_INTERVAL_SECONDS", "15"))
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = float(os.getenv("HEALTH_CHECK_TIMEOUT_SECONDS", "3"))
+    HEALTH_DB_DEGRADED_MS: float = float(os.getenv("HEALTH_DB_DEGRADED_MS", "500"))
+    HEALTH_SMTP_CHECK_ENABLED: bool = os.getenv("HEALTH_SMTP_CHECK_ENABLED", "true").lower() == "true"
+    HEALTH_SMTP_INTERVAL_SECONDS: float = float(os.getenv("HEALTH_SMTP_INTERVAL_SECONDS", "300"))
+    HEALTH_DISK_MIN_FREE_MB: int = int(os.getenv("HEALTH_DISK_MIN_FREE_MB", "200"))
+
+    # Aggregated landing page payload (/api/v1/home)
+    HOME_CACHE_TTL_SECONDS: float = float(os.getenv("HOME_CACHE_TTL_SECONDS", "300"))  # bounds staleness across workers
+    HOME_CACHE_MAX_AGE: int = int(os.getenv("HOME_CACHE_MAX_AGE", "60"))  # Cache-Control for browsers/CDN
+    HOME_FEATURED_LIMIT: int = int(os.getenv("HOME_FEATURED_LIMIT", "12"))
+    HOME_REVIEWS_LIMIT: int = int(os.getenv("HOME_REVIEWS_LIMIT", "6"))
+
+    # Live admin dashboard (Server-Sent Events)
+    LIVE_QUEUE_SIZE: int = int(os.getenv("LIVE_QUEUE_SIZE", "100"))
+    LIVE_HEARTBEAT_SECONDS: float = float(os.getenv("LIVE_HEARTBEAT_SECONDS", "15"))
+    LIVE_POLL_INTERVAL_SECONDS: float = float(os.getenv("LIVE_POLL_INTERVAL_SECONDS", "5"))
+    LIVE_RETRY_SECONDS: float = float(os.getenv("LIVE_RETRY_SECONDS", "5"))
+    LIVE_TOKEN_SAVE_INTERVAL_SECONDS: float = float(os.getenv("LIVE_TOKEN_SAVE_INTERVAL_SECONDS", "5"))
+    LIVE_RESUME_WINDOW_SECONDS: float = float(os.getenv("LIVE_RESUME_WINDOW_SECONDS", "300"))  # older positions start from now
+
     class Config:
         case_sensitive = True
 
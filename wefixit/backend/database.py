@@ -1,18 +1,87 @@
 ﻿# backend/database.py
-from motor.motor_asyncio import AsyncIOMotorClient
+from typing import Any, Dict
+
 from .config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+_client = None
+_databases: Dict[str, Any] = {}  # profile name -> Motor database with those options
+
+# ----------------------------
+# Read / write profiles
+# ----------------------------
+# Declarative read preference, staleness bound, read concern and write
+# concern per kind of route. Routers pick one with
+# `storage_profile(<name>)`; anything else uses "default" (driver defaults).
+PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {},
+    # Anonymous public pages: any replica set member within the staleness bound
+    # (requests with an admin token read from the primary instead, see storage_profile)
+    "public": {
+        "read_preference": settings.MONGO_PUBLIC_READ_PREFERENCE,
+        "max_staleness_seconds": settings.MONGO_PUBLIC_MAX_STALENESS_SECONDS,
+        "read_concern": "local",
+    },
+    # Visitor submissions (contacts, quotes, reviews): fast acknowledgement
+    "submission": {
+        "read_preference": "primary",
+        "write_concern": settings.MONGO_SUBMISSION_WRITE_CONCERN,
+    },
+    # Admin dashboard: read your own writes, durable edits
+    "admin": {
+        "read_preference": "primary",
+        "read_concern": "local",
+        "write_concern": settings.MONGO_ADMIN_WRITE_CONCERN,
+    },
+}
+
+
+def profile_options(name: str) -> Dict[str, Any]:
+    """Database.with_options() kwargs for profile `name`"""
+    from pymongo.read_concern import ReadConcern
+    from pymongo.read_preferences import Primary, PrimaryPreferred, Secondary, SecondaryPreferred, Nearest
+    from pymongo.write_concern import WriteConcern
+
+    if name not in PROFILES:
+        raise ValueError(f"Unknown database profile: {name}")
+    spec = PROFILES[name]
+    options: Dict[str, Any] = {}
+    mode = spec.get("read_preference")
+    if mode == "primary":
+        options["read_preference"] = Primary()
+    elif mode:
+        modes = {
+            "primaryPreferred": PrimaryPreferred,
+            "secondary": Secondary,
+            "secondaryPreferred": SecondaryPreferred,
+            "nearest": Nearest,
+        }
+        # Mongo rejects bounds under 90s; 0 / unset means no bound
+        staleness = spec.get("max_staleness_seconds") or 0
+        options["read_preference"] = modes[mode](max_staleness=max(staleness, 90) if staleness > 0 else -1)
+    if spec.get("read_concern"):
+        options["read_concern"] = ReadConcern(spec["read_concern"])
+    if spec.get("write_concern"):
+        w = spec["write_concern"]
+        options["write_concern"] = WriteConcern(w=int(w) if str(w).isdigit() else w)
+    return options
+
+
 def create_client():
+    from motor.motor_asyncio import AsyncIOMotorClient  # not needed on the SQLite backend
+    from backend.mongo_monitoring import listeners
+
+    options = {
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "event_listeners": listeners(),
+    }
+
+    # Motor connects on the first operation; only an SRV URI does a DNS lookup here
     try:
-        # Try the provided URI directly
-        client = AsyncIOMotorClient(settings.MONGO_URI, serverSelectionTimeoutMS=20000)
-        # Trigger connection test
-        client.admin.command("ping")
-        logger.info("✅ Connected to MongoDB using SRV URI")
-        return client
+        return AsyncIOMotorClient(settings.MONGO_URI, **options)
     except Exception as e:
         logger.error(f"❌ SRV URI connection failed: {e}")
 
@@ -21,19 +90,54 @@ def create_client():
             f"mongodb://{settings.MONGO_URI.split('://')[1]}"
             .replace("mongodb+srv://", "mongodb://")
         )
+        logger.info("↪️ Using Standard URI fallback")
+        return AsyncIOMotorClient(standard_uri, **options)
+
+
+def get_client():
+    """Return this process's Mongo client, creating it on first use"""
+    global _client
+    if _client is None:
+        _client = create_client()
+        logger.info("✅ MongoDB client created")
+    return _client
+
+
+def connect():
+    """Create the client for the current worker (called from the app lifespan)"""
+    return get_client()
+
+
+def close():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+        _databases.clear()
+        logger.info("🔌 MongoDB client closed")
+
+
+class _LazyDatabase:
+    """Stand-in for the Motor database so `from backend.database import db`
+    keeps working in routers and scripts without building a client at import
+    time (which would also be shared across forked gunicorn workers)."""
+
+    def __getattr__(self, name):
+        return getattr(get_db(), name)
+
+    def __getitem__(self, name):
+        return get_db()[name]
 
-        try:
-            client = AsyncIOMotorClient(standard_uri, serverSelectionTimeoutMS=20000)
-            client.admin.command("ping")
-            logger.info("✅ Connected to MongoDB using Standard URI fallback")
-            return client
-        except Exception as e2:
-            logger.critical(f"❌ Both SRV and Standard connection failed: {e2}")
-            raise e2
 
-client = create_client()
-db = client[settings.MONGO_DB]
+db = _LazyDatabase()
 
-def get_db():
-    return db
 
+def get_db(profile: str = "default"):
+    """The app database, configured with the read/write options of `profile`"""
+    database = _databases.get(profile)
+    if database is None:
+        database = get_client()[settings.MONGO_DB]
+        if profile != "default":
+            database = database.with_options(**profile_options(profile))
+        _databases[profile] = database
+    return database
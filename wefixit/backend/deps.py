@@ -1,14 +1,18 @@
 ﻿#deps.py
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
-from .auth import decode_token, get_admin_by_username
+from datetime import datetime, timezone
+from .auth import decode_claims, decode_token, get_admin_by_username
 from .config import settings
+from .storage import storage_profile
+from typing import Any, Dict, List, Optional
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
+oauth2_scheme_optional = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_STR}/auth/login", auto_error=False
+)
 
-async def get_current_admin(token: str = Depends(oauth2_scheme)):
-    """Validate JWT and return the admin document from MongoDB"""
-    username = decode_token(token)
+async def _admin_or_401(username: str):
     admin = await get_admin_by_username(username)   # ✅ async Mongo call
     if not admin:
         raise HTTPException(
@@ -16,3 +20,96 @@ async def get_current_admin(token: str = Depends(oauth2_scheme)):
             detail="Admin not found"
         )
     return admin
+
+
+async def get_current_admin(token: str = Depends(oauth2_scheme)):
+    """Validate JWT and return the admin document from MongoDB"""
+    return await _admin_or_401(decode_token(token))
+
+
+async def get_current_admin_sse(
+    token: Optional[str] = Depends(oauth2_scheme_optional),
+    ticket: Optional[str] = Query(None),
+    storage=Depends(storage_profile("admin")),
+):
+    """Like get_current_admin, but also accepts ?ticket= (from POST
+    /events/ticket) because the browser EventSource API cannot send an
+    Authorization header. Tickets expire within seconds and work once:
+    redeeming one records its id in the idempotency store, whose TTL
+    cleanup drops it again after expiry."""
+    if token:
+        return await get_current_admin(token)
+    if not ticket:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    claims = decode_claims(ticket, typ="sse")
+    now = datetime.now(timezone.utc)
+    redeemed = await storage.idempotency.insert({
+        "_id": f"sse-ticket:{claims['jti']}",
+        "status": "completed",
+        "created_at": now,
+        "expires_at": datetime.fromtimestamp(claims["exp"], timezone.utc),
+    })
+    if not redeemed:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Ticket already used",
+        )
+    return await _admin_or_401(claims["sub"])
+
+
+def split_values(values: Optional[List[str]]) -> List[str]:
+    """Values from repeated and/or comma-separated query parameters, order
+    kept, no duplicates"""
+    unique: List[str] = []
+    for value in values or []:
+        for item in value.split(","):
+            item = item.strip()
+            if item and item not in unique:
+                unique.append(item)
+    return unique
+
+
+def batch_ids(ids: List[str] = Query(..., description="?ids=a,b,c or ?ids=a&ids=b")) -> List[str]:
+    """Ids for a batch multi-get: comma-separated and/or repeated, request
+    order kept, duplicates dropped, at most BATCH_MAX_IDS"""
+    unique = split_values(ids)
+    if len(unique) > settings.BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BATCH_MAX_IDS} ids per request",
+        )
+    return unique
+
+
+def batch_fields(values: Optional[List[str]], allowed: List[str]) -> List[str]:
+    """?fields= of a batch multi-get, each one of `allowed`"""
+    fields = split_values(values)
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def batch_result(
+    ids: List[str], docs: List[Dict[str, Any]], fields: List[str], to_out, aliases: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """Items in request order plus the ids that were not found; with
+    `fields`, each item is just its _id and those fields (under their
+    response-model `aliases`, as the full items have them)"""
+    aliases = aliases or {}
+    found = {str(doc["_id"]): doc for doc in docs}
+    items = []
+    for item_id in ids:
+        doc = found.get(item_id)
+        if doc is None:
+            continue
+        if fields:
+            items.append({"_id": item_id, **{aliases.get(field, field): doc.get(field) for field in fields}})
+        else:
+            items.append(to_out(doc))
+    return {"items": items, "missing": [item_id for item_id in ids if item_id not in found]}
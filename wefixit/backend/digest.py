@@ -0,0 +1,83 @@
+# backend/digest.py
+import asyncio
+import logging
+import textwrap
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from backend.config import settings
+from backend.mailer import outbox, send_email
+
+logger = logging.getLogger(__name__)
+
+
+class Digest:
+    """Per-worker buffer of admin notifications (EMAIL_DIGEST_ENABLED).
+
+    Instead of one SMTP session per contact/quote, submissions are collected
+    and sent as a single summary email every EMAIL_DIGEST_INTERVAL_SECONDS,
+    or as soon as EMAIL_DIGEST_MAX_ITEMS are waiting. The summary goes
+    through the outbox like any other notification.
+    """
+
+    def __init__(self):
+        self._items: List[Tuple[str, str]] = []
+        self._since: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self._full: Optional[asyncio.Event] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        if self.running or not settings.EMAIL_DIGEST_ENABLED:
+            return
+        self._full = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="email-digest")
+        logger.info(
+            f"🗂️ Email digest every {settings.EMAIL_DIGEST_INTERVAL_SECONDS:.0f}s "
+            f"or {settings.EMAIL_DIGEST_MAX_ITEMS} submissions"
+        )
+
+    def add(self, subject: str, body: str) -> bool:
+        """Queue one notification; False when digest mode is off and the
+        caller should send it on its own"""
+        if not self.running:
+            return False
+        if not self._items:
+            self._since = datetime.utcnow()
+        self._items.append((subject, body))
+        if len(self._items) >= settings.EMAIL_DIGEST_MAX_ITEMS:
+            self._full.set()
+        return True
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), settings.EMAIL_DIGEST_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            self.flush()
+
+    def flush(self):
+        if not self._items:
+            return
+        items, self._items = self._items, []
+        subject = f"🗂️ {len(items)} new submission{'s' if len(items) != 1 else ''} since {self._since:%H:%M} UTC"
+        sections = [f"{item_subject}\n{textwrap.dedent(item_body).strip()}" for item_subject, item_body in items]
+        body = f"\n\n{'-' * 40}\n\n".join(sections)
+        outbox.submit(send_email, settings.EMAIL_TO, subject, body, settings.EMAIL_FROM_NAME or "WeFixIt Notifications")
+        logger.info(f"🗂️ Digest of {len(items)} submission(s) queued")
+
+    async def stop(self):
+        """Cancel the timer and send whatever is still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.flush()
+
+
+digest = Digest()
@@ -0,0 +1,143 @@
+# backend/health.py
+import asyncio
+import logging
+import shutil
+import time
+from typing import Any, Dict, Optional
+
+from backend import migrations
+from backend.config import settings
+from backend.resilience import breakers, mongo_breaker
+from backend.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+OK = "ok"
+DEGRADED = "degraded"
+DOWN = "down"
+
+
+class HealthMonitor:
+    """Checks dependencies on an interval in the background so that probes
+    are answered from cached state instead of touching the database or SMTP."""
+
+    def __init__(self):
+        self.checks: Dict[str, Dict[str, Any]] = {}
+        self.checked_at: Optional[float] = None
+        self._smtp_checked_at = 0.0
+        self._migrated = False  # once every migration is applied it stays so
+        self._task: Optional[asyncio.Task] = None
+
+    # ----------------------------
+    # Lifecycle
+    # ----------------------------
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="health-monitor")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.check_once()
+            except Exception as e:  # never let the monitor die
+                logger.error(f"❌ Health check failed: {e!r}")
+            await asyncio.sleep(settings.HEALTH_CHECK_INTERVAL_SECONDS)
+
+    async def check_once(self):
+        checks = [self._check_database(), self._check_disk(), self._check_migrations()]
+        smtp_due = time.monotonic() - self._smtp_checked_at >= settings.HEALTH_SMTP_INTERVAL_SECONDS
+        if settings.HEALTH_SMTP_CHECK_ENABLED and smtp_due:
+            checks.append(self._check_smtp())
+        for name, result in await asyncio.gather(*checks):
+            self.checks[name] = result
+        self.checked_at = time.monotonic()
+
+    # ----------------------------
+    # Checks
+    # ----------------------------
+    async def _check_database(self):
+        started = time.perf_counter()
+        try:
+            storage = await get_storage()
+            await asyncio.wait_for(storage.ping(), settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning(f"⚠️ Database health check failed: {e!r}")
+            if settings.STORAGE_BACKEND == "mongo":
+                mongo_breaker.record_failure()
+            return "database", {"status": DOWN}
+        latency_ms = (time.perf_counter() - started) * 1000
+        status = DEGRADED if latency_ms > settings.HEALTH_DB_DEGRADED_MS else OK
+        return "database", {"status": status, "latency_ms": round(latency_ms, 1)}
+
+    async def _check_smtp(self):
+        self._smtp_checked_at = time.monotonic()
+        started = time.perf_counter()
+        try:
+            # A TCP connect is enough to know the relay is reachable; no login
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(settings.SMTP_HOST, settings.SMTP_PORT),
+                settings.HEALTH_CHECK_TIMEOUT_SECONDS,
+            )
+            writer.close()
+        except Exception as e:
+            logger.warning(f"⚠️ SMTP health check failed: {e!r}")
+            return "smtp", {"status": DOWN}
+        latency_ms = (time.perf_counter() - started) * 1000
+        return "smtp", {"status": OK, "latency_ms": round(latency_ms, 1)}
+
+    async def _check_migrations(self):
+        if self._migrated:
+            return "migrations", {"status": OK}
+        try:
+            waiting = await migrations.mark_empty_applied(await get_storage())
+        except Exception as e:
+            logger.warning(f"⚠️ Migration check failed: {e!r}")
+            return "migrations", {"status": DEGRADED}
+        if waiting:
+            # The routers would fail on documents in the old shape
+            status = DOWN if settings.READY_REQUIRES_MIGRATIONS else DEGRADED
+            return "migrations", {"status": status, "pending": [m.version for m in waiting]}
+        self._migrated = True
+        return "migrations", {"status": OK}
+
+    async def _check_disk(self):
+        try:
+            usage = shutil.disk_usage(settings.UPLOAD_DIR)
+        except OSError as e:
+            logger.warning(f"⚠️ Disk health check failed: {e!r}")
+            return "disk", {"status": DOWN}
+        free_mb = usage.free / (1024 * 1024)
+        status = DEGRADED if free_mb < settings.HEALTH_DISK_MIN_FREE_MB else OK
+        return "disk", {"status": status, "free_mb": int(free_mb)}
+
+    # ----------------------------
+    # Cached state
+    # ----------------------------
+    def status(self) -> str:
+        if self.checked_at is None:
+            return "starting"
+        database = self.checks.get("database", {}).get("status")
+        if database == DOWN:
+            return DOWN  # nothing useful can be served without the database
+        if self.checks.get("migrations", {}).get("status") == DOWN:
+            return DOWN  # nor from data the routers cannot read yet
+        stale = time.monotonic() - self.checked_at > 3 * settings.HEALTH_CHECK_INTERVAL_SECONDS
+        if stale or any(c["status"] != OK for c in self.checks.values()):
+            return DEGRADED
+        return OK
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "status": self.status(),
+            "checks": {name: check["status"] for name, check in self.checks.items()},
+            "breakers": {name: breaker.snapshot()["state"] for name, breaker in breakers.items()},
+        }
+
+
+monitor = HealthMonitor()
@@ -0,0 +1,119 @@
+# backend/home.py
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from backend.config import settings
+from backend.resilience import detached_context
+from backend.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+PORTFOLIO_FIELDS = ["title", "description", "image", "category", "link", "tags", "is_featured", "is_active", "created_at"]
+REVIEW_FIELDS = ["name", "company", "projectType", "rating", "comment", "published", "created_at"]
+PROJECT_FIELDS = ["name", "description"]
+
+
+class HomePage:
+    """The landing page payload, built once and served as pre-serialized
+    JSON with a strong ETag until something on it changes.
+
+    The payload holds only content (no build time), so the ETag is the
+    same across rebuilds and workers until the content itself changes.
+    Portfolio and review writes call `invalidate()`, which rebuilds it in
+    the background. Each worker holds its own copy, so writes handled by
+    another worker show up here after at most HOME_CACHE_TTL_SECONDS.
+    """
+
+    def __init__(self):
+        self.body: Optional[bytes] = None
+        self.etag: Optional[str] = None
+        self._built_at = 0.0
+        self._stale = True
+        self._lock = asyncio.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def fresh(self) -> bool:
+        return (
+            self.body is not None
+            and not self._stale
+            and time.monotonic() - self._built_at < settings.HOME_CACHE_TTL_SECONDS
+        )
+
+    async def get(self) -> Tuple[bytes, str]:
+        if not self.fresh():
+            async with self._lock:  # one rebuild at a time; the rest wait for it
+                if not self.fresh():
+                    try:
+                        await self._build()
+                    except Exception as e:
+                        if self.body is None:
+                            raise
+                        logger.error(f"❌ Home page rebuild failed, serving the previous one: {e!r}")
+        return self.body, self.etag
+
+    def invalidate(self):
+        self._stale = True
+        try:
+            # Not the writing request's context: its deadline must not cut the rebuild short
+            task = asyncio.get_running_loop().create_task(self.get(), context=detached_context())
+        except RuntimeError:
+            return  # no loop (scripts): rebuilt on the next request
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _build(self):
+        # Built right after admin writes, so read from the primary (default
+        # profile) rather than a possibly lagging secondary
+        storage = await get_storage()
+        self._stale = False  # writes landing while we read mark it stale again
+        body = encode_json(await build_payload(storage))
+        self.body = body
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self._built_at = time.monotonic()
+
+
+def encode_json(payload: Any) -> bytes:
+    """Compact JSON, serialized the way FastAPI serializes response models"""
+    return json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode("utf-8")
+
+
+async def build_payload(storage, image: Optional[Callable[[Optional[str]], Optional[str]]] = None) -> Dict[str, Any]:
+    """`image` rewrites each featured item's image (snapshots.py moves
+    inline images out to files)"""
+    # Imported here: the routers import this module to invalidate it
+    from backend.routers.portfolio import _doc_to_portfolio_out
+    from backend.routers.reviews import _doc_to_review_out
+
+    (_, featured), reviews, stats, projects = await asyncio.gather(
+        storage.portfolio.list(
+            is_active=True, is_featured=True, limit=settings.HOME_FEATURED_LIMIT, fields=PORTFOLIO_FIELDS
+        ),
+        storage.reviews.list(published=True, limit=settings.HOME_REVIEWS_LIMIT, fields=REVIEW_FIELDS),
+        storage.reviews.stats(published=True),
+        storage.projects.list(fields=PROJECT_FIELDS),
+    )
+    average = stats["average_rating"]
+    return {
+        "featured_portfolio": [
+            _doc_to_portfolio_out({**doc, "image": image(doc.get("image"))} if image else doc) for doc in featured
+        ],
+        "reviews": [_doc_to_review_out(doc) for doc in reviews],
+        "review_stats": {
+            "count": stats["count"],
+            "average_rating": round(average, 2) if average is not None else None,
+        },
+        "projects": [project_out(doc) for doc in projects],
+    }
+
+
+def project_out(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {"_id": str(doc["_id"]), "name": doc["name"], "description": doc.get("description")}
+
+
+home_page = HomePage()
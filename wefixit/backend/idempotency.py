@@ -0,0 +1,96 @@
+# backend/idempotency.py
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, status
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+def payload_fingerprint(payload: Dict[str, Any]) -> str:
+    canonical = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class IdempotencyClaim:
+    """A reservation for one submission. Either `replay` is set (a previous
+    response to return as-is) or the caller owns the record and must call
+    `complete()` on success or `release()` on failure."""
+
+    def __init__(self, store, record_id: str, ttl_seconds: int, replay: Optional[dict] = None):
+        self.store = store
+        self.record_id = record_id
+        self.ttl_seconds = ttl_seconds
+        self.replay = replay
+
+    async def complete(self, response: dict):
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+        await self.store.complete(self.record_id, response, expires_at)
+
+    async def release(self):
+        await self.store.release(self.record_id)
+
+
+async def claim(storage, scope: str, payload: Dict[str, Any], key: Optional[str] = None) -> IdempotencyClaim:
+    """Reserve `payload` for processing under `scope`.
+
+    With an Idempotency-Key header the key identifies the submission for
+    IDEMPOTENCY_KEY_TTL_SECONDS. Without one, a hash of the payload suppresses
+    identical submissions within IDEMPOTENCY_DEDUP_WINDOW_SECONDS.
+    """
+    store = storage.idempotency
+    fingerprint = payload_fingerprint(payload)
+    if key:
+        if len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail="Idempotency-Key is too long")
+        record_id = f"{scope}:key:{key}"
+        ttl_seconds = settings.IDEMPOTENCY_KEY_TTL_SECONDS
+    else:
+        record_id = f"{scope}:hash:{fingerprint}"
+        ttl_seconds = settings.IDEMPOTENCY_DEDUP_WINDOW_SECONDS
+
+    for _ in range(3):
+        now = datetime.now(timezone.utc)
+        record = {
+            "_id": record_id,
+            "fingerprint": fingerprint,
+            "status": "pending",
+            "created_at": now,
+            # A crashed worker must not block the key for the full TTL
+            "expires_at": now + timedelta(seconds=settings.IDEMPOTENCY_PENDING_TIMEOUT_SECONDS),
+        }
+        if await store.insert(record):
+            return IdempotencyClaim(store, record_id, ttl_seconds)
+
+        # Expired records may not have been purged yet; take them over
+        if await store.replace_expired(record, now):
+            return IdempotencyClaim(store, record_id, ttl_seconds)
+
+        existing = await store.get(record_id)
+        if existing is None:
+            continue  # expired and removed in the meantime, try again
+
+        if existing.get("fingerprint") != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used with a different payload",
+            )
+        if existing.get("status") != "completed":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="An identical request is still being processed",
+            )
+        logger.info(f"🔁 Replaying {scope} submission {record_id}")
+        return IdempotencyClaim(store, record_id, ttl_seconds, replay=existing["response"])
+
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Could not reserve idempotency key")
@@ -0,0 +1,425 @@
+# backend/jobs.py
+"""Durable background jobs: `python -m backend.jobs {status,list,retry,enqueue,run}`
+
+Handlers register by name with `@job(name, queue=...)` and take one JSON-
+able payload dict (async functions run on the loop, plain ones in a
+thread). `enqueue()` writes the job to the `jobs` collection and returns
+at once, so a request never waits for the work.
+
+Every worker process with JOBS_RUN_IN_APP (or a separate
+`python -m backend.jobs run`) polls its queues, JOB_QUEUES slots per
+queue. A job is claimed with an atomic update that leases it for
+JOB_LEASE_SECONDS, and the lease is renewed by a heartbeat while the
+handler runs. Several gunicorn workers therefore never run the same job,
+and a job whose worker died is picked up again once its lease expires.
+A failing job is retried with exponential backoff (and jitter) until it
+has used JOB_MAX_ATTEMPTS, then parked as "dead" for `retry`. Finished
+jobs expire after JOB_RETENTION_HOURS.
+
+Cron schedules (JOB_CRON, "name=m h dom mon dow") enqueue a job per fire
+time with an id derived from it, so every worker may run the scheduler
+and each run still happens once. Runs missed while no worker was up are
+skipped.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import random
+import secrets
+import socket
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set
+
+from backend.config import settings
+from backend.storage import get_storage, open_storage, close_storage
+from backend.storage.base import Doc
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, DEAD = "queued", "running", "done", "dead"
+
+# Modules that register handlers; imported before any job runs
+HANDLER_MODULES = ["backend.routers.quotes", "backend.routers.contacts", "backend.analytics"]
+
+
+# ----------------------------
+# Handlers
+# ----------------------------
+class Handler:
+    def __init__(self, name: str, fn: Callable, queue: str, max_attempts: Optional[int], timeout: Optional[float]):
+        self.name = name
+        self.fn = fn
+        self.queue = queue
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+
+    async def __call__(self, payload: Doc):
+        if asyncio.iscoroutinefunction(self.fn):
+            await self.fn(payload)
+        else:
+            # A timeout stops waiting for the thread, it cannot stop the thread
+            await asyncio.to_thread(self.fn, payload)
+
+
+handlers: Dict[str, Handler] = {}
+
+
+def job(name: str, queue: str = "default", max_attempts: Optional[int] = None, timeout: Optional[float] = None):
+    """Registers the decorated function as the handler of job `name`"""
+    def register(fn: Callable) -> Callable:
+        handlers[name] = Handler(name, fn, queue, max_attempts, timeout)
+        return fn
+    return register
+
+
+def load_handlers():
+    for module in HANDLER_MODULES:
+        importlib.import_module(module)
+
+
+async def enqueue(
+    name: str,
+    payload: Optional[Doc] = None,
+    delay: float = 0,
+    run_at: Optional[datetime] = None,
+    job_id: Optional[str] = None,
+    storage=None,
+) -> Optional[str]:
+    """Stores a job and returns its id; None when `job_id` was already
+    taken (use it to make an enqueue idempotent)"""
+    handler = handlers.get(name)
+    if handler is None:
+        raise ValueError(f"No handler registered for job {name!r}")
+    storage = storage or await get_storage()
+    now = datetime.utcnow()
+    doc = {
+        "_id": job_id or secrets.token_hex(12),
+        "name": name,
+        "queue": handler.queue,
+        "payload": payload or {},
+        "status": QUEUED,
+        "run_at": run_at or now + timedelta(seconds=delay),
+        "attempts": 0,
+        "max_attempts": handler.max_attempts or settings.JOB_MAX_ATTEMPTS,
+        "lease_until": None,
+        "worker": None,
+        "last_error": None,
+        "created_at": now,
+        "expire_at": None,
+    }
+    if not await storage.jobs.enqueue(doc):
+        return None
+    runner.wake(handler.queue)
+    return doc["_id"]
+
+
+async def try_enqueue(name: str, payload: Doc) -> bool:
+    """For call sites with an in-memory fallback: True once the job is
+    stored, False when jobs are disabled or the store is unavailable"""
+    if not settings.JOBS_ENABLED:
+        return False
+    try:
+        await enqueue(name, payload)
+        return True
+    except Exception as e:
+        logger.error(f"❌ Could not enqueue {name}: {e!r}")
+        return False
+
+
+def backoff(attempts: int) -> float:
+    """Seconds before retry number `attempts`: doubling, capped, jittered"""
+    delay = min(settings.JOB_BACKOFF_MAX_SECONDS, settings.JOB_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+# ----------------------------
+# Cron
+# ----------------------------
+class Cron:
+    """A five-field cron expression (minute hour day-of-month month
+    day-of-week, UTC) with *, lists, ranges and steps. As in cron, when
+    both day fields are restricted a day matching either one fires."""
+
+    RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse(field, low, high) for field, (low, high) in zip(fields, self.RANGES)
+        )
+        self.weekdays = {day % 7 for day in self.weekdays}  # 7 is Sunday too
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse(field: str, low: int, high: int) -> Set[int]:
+        values: Set[int] = set()
+        for part in field.split(","):
+            spec, _, step = part.partition("/")
+            if spec == "*":
+                start, end = low, high
+            elif "-" in spec:
+                start, end = (int(v) for v in spec.split("-", 1))
+            else:
+                start = end = int(spec)
+                if step:
+                    end = high
+            values.update(range(start, end + 1, int(step or 1)))
+        if not values or min(values) < low or max(values) > (7 if high == 6 else high):
+            raise ValueError(f"Cron field out of range: {field!r}")
+        return values
+
+    def _day_matches(self, when: datetime) -> bool:
+        day = when.day in self.days
+        weekday = (when.weekday() + 1) % 7 in self.weekdays  # cron: 0 = Sunday
+        if self._any_day or self._any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, when: datetime) -> datetime:
+        when = when.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = when + timedelta(days=366 * 5)
+        while when < limit:
+            if when.month not in self.months:
+                when = (when.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(when):
+                when = when.replace(hour=0, minute=0) + timedelta(days=1)
+            elif when.hour not in self.hours:
+                when = when.replace(minute=0) + timedelta(hours=1)
+            elif when.minute not in self.minutes:
+                when += timedelta(minutes=1)
+            else:
+                return when
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+
+def schedules() -> Dict[str, Cron]:
+    return {name: Cron(expression) for name, expression in settings.JOB_CRON.items()}
+
+
+# ----------------------------
+# Runner
+# ----------------------------
+class JobRunner:
+    """Per-process job workers and cron scheduler"""
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(3)}"
+        self._tasks: List[asyncio.Task] = []
+        self._wake: Dict[str, asyncio.Event] = {}
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self, force: bool = False):
+        if self.running or not (force or (settings.JOBS_ENABLED and settings.JOBS_RUN_IN_APP)):
+            return
+        load_handlers()
+        self._stopping = False
+        for queue, slots in settings.JOB_QUEUES.items():
+            self._wake[queue] = asyncio.Event()
+            self._tasks += [
+                asyncio.create_task(self._worker(queue), name=f"jobs-{queue}-{i}") for i in range(slots)
+            ]
+        for handler in handlers.values():
+            if handler.queue not in settings.JOB_QUEUES:
+                logger.warning(f"⚠️ No JOB_QUEUES slots for queue {handler.queue!r}; {handler.name} jobs will wait")
+        if settings.JOB_CRON:
+            self._tasks.append(asyncio.create_task(self._scheduler(), name="jobs-cron"))
+        logger.info(f"⚙️ Job runner {self.worker_id} started: {settings.JOB_QUEUES}")
+
+    async def stop(self, timeout: Optional[float] = None):
+        """Lets running jobs finish (bounded); anything still running is
+        put back in its queue"""
+        if not self.running:
+            return
+        self._stopping = True
+        for event in self._wake.values():
+            event.set()
+        _, pending = await asyncio.wait(self._tasks, timeout=settings.JOB_DRAIN_TIMEOUT if timeout is None else timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def wake(self, queue: str):
+        """A job was enqueued by this process: skip the poll wait"""
+        if queue in self._wake:
+            self._wake[queue].set()
+
+    async def _worker(self, queue: str):
+        storage = await get_storage()
+        wake = self._wake[queue]
+        while not self._stopping:
+            now = datetime.utcnow()
+            try:
+                claimed = await storage.jobs.claim(
+                    queue, self.worker_id, now, now + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+                )
+            except Exception as e:
+                logger.error(f"❌ Could not claim a {queue} job: {e!r}")
+                claimed = None
+            if claimed is None:
+                try:
+                    # Jittered, so workers of an idle queue do not poll in lockstep
+                    await asyncio.wait_for(wake.wait(), settings.JOB_POLL_INTERVAL_SECONDS * random.uniform(0.8, 1.2))
+                except asyncio.TimeoutError:
+                    pass
+                wake.clear()
+                continue
+            try:
+                await self.run_job(storage, claimed)
+            except Exception as e:
+                # Recording the outcome failed (the database blipped): keep
+                # this slot alive; the lease expires and the job runs again
+                logger.error(f"❌ Job {claimed['name']} {claimed['_id']} could not be recorded: {e!r}")
+
+    async def run_job(self, storage, claimed: Doc):
+        handler = handlers.get(claimed["name"])
+        if handler is None:
+            await self._finish(storage, claimed, DEAD, f"No handler registered for {claimed['name']!r}")
+            return
+        if claimed["attempts"] > claimed["max_attempts"]:
+            # Its leases kept expiring: the handler hangs or kills the worker
+            await self._finish(storage, claimed, DEAD, claimed.get("last_error") or "Lease expired on every attempt")
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(storage, claimed))
+        try:
+            await asyncio.wait_for(handler(claimed["payload"]), handler.timeout or settings.JOB_TIMEOUT_SECONDS)
+        except asyncio.CancelledError:
+            # Shutting down mid-job: hand it back instead of waiting out the lease
+            await asyncio.shield(storage.jobs.finish(
+                claimed["_id"], self.worker_id, {"status": QUEUED, "run_at": datetime.utcnow(), "lease_until": None}
+            ))
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}" if not isinstance(e, asyncio.TimeoutError) else "Timed out"
+            if claimed["attempts"] >= claimed["max_attempts"]:
+                logger.error(f"❌ Job {claimed['name']} {claimed['_id']} failed for good: {error}")
+                await self._finish(storage, claimed, DEAD, error)
+            else:
+                delay = backoff(claimed["attempts"])
+                logger.warning(
+                    f"⚠️ Job {claimed['name']} {claimed['_id']} failed (attempt {claimed['attempts']}), "
+                    f"retrying in {delay:.0f}s: {error}"
+                )
+                await storage.jobs.finish(claimed["_id"], self.worker_id, {
+                    "status": QUEUED,
+                    "run_at": datetime.utcnow() + timedelta(seconds=delay),
+                    "lease_until": None,
+                    "last_error": error,
+                })
+        else:
+            await self._finish(storage, claimed, DONE)
+        finally:
+            heartbeat.cancel()
+
+    async def _finish(self, storage, claimed: Doc, status: str, error: Optional[str] = None):
+        now = datetime.utcnow()
+        updates = {"status": status, "finished_at": now, "lease_until": None}
+        if error is not None:
+            updates["last_error"] = error
+        if status == DONE:
+            updates["expire_at"] = now + timedelta(hours=settings.JOB_RETENTION_HOURS)
+        if not await storage.jobs.finish(claimed["_id"], self.worker_id, updates):
+            logger.warning(f"⚠️ Job {claimed['_id']} was taken over before it finished; its outcome is dropped")
+
+    async def _heartbeat(self, storage, claimed: Doc):
+        while True:
+            await asyncio.sleep(settings.JOB_LEASE_SECONDS / 3)
+            lease_until = datetime.utcnow() + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+            try:
+                if not await storage.jobs.heartbeat(claimed["_id"], self.worker_id, lease_until):
+                    logger.warning(f"⚠️ Lost the lease on job {claimed['_id']}")
+                    return
+            except Exception as e:  # try again next beat; the lease has slack
+                logger.error(f"❌ Job heartbeat failed: {e!r}")
+
+    async def _scheduler(self):
+        crons = schedules()
+        now = datetime.utcnow()
+        next_runs = {name: cron.next_after(now) for name, cron in crons.items()}
+        while not self._stopping:
+            now = datetime.utcnow()
+            for name, cron in crons.items():
+                while next_runs[name] <= now:
+                    fire = next_runs[name]
+                    try:
+                        await enqueue(name, {"scheduled_for": fire}, run_at=fire, job_id=f"cron:{name}:{fire.isoformat()}")
+                    except Exception as e:
+                        logger.error(f"❌ Could not schedule {name}: {e!r}")
+                        break  # retried on the next tick
+                    next_runs[name] = cron.next_after(fire)
+            await asyncio.sleep(min(30.0, max(1.0, (min(next_runs.values()) - now).total_seconds())))
+
+
+runner = JobRunner()
+
+
+# ----------------------------
+# CLI
+# ----------------------------
+STATUSES = ["queued", "scheduled", "running", "done", "dead"]
+
+
+async def _main(args):
+    load_handlers()
+    storage = await open_storage()
+    try:
+        if args.command == "status":
+            counts = await storage.jobs.counts(datetime.utcnow())
+            print(f"{'queue':<12}" + "".join(f"{status:>11}" for status in STATUSES))
+            for queue in sorted(set(counts) | set(settings.JOB_QUEUES)):
+                print(f"{queue:<12}" + "".join(f"{counts.get(queue, {}).get(status, 0):>11}" for status in STATUSES))
+        elif args.command == "list":
+            for doc in await storage.jobs.list(args.queue, args.status, args.limit):
+                print(
+                    f"{doc['_id']}  {doc['queue']:<10} {doc['name']:<22} {doc['status']:<8} "
+                    f"attempts={doc['attempts']}/{doc['max_attempts']} run_at={doc['run_at']:%Y-%m-%d %H:%M:%S}"
+                    + (f"  error={doc['last_error']}" if doc.get("last_error") else "")
+                )
+        elif args.command == "retry":
+            ok = await storage.jobs.requeue(args.job_id, datetime.utcnow())
+            print(f"🔁 Requeued {args.job_id}" if ok else f"❌ {args.job_id} is not a dead or done job")
+        elif args.command == "enqueue":
+            job_id = await enqueue(args.name, json.loads(args.payload), delay=args.delay, storage=storage)
+            print(f"📥 Enqueued {args.name} as {job_id}")
+        elif args.command == "run":
+            runner.start(force=True)
+            print(f"⚙️ Running jobs for {', '.join(settings.JOB_QUEUES)}; Ctrl-C to stop")
+            try:
+                await asyncio.Event().wait()
+            finally:
+                await runner.stop()
+    finally:
+        await close_storage()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect and run background jobs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="job counts per queue and status")
+    listing = commands.add_parser("list", help="latest jobs")
+    listing.add_argument("--queue")
+    listing.add_argument("--status", choices=[QUEUED, RUNNING, DONE, DEAD])
+    listing.add_argument("--limit", type=int, default=50)
+    retry = commands.add_parser("retry", help="run a dead job again")
+    retry.add_argument("job_id")
+    add = commands.add_parser("enqueue", help="enqueue a job by name")
+    add.add_argument("name")
+    add.add_argument("--payload", default="{}", help="JSON object")
+    add.add_argument("--delay", type=float, default=0, help="seconds")
+    commands.add_parser("run", help="process jobs in this process (JOB_QUEUES slots per queue)")
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,188 @@
+# backend/live.py
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Dict, Optional, Set
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from backend.config import settings
+from backend.database import get_db
+from backend.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+COLLECTIONS = ("contacts", "quotes", "reviews")
+STATE_KEY = "live-feed"  # storage.state record holding the change stream position
+EVENT_ID = re.compile(r"^[0-9A-Fa-f]{2,1024}$")  # a resume token's "_data", as SSE event ids
+
+# Server error codes
+CHANGE_STREAMS_UNSUPPORTED = 40573  # standalone mongod
+RESUME_TOKEN_INVALID = (260, 280, 286)  # InvalidResumeToken, ChangeStreamFatalError, HistoryLost
+
+
+def _to_event(collection: str, operation: str, doc_id: Any, document: Optional[dict]) -> Dict[str, Any]:
+    return {
+        "collection": collection,
+        "operation": operation,
+        "id": str(doc_id),
+        "document": jsonable_encoder(document, custom_encoder={ObjectId: str}) if document else None,
+    }
+
+
+def _event_id(token: Any) -> Optional[str]:
+    data = token.get("_data") if isinstance(token, dict) else None
+    return data if isinstance(data, str) and EVENT_ID.match(data) else None
+
+
+class LiveFeed:
+    """One shared source of dashboard events per worker, fanned out to every
+    connected admin. Uses a change stream when the deployment supports it
+    (replica set / Atlas) and falls back to polling for new documents on a
+    standalone mongod or the SQLite backend. Runs only while at least one
+    client is connected.
+
+    Change stream events carry their resume token as the SSE event id, and
+    the position is saved in storage.state (every
+    LIVE_TOKEN_SAVE_INTERVAL_SECONDS and when the feed stops). A feed that
+    starts for a reconnecting client resumes from its Last-Event-ID, else
+    from the saved position if that is recent (LIVE_RESUME_WINDOW_SECONDS,
+    e.g. across a restart), else from "now" rather than replaying events
+    from long ago."""
+
+    def __init__(self):
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._resume_token = None
+        self.mode: Optional[str] = None
+
+    # ----------------------------
+    # Subscribers
+    # ----------------------------
+    def subscribe(self, last_event_id: Optional[str] = None) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.LIVE_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(last_event_id), name="live-feed")
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _publish(self, event: Dict[str, Any]):
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()  # slow client: drop its oldest event
+            queue.put_nowait(event)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._subscribers.clear()
+
+    # ----------------------------
+    # Sources
+    # ----------------------------
+    async def _run(self, last_event_id: Optional[str] = None):
+        storage = await get_storage()
+        if storage.name != "mongo":
+            self.mode = "polling"
+            await self._poll()
+            return
+
+        from pymongo.errors import OperationFailure, PyMongoError
+        self._resume_token = await self._start_position(storage, last_event_id)
+        try:
+            while True:
+                try:
+                    self.mode = "change_stream"
+                    await self._watch(storage)
+                except OperationFailure as e:
+                    if e.code == CHANGE_STREAMS_UNSUPPORTED:
+                        logger.info("ℹ️ Change streams unavailable, polling for dashboard updates")
+                        self.mode = "polling"
+                        await self._poll()
+                        return
+                    if e.code in RESUME_TOKEN_INVALID:
+                        logger.warning(f"⚠️ Resume token rejected ({e.code}), starting a fresh change stream")
+                        self._resume_token = None
+                        continue
+                    logger.error(f"❌ Change stream failed: {e}")
+                except PyMongoError as e:
+                    logger.error(f"❌ Change stream failed: {e}")
+                await asyncio.sleep(settings.LIVE_RETRY_SECONDS)
+        finally:
+            if self._resume_token is not None:
+                await self._save_position(storage)
+
+    async def _start_position(self, storage, last_event_id: Optional[str]):
+        if last_event_id and EVENT_ID.match(last_event_id):
+            return {"_data": last_event_id}
+        try:
+            state = await storage.state.get(STATE_KEY)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load the live feed position: {e!r}")
+            return None
+        if state and time.time() - state.get("saved_at", 0) <= settings.LIVE_RESUME_WINDOW_SECONDS:
+            return state.get("resume_token")
+        return None
+
+    async def _save_position(self, storage):
+        try:
+            await storage.state.save(STATE_KEY, {"resume_token": self._resume_token, "saved_at": time.time()})
+        except Exception as e:
+            logger.warning(f"⚠️ Could not save the live feed position: {e!r}")
+
+    async def _watch(self, storage):
+        pipeline = [{"$match": {
+            "ns.coll": {"$in": list(COLLECTIONS)},
+            "operationType": {"$in": ["insert", "update", "replace", "delete"]},
+        }}]
+
+        saved_at = time.monotonic()
+        async with get_db().watch(
+            pipeline, full_document="updateLookup", resume_after=self._resume_token
+        ) as stream:
+            async for change in stream:
+                self._resume_token = stream.resume_token
+                event = _to_event(
+                    change["ns"]["coll"],
+                    change["operationType"],
+                    change["documentKey"]["_id"],
+                    change.get("fullDocument"),
+                )
+                event["event_id"] = _event_id(self._resume_token)
+                self._publish(event)
+                # Saving every token would add a write per event; a short
+                # window of replayed events after a restart is harmless
+                if time.monotonic() - saved_at >= settings.LIVE_TOKEN_SAVE_INTERVAL_SECONDS:
+                    await self._save_position(storage)
+                    saved_at = time.monotonic()
+
+    async def _poll(self):
+        storage = await get_storage()
+        # Insert-only: without an oplog there is nothing to report updates or deletes
+        last_seen = {name: str(ObjectId()) for name in COLLECTIONS}
+        while True:
+            await asyncio.sleep(settings.LIVE_POLL_INTERVAL_SECONDS)
+            for name in COLLECTIONS:
+                try:
+                    docs = await getattr(storage, name).list_created_after(
+                        last_seen[name], settings.LIVE_QUEUE_SIZE
+                    )
+                except Exception as e:
+                    logger.error(f"❌ Dashboard poll of {name} failed: {e}")
+                    continue
+                for doc in docs:
+                    last_seen[name] = str(doc["_id"])
+                    self._publish(_to_event(name, "insert", doc["_id"], doc))
+
+
+live_feed = LiveFeed()
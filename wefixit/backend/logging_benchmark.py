@@ -0,0 +1,139 @@
+# backend/logging_benchmark.py
+"""Logging overhead benchmark: `python -m backend.logging_benchmark`
+
+Serves a small ASGI app (RequestIdMiddleware plus a route that logs a few
+lines per request) in-process with concurrent clients, three times:
+
+  * off       no log output at all (the baseline)
+  * blocking  a StreamHandler writing straight to the sink, as print() did
+  * queued    the NonBlockingQueueHandler + listener thread from logs.py
+
+The sink is a stream whose every write takes --sink-ms, like a busy pipe
+or a slow log shipper. Exits non-zero when the queued mode adds more than
+--budget-ms to the median request latency.
+"""
+import argparse
+import asyncio
+import logging
+import logging.handlers
+import queue
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+from backend.logs import ContextFilter, JSONFormatter, NonBlockingQueueHandler, RequestIdMiddleware
+
+logger = logging.getLogger("backend.logging_benchmark.app")
+
+
+class SlowStream:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.writes = 0
+
+    def write(self, text: str):
+        time.sleep(self.delay)
+        self.writes += 1
+
+    def flush(self):
+        pass
+
+
+def build_app(lines: int):
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        for i in range(lines):
+            logger.info("handled request", extra={"fields": {"path": scope["path"], "line": i}})
+        body = b'{"ok":true}'
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": body})
+
+    return RequestIdMiddleware(app, access_log=False)  # only the route's own lines
+
+
+def _install(mode: str, sink: SlowStream):
+    """Points the benchmark logger at the sink; returns a listener to stop, if any"""
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    if mode == "off":
+        logger.setLevel(logging.CRITICAL)
+        return None
+    output = logging.StreamHandler(sink)
+    output.setFormatter(JSONFormatter())
+    if mode == "blocking":
+        output.addFilter(ContextFilter(1.0))
+        logger.addHandler(output)
+        return None
+    handler = NonBlockingQueueHandler(queue.Queue(100_000))
+    handler.addFilter(ContextFilter(1.0))
+    logger.addHandler(handler)
+    listener = logging.handlers.QueueListener(handler.queue, output)
+    listener.start()
+    return listener
+
+
+async def _run(app, requests: int, concurrency: int) -> List[float]:
+    import httpx
+
+    latencies: List[float] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = iter(range(requests))
+
+        async def worker():
+            for _ in remaining:
+                started = time.perf_counter()
+                response = await client.get("/api/v1/bench")
+                latencies.append((time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def measure(mode: str, args) -> Dict[str, float]:
+    sink = SlowStream(args.sink_ms / 1000)
+    listener = _install(mode, sink)
+    started = time.perf_counter()
+    latencies = asyncio.run(_run(build_app(args.lines), args.requests, args.concurrency))
+    elapsed = time.perf_counter() - started
+    if listener is not None:
+        listener.stop()  # drains the queue: the writes still happen, just not on the loop
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+        "rps": len(latencies) / elapsed,
+        "written": sink.writes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Request latency with blocking vs queued logging")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--lines", type=int, default=3, help="log lines per request")
+    parser.add_argument("--sink-ms", type=float, default=1.0, help="time each write to the sink takes")
+    parser.add_argument("--budget-ms", type=float, default=1.0, help="allowed p50 overhead of queued logging")
+    args = parser.parse_args()
+
+    results = {mode: measure(mode, args) for mode in ("off", "blocking", "queued")}
+    print(f"{args.requests} requests, {args.concurrency} concurrent, {args.lines} lines each, sink {args.sink_ms} ms/write")
+    for mode, result in results.items():
+        print(
+            f"  {mode:<9} p50 {result['p50']:8.2f} ms   p99 {result['p99']:8.2f} ms   "
+            f"{result['rps']:8.0f} req/s   {result['written']} lines written"
+        )
+    overhead = results["queued"]["p50"] - results["off"]["p50"]
+    print(f"queued logging adds {overhead:.2f} ms at p50 (budget {args.budget_ms:.2f} ms)")
+    if overhead > args.budget_ms:
+        print("❌ Logging overhead is over budget")
+        sys.exit(1)
+    print("✅ Logging stays off the request path")
+
+
+if __name__ == "__main__":
+    main()
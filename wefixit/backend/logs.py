@@ -0,0 +1,196 @@
+# backend/logs.py
+"""Structured, non-blocking logging.
+
+`configure()` (run per worker in the lifespan) puts a QueueHandler on the
+root logger. Calling a logger only resolves the message and puts the
+record on a bounded in-memory queue; a QueueListener thread does the
+formatting to JSON and the writing. A slow stdout, pipe or log shipper can no longer
+stall the event loop. When the queue is full, records are dropped and
+counted rather than waited on.
+
+Each record carries the request's correlation id (RequestIdMiddleware:
+the incoming X-Request-ID, or a new one, echoed on the response) and the
+trace id when the request is traced. The middleware also writes the
+access log, one "backend.access" record per request (LOG_ACCESS); the
+server's own uvicorn/gunicorn loggers are routed through the same queue. Fields passed with
+`extra={"fields": {...}}` are added as top-level keys. DEBUG records are
+sampled at LOG_DEBUG_SAMPLE_RATE; a record can set its own rate with
+`extra={"sample_rate": ...}`.
+"""
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from backend.config import settings
+from backend.tracing import current_span
+
+request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")  # what we accept from clients
+
+# Configured by uvicorn/gunicorn with handlers of their own that write synchronously
+SERVER_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access", "gunicorn.error", "gunicorn.access")
+
+access_logger = logging.getLogger("backend.access")
+
+
+# ----------------------------
+# Records
+# ----------------------------
+class ContextFilter(logging.Filter):
+    """Runs in the caller's context, before the record is queued: stamps
+    the correlation ids and applies sampling"""
+
+    def __init__(self, debug_sample_rate: float):
+        super().__init__()
+        self.debug_sample_rate = debug_sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = getattr(record, "sample_rate", self.debug_sample_rate if record.levelno <= logging.DEBUG else 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            return False
+        record.request_id = request_id.get()
+        span = current_span()
+        record.trace_id = span.trace_id if span is not None else None
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key in ("request_id", "trace_id"):
+            if getattr(record, key, None):
+                entry[key] = getattr(record, key)
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Never waits for room on the queue: a full queue drops the record"""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message now (its arguments may change before the
+        # listener gets to it); formatting, tracebacks included, happens there
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            NonBlockingQueueHandler.dropped += 1
+
+
+# ----------------------------
+# Setup
+# ----------------------------
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure():
+    """Root logging for this worker: non-blocking queue -> JSON (or text) on stdout"""
+    global _listener
+    if _listener is not None:
+        return
+    output = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        output.setFormatter(JSONFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+    handler = NonBlockingQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+    handler.addFilter(ContextFilter(settings.LOG_DEBUG_SAMPLE_RATE))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(settings.LOG_LEVEL)
+    for name in SERVER_LOGGERS:
+        server_logger = logging.getLogger(name)
+        for existing in list(server_logger.handlers):
+            server_logger.removeHandler(existing)
+        server_logger.propagate = True
+    _listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown():
+    """Flushes what is queued; call last in the lifespan"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        if NonBlockingQueueHandler.dropped:
+            sys.stderr.write(f"⚠️ {NonBlockingQueueHandler.dropped} log records dropped (queue full)\n")
+
+
+# ----------------------------
+# HTTP entry point
+# ----------------------------
+class RequestIdMiddleware:
+    """Correlation id per request: X-Request-ID from the client (or proxy)
+    when it looks sane, else a new one; returned in the same header. Also
+    logs each request once it has been answered (without the query string,
+    which may carry credentials)."""
+
+    header = b"x-request-id"
+
+    def __init__(self, app, access_log: Optional[bool] = None):
+        self.app = app
+        self.access_log = settings.LOG_ACCESS if access_log is None else access_log
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        incoming = dict(scope["headers"]).get(self.header, b"").decode("latin-1")
+        current = incoming if REQUEST_ID.match(incoming) else os.urandom(8).hex()
+        token = request_id.set(current)
+        started = time.perf_counter()
+        status = 500  # unless a response starts
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(self.header, current.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if self.access_log:
+                duration_ms = round((time.perf_counter() - started) * 1000, 1)
+                client = scope.get("client")
+                access_logger.info(
+                    f"{scope['method']} {scope['path']} {status}",
+                    extra={"fields": {
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status,
+                        "duration_ms": duration_ms,
+                        "client": client[0] if client else None,
+                    }},
+                )
+            request_id.reset(token)
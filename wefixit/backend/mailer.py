@@ -0,0 +1,107 @@
+# backend/mailer.py
+import asyncio
+import logging
+from typing import Callable, List, Optional
+
+from backend.config import settings
+from backend.resilience import detached_context, smtp_breaker
+from backend.tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+def send_email(to: str, subject: str, body: str, from_name: str):
+    """Send a plain-text email through the SMTP relay (blocking)"""
+    # smtplib and the email package are only needed once a message goes out;
+    # importing them here keeps them off the cold-start path
+    import smtplib
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
+    msg = MIMEMultipart()
+    msg["From"] = f"{from_name} <{settings.EMAIL_USER}>"
+    msg["To"] = to
+    msg["Subject"] = subject
+    msg.attach(MIMEText(body, "plain"))
+
+    # Fails fast with CircuitOpenError while the relay keeps failing
+    smtp_breaker.before_call()
+    try:
+        with span("smtp.send", **{"smtp.host": settings.SMTP_HOST}):
+            with span("smtp.connect"):
+                server = smtplib.SMTP_SSL(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT_SECONDS)
+            with server:
+                with span("smtp.login"):
+                    server.login(settings.EMAIL_USER, settings.EMAIL_PASSWORD)
+                with span("smtp.sendmail"):
+                    server.sendmail(settings.EMAIL_USER, to, msg.as_string())
+    except (OSError, smtplib.SMTPException):
+        smtp_breaker.record_failure()
+        raise
+    smtp_breaker.record_success()
+
+
+class Outbox:
+    """Per-worker queue of outgoing notification emails.
+
+    The email helpers are blocking (smtplib), so the outbox runs them in a
+    thread off the request path. On shutdown `drain()` waits, bounded, for
+    queued messages to go out before the worker exits.
+    """
+
+    def __init__(self, concurrency: int = 1):
+        self.concurrency = concurrency
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"outbox-{i}")
+            for i in range(self.concurrency)
+        ]
+        logger.info(f"📬 Outbox started with {self.concurrency} worker(s)")
+
+    def submit(self, fn: Callable, *args):
+        if not self.running:
+            # Scripts and one-off tools have no lifespan; send inline
+            fn(*args)
+            return
+        # Run the job in the submitter's context so its spans join the request's trace
+        self._queue.put_nowait((detached_context(), fn, args))
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _worker(self):
+        while True:
+            context, fn, args = await self._queue.get()
+            try:
+                await asyncio.to_thread(context.run, fn, *args)
+            except Exception as e:
+                logger.error(f"❌ Outbox job {getattr(fn, '__name__', fn)} failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def drain(self, timeout: float):
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ Outbox drain timed out with {self.pending} message(s) unsent")
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+
+outbox = Outbox()
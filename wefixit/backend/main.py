@@ -1,21 +1,134 @@
 # backend/main.py
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
+import asyncio
+import logging
 import os
 
 from backend.config import settings
-from backend.routers import contacts, reviews, portfolio, auth as auth_router, projects, quotes
-from backend.database import db  # ✅ Import your db here
+from backend.routers import contacts, reviews, portfolio, auth as auth_router, projects, quotes, health, live, home, profiling, slow_queries, analytics
+from backend import database, logs
+from backend.storage import open_storage, close_storage
+from backend.mailer import outbox
+from backend.digest import digest
+from backend.health import monitor
+from backend.live import live_feed
+from backend.archival import archiver
+from backend.upload_gc import upload_gc
+from backend.migrations import warn_if_pending
+from backend.snapshots import IMAGE_SUBDIR, publisher, snapshot_dir
+from backend.slow_queries import slow_query_log
+from backend.jobs import runner as job_runner
+from backend.compression import CompressionMiddleware
+from backend.resilience import DeadlineMiddleware
+from backend.admission import AdmissionMiddleware
+from backend.tracing import TracingMiddleware
+from backend.logs import RequestIdMiddleware
+from backend.profiling import ProfilingMiddleware
+from backend.static import CachedStaticFiles
 
-# Ensure uploads folder exists
-os.makedirs("uploads", exist_ok=True)
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # -------------------- Per-worker startup --------------------
+    # Runs in each worker after the fork, so nothing here is shared between processes
+    logs.configure()  # first: its writer thread must be this worker's own
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    if settings.SNAPSHOT_ENABLED:
+        os.makedirs(os.path.join(snapshot_dir(), IMAGE_SUBDIR), exist_ok=True)
+    storage = await open_storage()  # Mongo client or SQLite connection
+    outbox.start()
+    digest.start()
+    monitor.start()
+    archiver.start()
+    upload_gc.start()
+    publisher.start()
+    slow_query_log.start()
+    job_runner.start()
+    # Don't hold up startup (or fail it) while the database is slow to answer
+    index_task = asyncio.create_task(storage.ensure_indexes())
+    migration_check = asyncio.create_task(warn_if_pending(storage))
+    app.state.ready = True
+
+    yield
+
+    # -------------------- Graceful shutdown --------------------
+    # The server has stopped accepting connections and finished in-flight requests
+    app.state.ready = False
+    index_task.cancel()
+    migration_check.cancel()
+    await job_runner.stop()  # running jobs finish (bounded) or go back to their queue
+    await slow_query_log.stop()
+    await publisher.stop()
+    await upload_gc.stop()
+    await archiver.stop()
+    await monitor.stop()
+    await live_feed.stop()
+    await digest.stop()  # hand the last summary to the outbox before it drains
+    await outbox.drain(settings.OUTBOX_DRAIN_TIMEOUT)
+    await close_storage()
+    database.close()
+    logs.shutdown()
 
 def create_app() -> FastAPI:
-    app = FastAPI(title=settings.PROJECT_NAME, version="1.0.0")
+    app = FastAPI(title=settings.PROJECT_NAME, version="1.0.0", lifespan=lifespan)
+    app.state.ready = False
 
     # -------------------- Serve static files --------------------
-    app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+    # Snapshots change on every publish: short max-age (revalidated by
+    # ETag) instead of the year-long immutable caching of uploads; their
+    # images are content-addressed, so they keep it. Mounted first, most
+    # specific first, so they win over the /uploads mount.
+    if settings.SNAPSHOT_ENABLED:
+        app.mount(
+            f"/uploads/{settings.SNAPSHOT_SUBDIR}/{IMAGE_SUBDIR}",
+            CachedStaticFiles(
+                directory=os.path.join(snapshot_dir(), IMAGE_SUBDIR),
+                max_age=settings.STATIC_CACHE_MAX_AGE,
+                check_dir=False,  # created in the lifespan
+            ),
+            name="snapshot-images",
+        )
+        app.mount(
+            f"/uploads/{settings.SNAPSHOT_SUBDIR}",
+            CachedStaticFiles(
+                directory=snapshot_dir(),
+                max_age=settings.SNAPSHOT_MAX_AGE,
+                immutable=False,
+                check_dir=False,  # created in the lifespan
+            ),
+            name="snapshots",
+        )
+    app.mount(
+        "/uploads",
+        CachedStaticFiles(
+            directory=settings.UPLOAD_DIR,
+            max_age=settings.STATIC_CACHE_MAX_AGE,
+            check_dir=False,  # created in the lifespan
+        ),
+        name="uploads",
+    )
+
+    # -------------------- Request deadline --------------------
+    # Added first so it sits inside CORS: its 503/504s still get CORS headers
+    if settings.STORAGE_BACKEND == "mongo":
+        app.add_middleware(
+            DeadlineMiddleware,
+            deadline=settings.REQUEST_DEADLINE_SECONDS,
+            exclude_paths=settings.REQUEST_DEADLINE_EXCLUDE_PATHS,
+        )
+
+    # -------------------- Admission control --------------------
+    # Outside the deadline (queueing is not database time), inside CORS so
+    # shed requests still get CORS headers
+    if settings.ADMISSION_ENABLED:
+        app.add_middleware(
+            AdmissionMiddleware,
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+            retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+        )
 
     # -------------------- CORS --------------------
     origins = [
@@ -33,6 +146,34 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # -------------------- Compression --------------------
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.COMPRESSION_MIN_SIZE,
+            gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+            brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+            enable_brotli=settings.COMPRESSION_BROTLI_ENABLED,
+            content_types=settings.COMPRESSION_CONTENT_TYPES,
+        )
+
+    # -------------------- Per-request profiling (admins) --------------------
+    if settings.PROFILING_ENABLED:
+        app.add_middleware(
+            ProfilingMiddleware,
+            header=settings.PROFILING_HEADER,
+            interval=settings.PROFILING_REQUEST_INTERVAL_MS / 1000,
+        )
+
+    # -------------------- Tracing --------------------
+    # Covers the whole middleware stack below it
+    if settings.TRACE_EXPORTER != "none":
+        app.add_middleware(TracingMiddleware, sample_rate=settings.TRACE_SAMPLE_RATE)
+
+    # -------------------- Correlation ids --------------------
+    # Outermost of all, so every log line of a request carries its id
+    app.add_middleware(RequestIdMiddleware)
+
     # -------------------- API routers --------------------
     app.include_router(auth_router.router, prefix="/api/v1/auth", tags=["auth"])
     app.include_router(reviews.router, prefix="/api/v1/reviews", tags=["reviews"])
@@ -40,15 +181,26 @@ def create_app() -> FastAPI:
     app.include_router(projects.router, prefix="/api/v1/projects", tags=["projects"])
     app.include_router(quotes.router, prefix="/api/v1/quotes", tags=["quotes"])
     app.include_router(contacts.router, prefix="/api/v1/contacts", tags=["contacts"])
+    app.include_router(live.router, prefix="/api/v1/live", tags=["live"])
+    app.include_router(home.router, prefix="/api/v1/home", tags=["home"])
+
+    app.include_router(health.router, prefix="/api/v1/health", tags=["system"])
+    if settings.PROFILING_ENABLED:
+        app.include_router(profiling.router, prefix="/api/v1/admin/profiling", tags=["admin"])
+    app.include_router(slow_queries.router, prefix="/api/v1/admin/slow-queries", tags=["admin"])
+    app.include_router(analytics.router, prefix="/api/v1/admin/analytics", tags=["admin"])
 
     # -------------------- DB Check endpoint --------------------
     @app.get("/api/v1/db-check", tags=["system"])
     async def db_check():
-        try:
-            collections = await db.list_collection_names()
-            return {"status": "connected", "collections": collections}
-        except Exception as e:
-            return {"status": "error", "detail": str(e)}
+        # Cached by the health monitor; probes never touch the database
+        database_check = monitor.checks.get("database")
+        if database_check is None:
+            return {"status": "starting"}
+        return {"status": "connected" if database_check["status"] != "down" else "error"}
+
+    # -------------------- Readiness endpoint --------------------
+    app.add_api_route("/api/v1/ready", health.readiness, methods=["GET"], tags=["system"])
 
     # -------------------- Root endpoint --------------------
     @app.get("/")
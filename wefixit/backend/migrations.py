@@ -0,0 +1,245 @@
+# backend/migrations.py
+"""Versioned online data migrations: `python -m backend.migrations [--dry-run] [--status]`
+
+Each migration walks one collection by _id in batches. It asks
+`transform(doc)` what to change and writes the batch with one bulk update,
+at no more than MIGRATION_MAX_OPS_PER_SECOND. Progress (the last _id
+done) is saved after every batch in the `migrations` collection. An
+interrupted run resumes where it stopped, and applied versions are never
+run again. Migrations run in version order; add new ones at the end of
+MIGRATIONS and never renumber.
+
+The routers read documents in the migrated shape, so /ready fails while
+any migration is pending (see health.HealthMonitor). A migration whose
+collection holds no documents, as on a new database, is recorded as applied
+without running: there is nothing to convert, and new documents are
+written in the new shape.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+
+from backend.config import settings
+from backend.storage import open_storage, close_storage
+from backend.storage.base import Doc
+
+logger = logging.getLogger(__name__)
+
+# (fields to $set, fields to $unset), or None when the document is fine
+Change = Optional[Tuple[Doc, List[str]]]
+
+
+class Migration:
+    def __init__(self, version: int, name: str, collection: str, transform: Callable[[Doc], Change], query: Optional[Doc] = None):
+        self.version = version
+        self.name = name
+        self.collection = collection
+        self.transform = transform
+        self.query = query  # Mongo pre-filter for documents that may need it
+
+
+# ----------------------------
+# Transforms
+# ----------------------------
+def review_comment(doc: Doc) -> Change:
+    """Old reviews stored the text under "message" (the frontend's name)"""
+    if "message" not in doc:
+        return None
+    return {"comment": doc.get("comment") or doc["message"] or ""}, ["message"]
+
+
+def _creation_time(doc: Doc) -> Optional[datetime]:
+    try:
+        return ObjectId(str(doc["_id"])).generation_time.replace(tzinfo=None)
+    except Exception:
+        return None
+
+
+def created_at_datetime(doc: Doc) -> Change:
+    """created_at as a naive UTC datetime: ISO strings are parsed, missing
+    values are taken from the ObjectId's creation time"""
+    value = doc.get("created_at")
+    if isinstance(value, datetime):
+        return None
+    parsed = None
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        except ValueError:
+            pass
+        if parsed is not None and parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    if parsed is None:
+        parsed = _creation_time(doc)
+    return ({"created_at": parsed}, []) if parsed is not None else None
+
+
+NOT_A_DATE = {"$or": [{"created_at": {"$exists": False}}, {"created_at": {"$not": {"$type": "date"}}}]}
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "reviews: message -> comment", "reviews", review_comment, {"message": {"$exists": True}}),
+    Migration(2, "reviews: created_at as datetime", "reviews", created_at_datetime, NOT_A_DATE),
+    Migration(3, "portfolio: created_at as datetime", "portfolio", created_at_datetime, NOT_A_DATE),
+    Migration(4, "contacts: created_at as datetime", "contacts", created_at_datetime, NOT_A_DATE),
+    Migration(5, "quotes: created_at as datetime", "quotes", created_at_datetime, NOT_A_DATE),
+]
+
+
+# ----------------------------
+# Runner
+# ----------------------------
+async def status(storage) -> List[Doc]:
+    records = {record["_id"]: record for record in await storage.migrations.list()}
+    return [
+        {
+            "version": migration.version,
+            "name": migration.name,
+            "status": records.get(str(migration.version), {}).get("status", "pending"),
+            "modified": records.get(str(migration.version), {}).get("modified", 0),
+        }
+        for migration in MIGRATIONS
+    ]
+
+
+async def pending(storage) -> List[Migration]:
+    applied = {record["_id"] for record in await storage.migrations.list() if record.get("status") == "applied"}
+    return [migration for migration in MIGRATIONS if str(migration.version) not in applied]
+
+
+async def apply(storage, migration: Migration, batch_size: int, max_ops: float, dry_run: bool = False) -> Dict[str, Any]:
+    """Runs (or resumes) one migration; returns its counts"""
+    records = {record["_id"]: record for record in await storage.migrations.list()}
+    record = records.get(str(migration.version)) or {
+        "_id": str(migration.version),
+        "name": migration.name,
+        "status": "running",
+        "cursor": None,
+        "scanned": 0,
+        "modified": 0,
+        "started_at": datetime.utcnow(),
+    }
+    if dry_run:
+        record = dict(record, scanned=0, modified=0)
+    samples = []
+    cursor = record["cursor"]
+    while True:
+        started = time.monotonic()
+        batch = await storage.migrations.scan(migration.collection, cursor, batch_size, migration.query)
+        if not batch:
+            break
+        changes = []
+        for doc in batch:
+            change = migration.transform(doc)
+            if change is not None:
+                changes.append((doc["_id"], *change))
+        record["scanned"] += len(batch)
+        cursor = str(batch[-1]["_id"])
+        if dry_run:
+            record["modified"] += len(changes)
+            samples.extend(changes[:3 - len(samples)])
+        else:
+            record["modified"] += await storage.migrations.bulk_update(migration.collection, changes)
+            record["cursor"] = cursor
+            await storage.migrations.save(record)
+        if len(batch) < batch_size:
+            break
+        # Throttle: this batch's operations at no more than max_ops per second
+        await asyncio.sleep(max(0.0, len(batch) / max_ops - (time.monotonic() - started)))
+
+    if not dry_run:
+        record.update(status="applied", applied_at=datetime.utcnow())
+        await storage.migrations.save(record)
+    result = {"version": migration.version, "name": migration.name, "scanned": record["scanned"], "modified": record["modified"]}
+    if dry_run:
+        result["samples"] = [{"_id": str(doc_id), "set": set_fields, "unset": unset} for doc_id, set_fields, unset in samples]
+    return result
+
+
+async def run(
+    storage,
+    target: Optional[int] = None,
+    dry_run: bool = False,
+    batch_size: Optional[int] = None,
+    max_ops: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """Applies every pending migration up to `target` (all by default), in order"""
+    results = []
+    for migration in await pending(storage):
+        if target is not None and migration.version > target:
+            break
+        results.append(await apply(
+            storage, migration,
+            batch_size or settings.MIGRATION_BATCH_SIZE,
+            max_ops or settings.MIGRATION_MAX_OPS_PER_SECOND,
+            dry_run,
+        ))
+    return results
+
+
+async def mark_empty_applied(storage) -> List[Migration]:
+    """Records pending migrations of empty collections as applied; returns
+    the ones still pending"""
+    waiting = []
+    for migration in await pending(storage):
+        if await storage.migrations.scan(migration.collection, None, 1):
+            waiting.append(migration)
+            continue
+        now = datetime.utcnow()
+        await storage.migrations.save({
+            "_id": str(migration.version),
+            "name": migration.name,
+            "status": "applied",
+            "cursor": None,
+            "scanned": 0,
+            "modified": 0,
+            "started_at": now,
+            "applied_at": now,
+        })
+        logger.info(f"✅ Migration {migration.version} ({migration.name}) marked applied: {migration.collection} is empty")
+    return waiting
+
+
+async def warn_if_pending(storage):
+    """Startup check: the routers assume migrated data"""
+    try:
+        waiting = await mark_empty_applied(storage)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not check data migrations: {e!r}")
+        return
+    if waiting:
+        names = ", ".join(f"{m.version} ({m.name})" for m in waiting)
+        logger.warning(f"⚠️ Pending data migrations: {names}; run `python -m backend.migrations`")
+
+
+async def _main(args):
+    storage = await open_storage()
+    try:
+        if args.status:
+            for row in await status(storage):
+                print(f"{row['version']:>3}  {row['status']:<8} {row['name']} ({row['modified']} modified)")
+            return
+        results = await run(storage, args.target, args.dry_run, args.batch_size, args.max_ops)
+    finally:
+        await close_storage()
+    if not results:
+        print("✅ No pending migrations")
+    verb = "Would modify" if args.dry_run else "Modified"
+    for result in results:
+        print(f"🔧 {result['version']} {result['name']}: {verb} {result['modified']} of {result['scanned']} scanned")
+        for sample in result.get("samples", []):
+            print(f"    {sample}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply pending data migrations")
+    parser.add_argument("--dry-run", action="store_true", help="count and show sample changes without writing")
+    parser.add_argument("--status", action="store_true", help="list migrations and whether they are applied")
+    parser.add_argument("--target", type=int, help="stop after this version")
+    parser.add_argument("--batch-size", type=int, help=f"documents per batch (default {settings.MIGRATION_BATCH_SIZE})")
+    parser.add_argument("--max-ops", type=float, help=f"documents per second (default {settings.MIGRATION_MAX_OPS_PER_SECOND})")
+    asyncio.run(_main(parser.parse_args()))
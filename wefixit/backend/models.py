@@ -1,6 +1,7 @@
 # backend/models.py
 from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional, List
+from datetime import datetime
 from bson import ObjectId
 from pydantic.json_schema import JsonSchemaValue
 from pydantic_core import core_schema
@@ -49,7 +50,7 @@ class Review(BaseModel):
     rating: float  # 1–5, halves allowed
     comment: str
     published: bool = True
-    created_at: Optional[str] = None
+    created_at: Optional[datetime] = None
 
     model_config = ConfigDict(
         arbitrary_types_allowed=True,
@@ -67,7 +68,7 @@ class PortfolioItem(BaseModel):
     tags: Optional[List[str]] = []
     is_featured: bool = False
     is_active: bool = True
-    created_at: Optional[str] = None
+    created_at: Optional[datetime] = None
 
     model_config = ConfigDict(
         arbitrary_types_allowed=True,
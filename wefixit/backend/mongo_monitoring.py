@@ -0,0 +1,88 @@
+# backend/mongo_monitoring.py
+"""pymongo command listeners, registered when the Mongo client is created.
+
+Only imported from database.create_client(), so pymongo stays off the
+import path on the SQLite backend.
+"""
+from pymongo import monitoring
+
+from backend import tracing
+from backend.config import settings
+from backend.resilience import mongo_breaker
+from backend import slow_queries
+
+
+class BreakerListener(monitoring.CommandListener):
+    """Any answered command means the deployment is reachable again; this
+    is what closes a half-open Mongo circuit"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongo_breaker.record_success()
+
+    def failed(self, event):
+        pass  # command errors (duplicate key, ...) say nothing about availability
+
+
+class TracingListener(monitoring.CommandListener):
+    """A child span per command sent while a sampled request is active.
+    Events arrive on Motor's executor threads, which carry a copy of the
+    request's context, so the current span is the request's."""
+
+    def __init__(self):
+        self._spans = {}
+
+    def started(self, event):
+        parent = tracing.current_span()
+        if parent is None:
+            return
+        attributes = {"db.system": "mongodb", "db.name": event.database_name, "db.operation": event.command_name}
+        collection = event.command.get(event.command_name)
+        if isinstance(collection, str):
+            attributes["db.collection"] = collection
+        self._spans[(event.request_id, event.connection_id)] = parent.child(f"mongo.{event.command_name}", **attributes)
+
+    def succeeded(self, event):
+        span = self._spans.pop((event.request_id, event.connection_id), None)
+        if span is not None:
+            span.end()
+
+    def failed(self, event):
+        span = self._spans.pop((event.request_id, event.connection_id), None)
+        if span is not None:
+            span.attributes["db.error"] = str(event.failure.get("errmsg", ""))
+            span.status = "error"
+            span.end()
+
+
+class SlowQueryListener(monitoring.CommandListener):
+    """Hands commands slower than SLOW_QUERY_THRESHOLD_MS to the slow-query
+    log. Only the command's own fields are kept, and only for the command
+    types it records; its own writes and explains are not among them."""
+
+    def __init__(self, threshold_ms: float):
+        self.threshold_us = threshold_ms * 1000
+        self._commands = {}
+
+    def started(self, event):
+        if event.command_name in slow_queries.LOGGED and event.command.get(event.command_name) != slow_queries.COLLECTION:
+            self._commands[(event.request_id, event.connection_id)] = dict(event.command)
+
+    def succeeded(self, event):
+        command = self._commands.pop((event.request_id, event.connection_id), None)
+        if command is not None and event.duration_micros >= self.threshold_us:
+            slow_queries.slow_query_log.report(event.database_name, event.command_name, command, event.duration_micros / 1000)
+
+    def failed(self, event):
+        self._commands.pop((event.request_id, event.connection_id), None)
+
+
+def listeners():
+    registered = [BreakerListener()]
+    if settings.SLOW_QUERY_LOG_ENABLED:
+        registered.append(SlowQueryListener(settings.SLOW_QUERY_THRESHOLD_MS))
+    if settings.TRACE_EXPORTER != "none":
+        registered.append(TracingListener())
+    return registered
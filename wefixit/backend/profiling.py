@@ -0,0 +1,228 @@
+# backend/profiling.py
+"""On-demand profiling of a running worker (admin only, see routers/profiling.py).
+
+- CPU: a sampling profiler thread that reads every thread's stack with
+  `sys._current_frames()` at a fixed interval. Nothing is instrumented, so
+  the cost is one stack walk per interval, made while holding the GIL (the
+  profiled threads wait for it): keep the interval at 5-10 ms or more.
+  Output is the "folded stacks"
+  text format read by flamegraph.pl, speedscope and most flamegraph tools.
+- Memory: `tracemalloc` snapshots kept in memory, with top allocations and
+  diffs between two of them. Taking, grouping and comparing snapshots walks
+  every traced block, so the router runs them in a thread.
+- Per request: a request sent by an admin with the PROFILING_HEADER header
+  is sampled on its own; the profile is stored and its id is returned in
+  the same header.
+"""
+import asyncio
+import itertools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backend.auth import has_admin_token
+from backend.config import settings
+
+
+def _frame_name(code) -> str:
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _fold(frame) -> str:
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class Sampler:
+    """Counts the stacks seen every `interval` seconds, on the given threads
+    (all of them but itself by default)"""
+
+    def __init__(self, interval: float, thread_ids: Optional[Iterable[int]] = None):
+        self.interval = interval
+        self.thread_ids = set(thread_ids) if thread_ids is not None else None
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "Sampler":
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "Sampler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.monotonic() - self.started_at
+        return self
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            names.update((t.ident, t.name) for t in threading.enumerate())
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (self.thread_ids is not None and ident not in self.thread_ids):
+                    continue
+                self.stacks[f"{names.get(ident, ident)};{_fold(frame)}"] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+# ----------------------------
+# CPU
+# ----------------------------
+_cpu_lock = asyncio.Lock()
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+async def profile_for(seconds: float, interval: float, loop_only: bool) -> Sampler:
+    """Samples this worker for `seconds`; one profile at a time"""
+    if _cpu_lock.locked():
+        raise ProfilerBusy()
+    async with _cpu_lock:
+        sampler = Sampler(interval, [threading.get_ident()] if loop_only else None).start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            sampler.stop()
+        return sampler
+
+
+# Per-request profiles, newest last
+_request_profiles: "OrderedDict[str, Tuple[str, Sampler]]" = OrderedDict()
+_request_ids = itertools.count(1)
+
+
+def save_request_profile(description: str, sampler: Sampler) -> str:
+    profile_id = f"{os.getpid()}-{next(_request_ids)}"
+    _request_profiles[profile_id] = (description, sampler)
+    while len(_request_profiles) > settings.PROFILING_KEEP:
+        _request_profiles.popitem(last=False)
+    return profile_id
+
+
+def request_profile(profile_id: str) -> Optional[Tuple[str, Sampler]]:
+    return _request_profiles.get(profile_id)
+
+
+def request_profiles() -> List[Dict]:
+    return [
+        {"id": profile_id, "request": description, "samples": sampler.samples, "duration_ms": round(sampler.duration * 1000, 1)}
+        for profile_id, (description, sampler) in reversed(_request_profiles.items())
+    ]
+
+
+class ProfilingMiddleware:
+    """Samples the event loop thread for the duration of one request when
+    an admin sends PROFILING_HEADER. Other requests served concurrently
+    by this worker show up in the profile as well, so profile on a quiet
+    worker where possible."""
+
+    def __init__(self, app, header: str, interval: float):
+        self.app = app
+        self.header = header.lower().encode("latin-1")
+        self.interval = interval
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        if self.header not in headers or not has_admin_token(headers):
+            await self.app(scope, receive, send)
+            return
+
+        sampler = Sampler(self.interval, [threading.get_ident()]).start()
+        description = f"{scope['method']} {scope['path']}"
+        profile_id = None
+
+        async def send_wrapper(message):
+            nonlocal profile_id
+            if message["type"] == "http.response.start":
+                # The profile covers the handler; streaming the body is not included
+                profile_id = save_request_profile(description, sampler.stop())
+                message["headers"] = list(message.get("headers", [])) + [(self.header, profile_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if profile_id is None:
+                save_request_profile(description, sampler.stop())
+
+
+# ----------------------------
+# Memory
+# ----------------------------
+_snapshots: "OrderedDict[str, Tuple[float, tracemalloc.Snapshot]]" = OrderedDict()
+_snapshot_ids = itertools.count(1)
+
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+]
+
+
+def take_snapshot() -> str:
+    """Raises RuntimeError when tracemalloc is not tracing"""
+    snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+    snapshot_id = str(next(_snapshot_ids))
+    _snapshots[snapshot_id] = (time.time(), snapshot)
+    while len(_snapshots) > settings.PROFILING_KEEP:
+        _snapshots.popitem(last=False)
+    return snapshot_id
+
+
+def snapshot(snapshot_id: str) -> Optional[tracemalloc.Snapshot]:
+    entry = _snapshots.get(snapshot_id)
+    return entry[1] if entry else None
+
+
+def snapshots() -> List[Dict]:
+    return [{"id": snapshot_id, "taken_at": taken_at} for snapshot_id, (taken_at, _) in _snapshots.items()]
+
+
+def clear_snapshots():
+    _snapshots.clear()
+
+
+def _location(trace: tracemalloc.Traceback) -> List[str]:
+    return [f"{frame.filename}:{frame.lineno}" for frame in trace]
+
+
+def top_allocations(snap: tracemalloc.Snapshot, group_by: str, limit: int) -> List[Dict]:
+    return [
+        {"location": _location(stat.traceback), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+        for stat in snap.statistics(group_by)[:limit]
+    ]
+
+
+def diff_allocations(base: tracemalloc.Snapshot, current: tracemalloc.Snapshot, group_by: str, limit: int) -> List[Dict]:
+    return [
+        {
+            "location": _location(stat.traceback),
+            "size_kb": round(stat.size / 1024, 1),
+            "size_diff_kb": round(stat.size_diff / 1024, 1),
+            "count": stat.count,
+            "count_diff": stat.count_diff,
+        }
+        for stat in current.compare_to(base, group_by)[:limit]
+    ]
@@ -0,0 +1,109 @@
+# backend/refresh_tokens.py
+"""Rotating refresh tokens.
+
+`/auth/login` (one bcrypt check) starts a session: a token family. Each
+`/auth/refresh` consumes the presented refresh token and issues a new one
+in the same family together with a fresh access token. Checking a refresh
+token costs one lookup and an HMAC compare, no bcrypt.
+
+Tokens look like "<id>.<secret>". Only an HMAC of the secret is stored,
+so a leaked database does not yield usable tokens. A token that is
+presented again after it was rotated means someone kept a copy, and the
+whole family is revoked. Expired tokens are removed by a TTL index
+(Mongo) or purged on insert (SQLite).
+"""
+import hashlib
+import hmac
+import logging
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _hash(secret: str) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), secret.encode(), hashlib.sha256).hexdigest()
+
+
+def _utc(value: datetime) -> datetime:
+    # Mongo hands back naive UTC datetimes
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _invalid(detail: str = "Invalid refresh token") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED, detail=detail, headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
+async def issue(storage, username: str, family_id: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+    """A new refresh token for `username`; a new session unless `family_id` is given"""
+    token_id, secret = secrets.token_hex(16), secrets.token_urlsafe(32)
+    now = datetime.now(timezone.utc)
+    record = {
+        "_id": token_id,
+        "username": username,
+        "family_id": family_id or token_id,
+        "token_hash": _hash(secret),
+        "created_at": now,
+        "expires_at": now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        "used_at": None,
+        "replaced_by": None,
+        "revoked": False,
+    }
+    await storage.refresh_tokens.insert(record)
+    return f"{token_id}.{secret}", record
+
+
+async def _lookup(storage, token: str) -> Dict[str, Any]:
+    token_id, _, secret = token.partition(".")
+    record = await storage.refresh_tokens.get(token_id) if token_id and secret else None
+    if record is None or not hmac.compare_digest(record["token_hash"], _hash(secret)):
+        raise _invalid()
+    return record
+
+
+async def rotate(storage, token: str) -> Tuple[str, str]:
+    """Consumes `token`; returns (username, next refresh token). Raises 401
+    for unknown, expired or revoked tokens, and revokes the session when
+    an already rotated token comes back."""
+    record = await _lookup(storage, token)
+    now = datetime.now(timezone.utc)
+    if record["revoked"]:
+        raise _invalid("Session has been revoked")
+    if _utc(record["expires_at"]) <= now:
+        raise _invalid("Refresh token has expired")
+
+    if record["used_at"] is None:
+        next_token, next_record = await issue(storage, record["username"], record["family_id"])
+        if await storage.refresh_tokens.mark_used(record["_id"], now, next_record["_id"]):
+            return record["username"], next_token
+    # Reuse, or a lost race with another refresh of the same token: the
+    # family (including anything just issued) is no longer trusted
+    await storage.refresh_tokens.revoke_family(record["family_id"])
+    logger.warning(f"⚠️ Refresh token reuse for {record['username']}; session {record['family_id']} revoked")
+    raise _invalid("Refresh token was already used; please sign in again")
+
+
+async def revoke(storage, token: str) -> Optional[str]:
+    """Signs out the session `token` belongs to; returns its username"""
+    record = await _lookup(storage, token)
+    await storage.refresh_tokens.revoke_family(record["family_id"])
+    return record["username"]
+
+
+async def revoke_user(storage, username: str) -> int:
+    """Signs out every session of `username`"""
+    return await storage.refresh_tokens.revoke_user(username)
+
+
+async def sessions(storage, username: str) -> List[Dict[str, Any]]:
+    return [
+        {"session_id": record["family_id"], "last_refreshed_at": record["created_at"], "expires_at": record["expires_at"]}
+        for record in await storage.refresh_tokens.list_active(username, datetime.now(timezone.utc))
+    ]
@@ -15,6 +15,8 @@ async def reset_password():
     )
 
     if result.modified_count > 0:
+        # Sign out existing sessions (refresh tokens)
+        await db.refresh_tokens.update_many({"username": username}, {"$set": {"revoked": True}})
         print(f"✅ Password reset for '{username}'!")
     else:
         print(f"⚠️ No user found with username '{username}'.")
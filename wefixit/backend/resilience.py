@@ -0,0 +1,205 @@
+# backend/resilience.py
+import contextvars
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit is open")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Fails fast while a dependency is unhealthy.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls raise CircuitOpenError. Once `reset_timeout` has passed a single
+    trial call is let through (half-open): success closes the circuit,
+    failure opens it again. Thread-safe, since Mongo command events and
+    SMTP sends report from worker threads.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            now = time.monotonic()
+            if self.state == OPEN:
+                waited = now - self._opened_at
+                if waited < self.reset_timeout:
+                    raise CircuitOpenError(self.name, self.reset_timeout - waited)
+                self.state = HALF_OPEN
+                self._probe_at = now
+                logger.info(f"🔌 {self.name} circuit half-open, probing")
+                return
+            # Half-open: one trial at a time; let another through if it never reported back
+            if now - self._probe_at < self.reset_timeout:
+                raise CircuitOpenError(self.name, self.reset_timeout - (now - self._probe_at))
+            self._probe_at = now
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            if self.state != CLOSED:
+                self.state = CLOSED
+                logger.info(f"✅ {self.name} circuit closed")
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning(f"⚠️ {self.name} circuit opened after {self.failures} failure(s)")
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = {"state": self.state, "failures": self.failures}
+            if self.state == OPEN:
+                snapshot["retry_in"] = round(max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)), 1)
+            return snapshot
+
+
+breakers: Dict[str, CircuitBreaker] = {}
+
+
+def _breaker(name: str) -> CircuitBreaker:
+    breakers[name] = CircuitBreaker(name, settings.BREAKER_FAILURE_THRESHOLD, settings.BREAKER_RESET_SECONDS)
+    return breakers[name]
+
+
+mongo_breaker = _breaker("mongo")
+smtp_breaker = _breaker("smtp")
+
+
+def is_transient_mongo_error(exc: BaseException) -> bool:
+    """Connection trouble or a blown deadline, as opposed to e.g. a duplicate key"""
+    from pymongo.errors import ConnectionFailure, ExecutionTimeout, PyMongoError, WTimeoutError
+    if not isinstance(exc, PyMongoError):
+        return False
+    return isinstance(exc, (ConnectionFailure, ExecutionTimeout, WTimeoutError)) or exc.timeout
+
+
+# ----------------------------
+# Per-request deadline
+# ----------------------------
+class DeadlineMiddleware:
+    """Gives every request a time budget that pymongo applies to each
+    operation it runs (as maxTimeMS, and to server selection / socket
+    waits) via `pymongo.timeout()`. Database outages and blown deadlines
+    become a quick 503/504 instead of a hung worker slot, and open the
+    Mongo circuit breaker.
+
+    The clock starts once the request body has been received, so a slow
+    client upload is not counted as database time. Long-lived streams
+    (SSE) are listed in `exclude_paths`.
+    """
+
+    def __init__(self, app, deadline: float, exclude_paths: List[str]):
+        self.app = app
+        self.deadline = deadline
+        self.exclude_paths = tuple(exclude_paths)
+        # The middleware stack is built on the first request, so this
+        # import stays off the cold-start path
+        import pymongo
+        self._timeout = pymongo.timeout
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        started = False
+        deadline = None
+
+        def start_deadline():
+            nonlocal deadline
+            if deadline is None:
+                deadline = self._timeout(self.deadline)
+                deadline.__enter__()
+
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] == "http.request" and not message.get("more_body", False):
+                start_deadline()
+            return message
+
+        async def send_wrapper(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        if not _has_body(scope):
+            start_deadline()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        except CircuitOpenError as e:
+            if started:
+                raise
+            await _error_response(send, 503, f"{e.name} is unavailable", retry_after=e.retry_after)
+        except Exception as e:
+            if not is_transient_mongo_error(e):
+                raise
+            mongo_breaker.record_failure()
+            logger.error(f"❌ Database call failed for {scope['path']}: {e!r}")
+            if started:
+                raise
+            if getattr(e, "timeout", False):
+                await _error_response(send, 504, "Database deadline exceeded")
+            else:
+                await _error_response(send, 503, "Database is unavailable", retry_after=settings.BREAKER_RESET_SECONDS)
+        finally:
+            if deadline is not None:
+                try:
+                    deadline.__exit__(None, None, None)
+                except ValueError:
+                    pass  # the body was read from another context (a task); nothing was set here
+
+
+def _has_body(scope) -> bool:
+    headers = dict(scope["headers"])
+    return b"transfer-encoding" in headers or headers.get(b"content-length", b"0") not in (b"", b"0")
+
+
+def detached_context() -> contextvars.Context:
+    """A copy of the current context for work that outlives the request
+    (background tasks, outbox jobs): spans and the request id carry over,
+    the request's database deadline does not"""
+    import pymongo
+    context = contextvars.copy_context()
+    context.run(pymongo.timeout(None).__enter__)  # TIMEOUT=None turns the deadline off
+    return context
+
+
+async def _error_response(send, status: int, detail: str, retry_after: Optional[float] = None):
+    body = json.dumps({"detail": detail}).encode()
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    if retry_after is not None:
+        headers.append((b"retry-after", str(max(1, int(retry_after + 0.999))).encode()))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,41 @@
+# backend/routers/analytics.py
+from datetime import datetime, timedelta
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from backend import analytics
+from backend.deps import get_current_admin
+from backend.storage import storage_profile
+
+router = APIRouter(tags=["admin"], dependencies=[Depends(get_current_admin)])
+
+admin_storage = storage_profile("admin")
+
+DEFAULT_SPAN = {"day": timedelta(days=30), "hour": timedelta(hours=48)}
+MAX_SPAN = {"day": timedelta(days=3 * 366), "hour": timedelta(days=31)}
+
+
+@router.get("/")
+async def quote_analytics(
+    granularity: Literal["day", "hour"] = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    storage=Depends(admin_storage),
+):
+    """Quotes per service type, budget band and timeline, plus contact
+    volume, per bucket and in total. Naive times are UTC; defaults to the
+    last 30 days (or 48 hours)."""
+    end = _naive_utc(end) if end else datetime.utcnow()
+    start = _naive_utc(start) if start else end - DEFAULT_SPAN[granularity]
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if end - start > MAX_SPAN[granularity]:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SPAN[granularity].days} days of {granularity} buckets")
+    return await analytics.report(storage, granularity, start, end)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = (value - value.utcoffset()).replace(tzinfo=None)
+    return value
@@ -2,17 +2,41 @@
 # backend/routers/auth.py
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import OAuth2PasswordRequestForm
-from datetime import timedelta
+from typing import Optional
+from pydantic import BaseModel
 
-from backend.auth import authenticate_admin, create_access_token
+from backend import refresh_tokens
+from backend.auth import authenticate_admin, create_access_token, get_admin_by_username
 from backend.config import settings
 from backend.deps import get_current_admin  # Import from deps.py
+from backend.storage import storage_profile
 
 router = APIRouter(tags=["auth"])
 
+# Read/write profile per kind of route (see database.PROFILES)
+admin_storage = storage_profile("admin")
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+def _token_response(username: str, refresh_token: str) -> dict:
+    return {
+        "access_token": create_access_token(subject=username),
+        "token_type": "Bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        "refresh_token": refresh_token,
+        "refresh_expires_in": settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+    }
+
+
 # Login endpoint
 @router.post("/login")
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login_for_access_token(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    storage=Depends(admin_storage),
+):
     user = await authenticate_admin(form_data.username, form_data.password)
     if not user:
         raise HTTPException(
@@ -21,6 +45,41 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(subject=user["username"])
-    return {"access_token": access_token, "token_type": "Bearer"}
\ No newline at end of file
+    refresh_token, _ = await refresh_tokens.issue(storage, user["username"])
+    return _token_response(user["username"], refresh_token)
+
+
+# Refresh endpoint: new access + refresh token pair, no password (or bcrypt) involved
+@router.post("/refresh")
+async def refresh_access_token(body: RefreshRequest, storage=Depends(admin_storage)):
+    username, refresh_token = await refresh_tokens.rotate(storage, body.refresh_token)
+    if not await get_admin_by_username(username):
+        await refresh_tokens.revoke_user(storage, username)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Admin not found")
+    return _token_response(username, refresh_token)
+
+
+# Logout: ends the session the refresh token belongs to
+@router.post("/logout")
+async def logout(body: RefreshRequest, storage=Depends(admin_storage)):
+    await refresh_tokens.revoke(storage, body.refresh_token)
+    return {"message": "Signed out"}
+
+
+# Sessions (refresh token families) of an admin; access tokens already
+# issued stay valid until they expire (ACCESS_TOKEN_EXPIRE_MINUTES)
+@router.get("/sessions")
+async def list_sessions(admin=Depends(get_current_admin), storage=Depends(admin_storage)):
+    return await refresh_tokens.sessions(storage, admin["username"])
+
+
+@router.delete("/sessions")
+async def revoke_sessions(
+    username: Optional[str] = None,
+    admin=Depends(get_current_admin),
+    storage=Depends(admin_storage),
+):
+    """Sign out every session of `username` (default: yourself)"""
+    username = username or admin["username"]
+    revoked = await refresh_tokens.revoke_user(storage, username)
+    return {"message": f"Revoked {revoked} session token(s) for {username}", "revoked": revoked}
\ No newline at end of file
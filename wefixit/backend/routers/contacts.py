@@ -1,25 +1,28 @@
 # backend/routers/contacts.py
-from fastapi import APIRouter, Depends, HTTPException
+import logging
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from pydantic import BaseModel, EmailStr
-from bson import ObjectId
 from datetime import datetime
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-import os
-from dotenv import load_dotenv
+from typing import Optional
 
-from backend.database import get_db
+from backend import analytics, idempotency, jobs
+from backend.config import settings
+from backend.storage import storage_profile
+from backend.digest import digest
+from backend.mailer import outbox, send_email
 from .auth import get_current_admin
 
-load_dotenv()
+logger = logging.getLogger(__name__)
+
 router = APIRouter(tags=["contacts"])
 
+# Read/write profile per kind of route (see database.PROFILES)
+admin_storage = storage_profile("admin")
+submission_storage = storage_profile("submission")
+
 # --- Email Settings ---
-EMAIL_USER = os.getenv("EMAIL_USER")
-EMAIL_PASS = os.getenv("EMAIL_PASSWORD")
-EMAIL_TO = os.getenv("EMAIL_TO")
-EMAIL_FROM_NAME = os.getenv("EMAIL_FROM_NAME", "Savanna Designs Contact")
+EMAIL_FROM_NAME = settings.EMAIL_FROM_NAME or "Savanna Designs Contact"
 
 # --- Models ---
 class ContactCreate(BaseModel):
@@ -31,73 +34,101 @@ class ContactCreate(BaseModel):
     message: str
 
 # --- Email helper ---
-def send_contact_email(contact: dict):
-    try:
-        subject = f"📧 New Contact Form Submission from {contact['firstName']} {contact['lastName']}"
-        body = f"""
-        You received a new contact form submission:
+def contact_email(contact: dict):
+    """(subject, body) of the admin notification for one contact"""
+    subject = f"📧 New Contact Form Submission from {contact['firstName']} {contact['lastName']}"
+    body = f"""
+    You received a new contact form submission:
 
-        Name: {contact['firstName']} {contact['lastName']}
-        Email: {contact['email']}
-        Company: {contact.get('company', '')}
-        Subject: {contact['subject']}
+    Name: {contact['firstName']} {contact['lastName']}
+    Email: {contact['email']}
+    Company: {contact.get('company', '')}
+    Subject: {contact['subject']}
 
-        Message:
-        {contact['message']}
+    Message:
+    {contact['message']}
 
-        Submitted at: {contact['created_at']}
-        """
+    Submitted at: {contact['created_at']}
+    """
+    return subject, body
 
-        msg = MIMEMultipart()
-        msg["From"] = f"{EMAIL_FROM_NAME} <{EMAIL_USER}>"
-        msg["To"] = EMAIL_TO
-        msg["Subject"] = subject
-        msg.attach(MIMEText(body, "plain"))
 
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-            server.login(EMAIL_USER, EMAIL_PASS)
-            server.sendmail(EMAIL_USER, EMAIL_TO, msg.as_string())
+def send_contact_email(contact: dict):
+    try:
+        subject, body = contact_email(contact)
+        send_email(settings.EMAIL_TO, subject, body, EMAIL_FROM_NAME)
 
-        print("[✅] Contact email sent successfully")
+        logger.info("✅ Contact email sent")
 
     except Exception as e:
-        print(f"[❌] Failed to send contact email: {e}")
+        logger.error(f"❌ Failed to send contact email: {e!r}")
+
+@jobs.job("email.contact", queue="email")
+def deliver_contact_email(contact: dict):
+    """Job version of send_contact_email: raises so the runner retries"""
+    subject, body = contact_email(contact)
+    send_email(settings.EMAIL_TO, subject, body, EMAIL_FROM_NAME)
+
 
 # --- Routes ---
 @router.post("/", response_model=dict)
-async def create_contact(contact: ContactCreate, db=Depends(get_db)):
+async def create_contact(
+    contact: ContactCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    storage=Depends(submission_storage)
+):
     contact_dict = contact.dict()
+    claim = await idempotency.claim(storage, "contacts", contact_dict, idempotency_key)
+    if claim.replay is not None:
+        response.headers["Idempotent-Replayed"] = "true"
+        return claim.replay
+
     contact_dict["created_at"] = datetime.utcnow()
     contact_dict["read"] = False  # Track if admin has read this
 
-    result = await db["contacts"].insert_one(contact_dict)
-    contact_dict["_id"] = str(result.inserted_id)
-
-    # Send notification email
-    send_contact_email(contact_dict)
-
-    return {"message": "Contact form submitted successfully", "contact": contact_dict}
+    try:
+        await storage.contacts.create(contact_dict)
+    except Exception:
+        await claim.release()
+        raise
+    await analytics.record_contact(storage, contact_dict)
+    contact_dict["_id"] = str(contact_dict["_id"])
+
+    # Notify the admin: batched into the digest when enabled, else sent off the request path
+    if not digest.add(*contact_email(contact_dict)):
+        if not await jobs.try_enqueue("email.contact", contact_dict):
+            outbox.submit(send_contact_email, dict(contact_dict))
+
+    body = {"message": "Contact form submitted successfully", "contact": contact_dict}
+    await claim.complete(body)
+    return body
 
 @router.get("/", response_model=list)
-async def get_contacts(db=Depends(get_db), user=Depends(get_current_admin)):
-    contacts = await db["contacts"].find().sort("created_at", -1).to_list(100)
+async def get_contacts(
+    archived: bool = False,
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    storage=Depends(admin_storage),
+    user=Depends(get_current_admin),
+):
+    # Handled contacts older than ARCHIVE_AFTER_DAYS live in the archive
+    if archived:
+        contacts = await storage.contacts.list_archived(limit, offset)
+    else:
+        contacts = await storage.contacts.list(limit, offset)
     for contact in contacts:
         contact["_id"] = str(contact["_id"])
     return contacts
 
 @router.delete("/{contact_id}")
-async def delete_contact(contact_id: str, db=Depends(get_db), user=Depends(get_current_admin)):
-    result = await db["contacts"].delete_one({"_id": ObjectId(contact_id)})
-    if result.deleted_count == 0:
+async def delete_contact(contact_id: str, storage=Depends(admin_storage), user=Depends(get_current_admin)):
+    if not await storage.contacts.delete(contact_id):
         raise HTTPException(status_code=404, detail="Contact not found")
     return {"message": "Contact deleted successfully"}
 
 @router.put("/{contact_id}/read")
-async def mark_as_read(contact_id: str, db=Depends(get_db), user=Depends(get_current_admin)):
-    result = await db["contacts"].update_one(
-        {"_id": ObjectId(contact_id)},
-        {"$set": {"read": True}}
-    )
-    if result.matched_count == 0:
+async def mark_as_read(contact_id: str, storage=Depends(admin_storage), user=Depends(get_current_admin)):
+    if not await storage.contacts.mark_read(contact_id):
         raise HTTPException(status_code=404, detail="Contact not found")
     return {"message": "Contact marked as read"}
\ No newline at end of file
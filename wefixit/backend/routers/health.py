@@ -0,0 +1,38 @@
+# backend/routers/health.py
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+from backend import admission
+from backend.health import monitor, DOWN
+from backend.resilience import breakers
+
+router = APIRouter(tags=["system"])
+
+
+@router.get("/live")
+async def liveness():
+    """The worker's event loop is answering; no dependency checks"""
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def readiness(request: Request):
+    """Served from the background monitor's cached state"""
+    if not request.app.state.ready:
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    snapshot = monitor.snapshot()
+    if snapshot["status"] in (DOWN, "starting"):
+        return JSONResponse(status_code=503, content=snapshot)
+    return snapshot
+
+
+@router.get("/breakers")
+async def circuit_breakers():
+    """State of the Mongo / SMTP circuit breakers in this worker"""
+    return {name: breaker.snapshot() for name, breaker in breakers.items()}
+
+
+@router.get("/admission")
+async def admission_control():
+    """Per route class limits, queue depth and rejections in this worker"""
+    return admission.snapshot()
@@ -0,0 +1,25 @@
+# backend/routers/home.py
+from fastapi import APIRouter, Request, Response
+
+from backend.config import settings
+from backend.home import home_page
+
+router = APIRouter(tags=["home"])
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+@router.get("")
+async def home(request: Request):
+    """Everything the landing page needs in one cached, ETag'd response:
+    featured portfolio items, latest published reviews, review stats and
+    projects"""
+    body, etag = await home_page.get()
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={settings.HOME_CACHE_MAX_AGE}"}
+    if _matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,57 @@
+# backend/routers/live.py
+import asyncio
+import json
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query, Request
+from fastapi.responses import StreamingResponse
+
+from backend.auth import create_sse_ticket
+from backend.config import settings
+from backend.deps import get_current_admin, get_current_admin_sse
+from backend.live import live_feed
+
+router = APIRouter(tags=["live"])
+
+
+@router.post("/events/ticket")
+async def events_ticket(admin=Depends(get_current_admin)):
+    """A single-use ticket for `GET /events?ticket=...`, so the access token
+    never appears in a URL (and so in access logs)"""
+    return {"ticket": create_sse_ticket(admin["username"]), "expires_in": settings.SSE_TICKET_EXPIRE_SECONDS}
+
+
+@router.get("/events")
+async def dashboard_events(
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    resume_from: Optional[str] = Query(None, alias="last_event_id"),
+    _admin=Depends(get_current_admin_sse),
+):
+    """Server-Sent Events stream of new/changed contacts, quotes and reviews.
+    Change stream events have an `id:`; reconnecting clients send it back
+    as Last-Event-ID, or as ?last_event_id= when they open a new
+    EventSource with a fresh ticket, and the feed can resume from there"""
+
+    async def stream():
+        queue = live_feed.subscribe(last_event_id or resume_from)
+        try:
+            yield f"retry: {settings.LIVE_RETRY_SECONDS * 1000:.0f}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), settings.LIVE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                data = {key: value for key, value in event.items() if key != "event_id"}
+                event_id = f"id: {event['event_id']}\n" if event.get("event_id") else ""
+                yield f"{event_id}event: {event['collection']}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            live_feed.unsubscribe(queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
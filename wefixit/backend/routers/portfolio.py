@@ -5,15 +5,23 @@ from fastapi import (
 )
 from bson import ObjectId
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 import base64
 
-from backend.database import get_db
-from backend.schemas import PortfolioOut
-from backend.deps import get_current_admin
+from backend.storage import storage_profile
+from backend.schemas import FacetCount, PortfolioFacets, PortfolioOut
+from backend.deps import batch_fields, batch_ids, batch_result, get_current_admin, split_values
+from backend.home import PORTFOLIO_FIELDS, home_page
+from backend.snapshots import publisher
+from backend.tracing import span
+from backend.upload_gc import portfolio_owner, track_uploads
 
 router = APIRouter(tags=["portfolio"])
 
+# Read/write profile per kind of route (see database.PROFILES)
+admin_storage = storage_profile("admin")
+public_storage = storage_profile("public")
+
 # Allowed image extensions
 ALLOWED_EXTENSIONS = [".jpg", ".jpeg", ".png", ".gif", ".webp"]
 
@@ -26,11 +34,12 @@ def _doc_to_portfolio_out(doc: Dict[str, Any]) -> PortfolioOut:
         title=doc["title"],
         description=doc.get("description"),
         image=doc.get("image"),  # Base64 string
+        category=doc.get("category"),
         link=doc.get("link"),
         tags=doc.get("tags", []),
         is_featured=bool(doc.get("is_featured", False)),
         is_active=bool(doc.get("is_active", True)),
-        created_at=doc.get("created_at", datetime.now(timezone.utc)),
+        created_at=doc["created_at"],
     )
 
 
@@ -41,8 +50,11 @@ def _encode_image_to_base64(image: UploadFile) -> str:
             status_code=400,
             detail="Invalid image type. Allowed: jpg, jpeg, png, gif, webp"
         )
-    content = image.file.read()
-    encoded = base64.b64encode(content).decode("utf-8")
+    with span("image.encode_base64", **{"image.ext": ext}) as current:
+        content = image.file.read()
+        encoded = base64.b64encode(content).decode("utf-8")
+        if current is not None:
+            current.attributes["image.bytes"] = len(content)
     return f"data:image/{ext};base64,{encoded}"
 
 
@@ -53,32 +65,56 @@ def _encode_image_to_base64(image: UploadFile) -> str:
 async def list_portfolio(
     is_active: Optional[bool] = None,
     is_featured: Optional[bool] = None,
+    category: Optional[str] = None,
+    tags: Optional[List[str]] = Query(None, description="?tags=a&tags=b or ?tags=a,b"),
+    tags_match: Literal["any", "all"] = "any",
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    db=Depends(get_db)
+    storage=Depends(public_storage)
 ):
-    q: Dict[str, Any] = {}
-    if is_active is not None:
-        q["is_active"] = is_active
-    if is_featured is not None:
-        q["is_featured"] = is_featured
+    total, docs = await storage.portfolio.list(
+        is_active=is_active, is_featured=is_featured, limit=limit, offset=offset,
+        category=category, tags=split_values(tags), match_all_tags=tags_match == "all",
+    )
+    items: List[PortfolioOut] = [_doc_to_portfolio_out(doc) for doc in docs]
 
-    total = await db.portfolio.count_documents(q)
-    cursor = db.portfolio.find(q).sort("created_at", -1).skip(offset).limit(limit)
+    return {"total": total, "limit": limit, "offset": offset, "items": items}
 
-    items: List[PortfolioOut] = []
-    async for doc in cursor:
-        items.append(_doc_to_portfolio_out(doc))
 
-    return {"total": total, "limit": limit, "offset": offset, "items": items}
+@router.get("/facets", response_model=PortfolioFacets)
+async def portfolio_facets(
+    is_active: Optional[bool] = True,
+    is_featured: Optional[bool] = None,
+    storage=Depends(public_storage)
+):
+    """Item counts per category and per tag, for the gallery filters"""
+    facets = await storage.portfolio.facets(is_active=is_active, is_featured=is_featured)
+    return PortfolioFacets(
+        total=facets["total"],
+        categories=[FacetCount(value=value, count=count) for value, count in facets["categories"]],
+        tags=[FacetCount(value=value, count=count) for value, count in facets["tags"]],
+    )
+
+
+@router.get("/batch", response_model=dict)
+async def get_portfolio_items(
+    ids: List[str] = Depends(batch_ids),
+    fields: Optional[List[str]] = Query(None, description="only these fields, e.g. ?fields=title,image"),
+    storage=Depends(public_storage)
+):
+    """Several items in one request and one query, in the order asked for;
+    ids that do not exist (or are malformed) are listed under "missing" """
+    fields = batch_fields(fields, PORTFOLIO_FIELDS)
+    docs = await storage.portfolio.get_many(ids, fields=fields or None)
+    return batch_result(ids, docs, fields, _doc_to_portfolio_out)
 
 
 @router.get("/{item_id}", response_model=PortfolioOut)
-async def get_portfolio_item(item_id: str, db=Depends(get_db)):
+async def get_portfolio_item(item_id: str, storage=Depends(public_storage)):
     if not ObjectId.is_valid(item_id):
         raise HTTPException(status_code=404, detail="Item not found")
 
-    doc = await db.portfolio.find_one({"_id": ObjectId(item_id)})
+    doc = await storage.portfolio.get(item_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Item not found")
 
@@ -91,17 +127,19 @@ async def create_portfolio_item(
     description: Optional[str] = Form(None),
     category: Optional[str] = Form(None),
     link: Optional[str] = Form(None),
+    tags: Optional[str] = Form(None),  # comma-separated
     is_featured: bool = Form(False),
     is_active: bool = Form(True),
     image: Optional[UploadFile] = File(None),
     _admin=Depends(get_current_admin),
-    db=Depends(get_db)
+    storage=Depends(admin_storage)
 ):
     data = {
         "title": title,
         "description": description,
         "category": category,
         "link": link,
+        "tags": split_values([tags] if tags else []),
         "is_featured": is_featured,
         "is_active": is_active,
         "created_at": datetime.now(timezone.utc),
@@ -113,8 +151,10 @@ async def create_portfolio_item(
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to encode image: {str(e)}")
 
-    result = await db.portfolio.insert_one(data)
-    new_doc = await db.portfolio.find_one({"_id": result.inserted_id})
+    new_doc = await storage.portfolio.create(data)
+    await track_uploads(storage, portfolio_owner(new_doc["_id"]), new_doc)
+    home_page.invalidate()
+    publisher.schedule()
     return _doc_to_portfolio_out(new_doc)
 
 
@@ -125,11 +165,12 @@ async def update_portfolio_item(
     description: Optional[str] = Form(None),
     category: Optional[str] = Form(None),
     link: Optional[str] = Form(None),
+    tags: Optional[str] = Form(None),  # comma-separated; "" clears
     is_featured: Optional[bool] = Form(None),
     is_active: Optional[bool] = Form(None),
     image: Optional[UploadFile] = File(None),
     _admin=Depends(get_current_admin),
-    db=Depends(get_db)
+    storage=Depends(admin_storage)
 ):
     if not ObjectId.is_valid(item_id):
         raise HTTPException(status_code=404, detail="Item not found")
@@ -143,6 +184,8 @@ async def update_portfolio_item(
         updates["category"] = category
     if link is not None:
         updates["link"] = link
+    if tags is not None:
+        updates["tags"] = split_values([tags])
     if is_featured is not None:
         updates["is_featured"] = is_featured
     if is_active is not None:
@@ -151,22 +194,25 @@ async def update_portfolio_item(
     if image:
         updates["image"] = _encode_image_to_base64(image)
 
-    if updates:
-        result = await db.portfolio.update_one({"_id": ObjectId(item_id)}, {"$set": updates})
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Item not found")
+    doc = await storage.portfolio.update(item_id, updates)
+    if doc is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    await track_uploads(storage, portfolio_owner(item_id), doc)
 
-    doc = await db.portfolio.find_one({"_id": ObjectId(item_id)})
+    home_page.invalidate()
+    publisher.schedule()
     return _doc_to_portfolio_out(doc)
 
 
 @router.delete("/{item_id}", response_model=dict)
-async def delete_portfolio_item(item_id: str, _admin=Depends(get_current_admin), db=Depends(get_db)):
+async def delete_portfolio_item(item_id: str, _admin=Depends(get_current_admin), storage=Depends(admin_storage)):
     if not ObjectId.is_valid(item_id):
         raise HTTPException(status_code=404, detail="Item not found")
 
-    result = await db.portfolio.delete_one({"_id": ObjectId(item_id)})
-    if result.deleted_count == 0:
+    if not await storage.portfolio.delete(item_id):
         raise HTTPException(status_code=404, detail="Item not found")
+    await track_uploads(storage, portfolio_owner(item_id))
 
+    home_page.invalidate()
+    publisher.schedule()
     return {"message": "Portfolio item deleted successfully"}
@@ -0,0 +1,116 @@
+# backend/routers/profiling.py
+import asyncio
+import tracemalloc
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from backend import profiling
+from backend.deps import get_current_admin
+
+router = APIRouter(tags=["admin"], dependencies=[Depends(get_current_admin)])
+
+GroupBy = Literal["lineno", "filename", "traceback"]
+
+
+def _profile_response(sampler: profiling.Sampler) -> PlainTextResponse:
+    return PlainTextResponse(
+        sampler.folded(),
+        headers={"X-Profile-Samples": str(sampler.samples), "X-Profile-Duration-Ms": str(round(sampler.duration * 1000, 1))},
+    )
+
+
+# ----------------------------
+# CPU
+# ----------------------------
+@router.get("/cpu", response_class=PlainTextResponse)
+async def cpu_profile(
+    seconds: float = Query(10, gt=0, le=120),
+    interval_ms: float = Query(5, ge=1, le=1000),
+    threads: Literal["loop", "all"] = "loop",
+):
+    """Samples this worker for `seconds` and returns folded stacks
+    (flamegraph.pl / speedscope input). `threads=all` includes Motor's and
+    to_thread() worker threads."""
+    try:
+        sampler = await profiling.profile_for(seconds, interval_ms / 1000, loop_only=threads == "loop")
+    except profiling.ProfilerBusy:
+        raise HTTPException(status_code=409, detail="A profile is already running on this worker")
+    return _profile_response(sampler)
+
+
+@router.get("/requests")
+async def list_request_profiles():
+    """Profiles of single requests sent with the profiling header"""
+    return profiling.request_profiles()
+
+
+@router.get("/requests/{profile_id}", response_class=PlainTextResponse)
+async def get_request_profile(profile_id: str):
+    entry = profiling.request_profile(profile_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Profile not found (it may be on another worker)")
+    return _profile_response(entry[1])
+
+
+# ----------------------------
+# Memory
+# ----------------------------
+@router.post("/memory/start")
+async def start_memory_tracing(frames: int = Query(10, ge=1, le=100)):
+    """Starts tracemalloc; allocations made before this are not seen"""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    return {"tracing": True, "frames": tracemalloc.get_traceback_limit()}
+
+
+@router.post("/memory/stop")
+async def stop_memory_tracing():
+    """Stops tracemalloc (and its overhead) and drops the snapshots"""
+    tracemalloc.stop()
+    profiling.clear_snapshots()
+    return {"tracing": False}
+
+
+@router.post("/memory/snapshots")
+async def take_memory_snapshot(top: int = Query(20, ge=1, le=500), group_by: GroupBy = "lineno"):
+    if not tracemalloc.is_tracing():
+        raise HTTPException(status_code=409, detail="Memory tracing is off; POST /memory/start first")
+    # Off the event loop: both walk every traced allocation
+    snapshot_id = await asyncio.to_thread(profiling.take_snapshot)
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "id": snapshot_id,
+        "traced_kb": round(current / 1024, 1),
+        "peak_kb": round(peak / 1024, 1),
+        "top": await asyncio.to_thread(profiling.top_allocations, profiling.snapshot(snapshot_id), group_by, top),
+    }
+
+
+@router.get("/memory/snapshots")
+async def list_memory_snapshots():
+    return profiling.snapshots()
+
+
+@router.get("/memory/snapshots/{snapshot_id}")
+async def get_memory_snapshot(snapshot_id: str, top: int = Query(20, ge=1, le=500), group_by: GroupBy = "lineno"):
+    snap = profiling.snapshot(snapshot_id)
+    if snap is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return {"id": snapshot_id, "top": await asyncio.to_thread(profiling.top_allocations, snap, group_by, top)}
+
+
+@router.get("/memory/diff")
+async def diff_memory_snapshots(
+    base: str,
+    current: str,
+    top: int = Query(20, ge=1, le=500),
+    group_by: GroupBy = "lineno",
+):
+    """What grew (or shrank) between two snapshots, largest change first"""
+    base_snap, current_snap = profiling.snapshot(base), profiling.snapshot(current)
+    if base_snap is None or current_snap is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    diff = await asyncio.to_thread(profiling.diff_allocations, base_snap, current_snap, group_by, top)
+    return {"base": base, "current": current, "diff": diff}
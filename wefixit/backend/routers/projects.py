@@ -1,15 +1,16 @@
 #projects.py
 from fastapi import APIRouter, Depends
-from backend.database import get_db
-from bson import ObjectId
+from backend.storage import storage_profile
 
 router = APIRouter(tags=["projects"])
 
+# Read/write profile per kind of route (see database.PROFILES)
+public_storage = storage_profile("public")
+
 @router.get("/")
-async def list_projects(db=Depends(get_db)):
+async def list_projects(storage=Depends(public_storage)):
     projects = []
-    cursor = db.projects.find({})
-    async for doc in cursor:
+    for doc in await storage.projects.list():
         projects.append({
             "_id": str(doc["_id"]),
             "name": doc["name"],
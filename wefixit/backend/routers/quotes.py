@@ -1,25 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+import logging
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from pydantic import BaseModel, EmailStr
-from bson import ObjectId
-from typing import List
+from typing import List, Optional
 from datetime import datetime
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-import os
-from dotenv import load_dotenv
 
-from backend.database import get_db
+from backend import analytics, idempotency, jobs
+from backend.config import settings
+from backend.storage import storage_profile
+from backend.digest import digest
+from backend.mailer import outbox, send_email
 from .auth import get_current_admin
 
-load_dotenv()
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+# Read/write profile per kind of route (see database.PROFILES)
+admin_storage = storage_profile("admin")
+submission_storage = storage_profile("submission")
+
 # --- Email Settings ---
-EMAIL_USER = os.getenv("EMAIL_USER")
-EMAIL_PASS = os.getenv("EMAIL_PASSWORD")
-EMAIL_TO = os.getenv("EMAIL_TO")
-EMAIL_FROM_NAME = os.getenv("EMAIL_FROM_NAME", "WeFixIt Quotes")
+EMAIL_FROM_NAME = settings.EMAIL_FROM_NAME or "WeFixIt Quotes"
 
 # --- Models ---
 class Quote(BaseModel):
@@ -44,84 +46,117 @@ class Reply(BaseModel):
 
 
 # --- Email helper ---
-def send_quote_email(quote: dict):
-    try:
-        subject = f"📩 New Quote Request from {quote['name']}"
-        body = f"""
-        You received a new quote request:
+def quote_email(quote: dict):
+    """(subject, body) of the admin notification for one quote"""
+    subject = f"📩 New Quote Request from {quote['name']}"
+    body = f"""
+    You received a new quote request:
 
-        Name: {quote['name']}
-        Email: {quote['email']}
-        Phone: {quote.get('phone', '')}
-        Company: {quote.get('company', '')}
+    Name: {quote['name']}
+    Email: {quote['email']}
+    Phone: {quote.get('phone', '')}
+    Company: {quote.get('company', '')}
 
-        Service: {quote['serviceType']}
-        Project Title: {quote['projectTitle']}
-        Description: {quote['description']}
+    Service: {quote['serviceType']}
+    Project Title: {quote['projectTitle']}
+    Description: {quote['description']}
 
-        Features: {", ".join(quote.get('features', []))}
-        Timeline: {quote['timeline']}
-        Budget: {quote.get('budget', '')}
+    Features: {", ".join(quote.get('features', []))}
+    Timeline: {quote['timeline']}
+    Budget: {quote.get('budget', '')}
 
-        Has Existing Website: {quote.get('hasExistingWebsite', '')}
-        Preferred Style: {quote.get('preferredStyle', '')}
-        Target Audience: {quote.get('targetAudience', '')}
-        Additional Notes: {quote.get('additionalNotes', '')}
+    Has Existing Website: {quote.get('hasExistingWebsite', '')}
+    Preferred Style: {quote.get('preferredStyle', '')}
+    Target Audience: {quote.get('targetAudience', '')}
+    Additional Notes: {quote.get('additionalNotes', '')}
 
-        Submitted at: {quote['created_at']}
-        """
+    Submitted at: {quote['created_at']}
+    """
+    return subject, body
 
-        msg = MIMEMultipart()
-        msg["From"] = f"{EMAIL_FROM_NAME} <{EMAIL_USER}>"
-        msg["To"] = EMAIL_TO
-        msg["Subject"] = subject
-        msg.attach(MIMEText(body, "plain"))
 
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-            server.login(EMAIL_USER, EMAIL_PASS)
-            server.sendmail(EMAIL_USER, EMAIL_TO, msg.as_string())
+def send_quote_email(quote: dict):
+    try:
+        subject, body = quote_email(quote)
+        send_email(settings.EMAIL_TO, subject, body, EMAIL_FROM_NAME)
 
-        print("[✅] Quote email sent successfully")
+        logger.info("✅ Quote email sent")
 
     except Exception as e:
-        print(f"[❌] Failed to send quote email: {e}")
+        logger.error(f"❌ Failed to send quote email: {e!r}")
+
+
+@jobs.job("email.quote", queue="email")
+def deliver_quote_email(quote: dict):
+    """Job version of send_quote_email: raises so the runner retries"""
+    subject, body = quote_email(quote)
+    send_email(settings.EMAIL_TO, subject, body, EMAIL_FROM_NAME)
 
 
 # --- Routes ---
 @router.post("/", response_model=dict)
-async def create_quote(quote: Quote, db=Depends(get_db)):
+async def create_quote(
+    quote: Quote,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    storage=Depends(submission_storage)
+):
     quote_dict = quote.dict()
+    claim = await idempotency.claim(storage, "quotes", quote_dict, idempotency_key)
+    if claim.replay is not None:
+        response.headers["Idempotent-Replayed"] = "true"
+        return claim.replay
+
     quote_dict["created_at"] = datetime.utcnow()
     quote_dict["replies"] = []  # store replies here
 
-    result = await db["quotes"].insert_one(quote_dict)
-    quote_dict["_id"] = str(result.inserted_id)
+    try:
+        await storage.quotes.create(quote_dict)
+    except Exception:
+        await claim.release()
+        raise
+    await analytics.record_quote(storage, quote_dict)
+    quote_dict["_id"] = str(quote_dict["_id"])
 
-    # Send notification email
-    send_quote_email(quote_dict)
+    # Notify the admin: batched into the digest unless the service type is urgent
+    urgent = quote_dict["serviceType"].strip().lower() in settings.EMAIL_DIGEST_IMMEDIATE_SERVICE_TYPES
+    if urgent or not digest.add(*quote_email(quote_dict)):
+        if not await jobs.try_enqueue("email.quote", quote_dict):
+            outbox.submit(send_quote_email, dict(quote_dict))
 
-    return {"message": "Quote created successfully", "quote": quote_dict}
+    body = {"message": "Quote created successfully", "quote": quote_dict}
+    await claim.complete(body)
+    return body
 
 
 @router.get("/", response_model=List[dict])
-async def get_quotes(db=Depends(get_db), user=Depends(get_current_admin)):
-    quotes = await db["quotes"].find().to_list(100)
+async def get_quotes(
+    archived: bool = False,
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    storage=Depends(admin_storage),
+    user=Depends(get_current_admin),
+):
+    # Replied-to quotes older than ARCHIVE_AFTER_DAYS live in the archive
+    if archived:
+        quotes = await storage.quotes.list_archived(limit, offset)
+    else:
+        quotes = await storage.quotes.list(limit, offset)
     for q in quotes:
         q["_id"] = str(q["_id"])
     return quotes
 
 
 @router.delete("/{quote_id}")
-async def delete_quote(quote_id: str, db=Depends(get_db), user=Depends(get_current_admin)):
-    result = await db["quotes"].delete_one({"_id": ObjectId(quote_id)})
-    if result.deleted_count == 0:
+async def delete_quote(quote_id: str, storage=Depends(admin_storage), user=Depends(get_current_admin)):
+    if not await storage.quotes.delete(quote_id):
         raise HTTPException(status_code=404, detail="Quote not found")
     return {"message": "Quote deleted successfully"}
 
 
 @router.post("/{quote_id}/reply")
-async def reply_to_quote(quote_id: str, message: Reply, db=Depends(get_db), user=Depends(get_current_admin)):
-    quote = await db["quotes"].find_one({"_id": ObjectId(quote_id)})
+async def reply_to_quote(quote_id: str, message: Reply, storage=Depends(admin_storage), user=Depends(get_current_admin)):
+    quote = await storage.quotes.get(quote_id)
     if not quote:
         raise HTTPException(status_code=404, detail="Quote not found")
 
@@ -132,10 +167,7 @@ async def reply_to_quote(quote_id: str, message: Reply, db=Depends(get_db), user
     }
 
     # Save reply in DB
-    await db["quotes"].update_one(
-        {"_id": ObjectId(quote_id)},
-        {"$push": {"replies": reply}}
-    )
+    await storage.quotes.add_reply(quote_id, reply)
 
     # Send reply via email
     try:
@@ -149,15 +181,7 @@ async def reply_to_quote(quote_id: str, message: Reply, db=Depends(get_db), user
         WeFixIt Team
         """
 
-        msg = MIMEMultipart()
-        msg["From"] = f"{EMAIL_FROM_NAME} <{EMAIL_USER}>"
-        msg["To"] = quote["email"]
-        msg["Subject"] = subject
-        msg.attach(MIMEText(body, "plain"))
-
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-            server.login(EMAIL_USER, EMAIL_PASS)
-            server.sendmail(EMAIL_USER, quote["email"], msg.as_string())
+        send_email(quote["email"], subject, body, EMAIL_FROM_NAME)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to send email: {e}")
@@ -166,8 +190,8 @@ async def reply_to_quote(quote_id: str, message: Reply, db=Depends(get_db), user
 
 
 @router.delete("/{quote_id}/reply/{reply_index}")
-async def delete_reply(quote_id: str, reply_index: int, db=Depends(get_db), user=Depends(get_current_admin)):
-    quote = await db["quotes"].find_one({"_id": ObjectId(quote_id)})
+async def delete_reply(quote_id: str, reply_index: int, storage=Depends(admin_storage), user=Depends(get_current_admin)):
+    quote = await storage.quotes.get(quote_id)
     if not quote:
         raise HTTPException(status_code=404, detail="Quote not found")
 
@@ -177,10 +201,7 @@ async def delete_reply(quote_id: str, reply_index: int, db=Depends(get_db), user
 
     # Remove reply
     replies.pop(reply_index)
-    await db["quotes"].update_one(
-        {"_id": ObjectId(quote_id)},
-        {"$set": {"replies": replies}}
-    )
+    await storage.quotes.set_replies(quote_id, replies)
 
     return {"message": "Reply deleted successfully"}
 
@@ -1,16 +1,28 @@
 ﻿# backend/routers/reviews.py
-from fastapi import APIRouter, HTTPException, Query, Depends
+import logging
+
+from fastapi import APIRouter, HTTPException, Query, Depends, Header, Response
 from bson import ObjectId
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 
-from backend.database import get_db
+from backend import idempotency
+from backend.storage import storage_profile
 from backend.schemas import ReviewSchema
-from backend.deps import get_current_admin
+from backend.deps import batch_fields, batch_ids, batch_result, get_current_admin
+from backend.home import home_page
+from backend.snapshots import publisher
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["reviews"])
 
+# Read/write profile per kind of route (see database.PROFILES)
+admin_storage = storage_profile("admin")
+public_storage = storage_profile("public")
+submission_storage = storage_profile("submission")
+
 # ----------------------------
 # Schemas
 # ----------------------------
@@ -43,6 +55,9 @@ class ReviewUpdate(BaseModel):
 # ----------------------------
 # Helpers
 # ----------------------------
+REVIEW_BATCH_FIELDS = ["name", "email", "company", "projectType", "rating", "comment", "published", "created_at"]
+
+
 def _doc_to_review_out(doc: Dict[str, Any]) -> ReviewSchema:
     return ReviewSchema(
         _id=str(doc["_id"]),
@@ -51,10 +66,9 @@ def _doc_to_review_out(doc: Dict[str, Any]) -> ReviewSchema:
         company=doc.get("company"),
         projectType=doc.get("projectType"),
         rating=doc["rating"],
-        # fallback to "message" if "comment" is missing
-        comment=doc.get("comment") or doc.get("message") or "",
+        comment=doc["comment"],  # old "message" fields: see migrations 1
         published=bool(doc.get("published", True)),
-        created_at=doc.get("created_at", datetime.now(timezone.utc)),
+        created_at=doc.get("created_at"),
     )
 
 
@@ -66,44 +80,70 @@ async def list_reviews(
     published: Optional[bool] = None,
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    db=Depends(get_db)
+    storage=Depends(public_storage)
 ):
     """Get a list of reviews, optionally filtered by published status"""
-    q: Dict[str, Any] = {}
-    if published is not None:
-        q["published"] = published
-
-    cursor = db.reviews.find(q).sort("created_at", -1).skip(offset).limit(limit)
-    reviews: List[ReviewSchema] = []
-    async for doc in cursor:
-        reviews.append(_doc_to_review_out(doc))
-
-    return reviews
+    docs = await storage.reviews.list(published=published, limit=limit, offset=offset)
+    return [_doc_to_review_out(doc) for doc in docs]
 
 
 @router.post("/", response_model=ReviewSchema)
-async def create_review(review: ReviewCreate, db=Depends(get_db)):
+async def create_review(
+    review: ReviewCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    storage=Depends(submission_storage)
+):
     """Create a new review"""
-    print("📩 Incoming review payload:", review.dict(by_alias=True))
+    logger.debug(
+        "📩 Incoming review",
+        extra={"fields": {"rating": review.rating, "projectType": review.projectType, "published": review.published}},
+    )
 
     data = review.dict(by_alias=True)
+    claim = await idempotency.claim(storage, "reviews", data, idempotency_key)
+    if claim.replay is not None:
+        response.headers["Idempotent-Replayed"] = "true"
+        return _doc_to_review_out(claim.replay)
+
     data["created_at"] = datetime.now(timezone.utc)
 
     # Normalize: ensure Mongo always has "comment"
     if "message" in data:
         data["comment"] = data.pop("message")
 
-    result = await db.reviews.insert_one(data)
-    new_review = await db.reviews.find_one({"_id": result.inserted_id})
+    try:
+        new_review = await storage.reviews.create(data)
+    except Exception:
+        await claim.release()
+        raise
+    await claim.complete(new_review)
+    if new_review.get("published"):
+        # Not publisher.schedule(): visitors must not trigger rebuilds, the
+        # snapshots catch up with the next admin edit or refresh
+        home_page.invalidate()
     return _doc_to_review_out(new_review)
 
+@router.get("/batch", response_model=dict)
+async def get_reviews(
+    ids: List[str] = Depends(batch_ids),
+    fields: Optional[List[str]] = Query(None, description="only these fields, e.g. ?fields=name,rating"),
+    storage=Depends(public_storage)
+):
+    """Several reviews in one request and one query, in the order asked
+    for; ids that do not exist are listed under "missing" """
+    fields = batch_fields(fields, REVIEW_BATCH_FIELDS)
+    docs = await storage.reviews.get_many(ids, fields=fields or None)
+    return batch_result(ids, docs, fields, _doc_to_review_out, aliases={"comment": "message"})
+
+
 @router.get("/{review_id}", response_model=ReviewSchema)
-async def get_review(review_id: str, db=Depends(get_db)):
+async def get_review(review_id: str, storage=Depends(public_storage)):
     """Get a single review by ID"""
     if not ObjectId.is_valid(review_id):
         raise HTTPException(status_code=404, detail="Review not found")
 
-    review = await db.reviews.find_one({"_id": ObjectId(review_id)})
+    review = await storage.reviews.get(review_id)
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
 
@@ -114,38 +154,36 @@ async def get_review(review_id: str, db=Depends(get_db)):
 async def update_review(
     review_id: str,
     review: ReviewUpdate,
-    db=Depends(get_db),
+    storage=Depends(admin_storage),
     _admin=Depends(get_current_admin)
 ):
     """Update a review (admin only)"""
     if not ObjectId.is_valid(review_id):
         raise HTTPException(status_code=404, detail="Review not found")
 
-    updates = review.dict(exclude_unset=True, by_alias=True)
-    if updates:
-        result = await db.reviews.update_one(
-            {"_id": ObjectId(review_id)},
-            {"$set": updates}
-        )
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Review not found")
+    updates = review.dict(exclude_unset=True)  # field names: store "comment", not the "message" alias
+    updated = await storage.reviews.update(review_id, updates)
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Review not found")
 
-    updated = await db.reviews.find_one({"_id": ObjectId(review_id)})
+    home_page.invalidate()
+    publisher.schedule()
     return _doc_to_review_out(updated)
 
 
 @router.delete("/{review_id}")
 async def delete_review(
     review_id: str,
-    db=Depends(get_db),
+    storage=Depends(admin_storage),
     _admin=Depends(get_current_admin)
 ):
     """Delete a review (admin only)"""
     if not ObjectId.is_valid(review_id):
         raise HTTPException(status_code=404, detail="Review not found")
 
-    result = await db.reviews.delete_one({"_id": ObjectId(review_id)})
-    if result.deleted_count == 0:
+    if not await storage.reviews.delete(review_id):
         raise HTTPException(status_code=404, detail="Review not found")
 
+    home_page.invalidate()
+    publisher.schedule()
     return {"message": "Review deleted successfully"}
@@ -0,0 +1,37 @@
+# backend/routers/slow_queries.py
+from datetime import timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from backend import slow_queries
+from backend.config import settings
+from backend.deps import get_current_admin
+
+router = APIRouter(tags=["admin"], dependencies=[Depends(get_current_admin)])
+
+
+def _db():
+    if settings.STORAGE_BACKEND != "mongo" or not settings.SLOW_QUERY_LOG_ENABLED:
+        raise HTTPException(status_code=404, detail="The slow-query log needs the Mongo backend and SLOW_QUERY_LOG_ENABLED")
+    from backend.database import get_db
+    return get_db()
+
+
+@router.get("/")
+async def slow_query_summary(
+    hours: float = Query(24, gt=0, le=24 * 30),
+    limit: int = Query(20, ge=1, le=200),
+):
+    """Worst query shapes by total time, with their latest explain plan"""
+    return {
+        "threshold_ms": settings.SLOW_QUERY_THRESHOLD_MS,
+        "shapes": await slow_queries.summarize(_db(), timedelta(hours=hours), limit),
+    }
+
+
+@router.get("/recent")
+async def recent_slow_queries(limit: int = Query(50, ge=1, le=500), shape_id: str = None):
+    """Latest entries, newest first (optionally for one shape)"""
+    query = {"shape_id": shape_id} if shape_id else {}
+    cursor = _db()[slow_queries.COLLECTION].find(query, {"_id": 0}).sort("$natural", -1).limit(limit)
+    return await cursor.to_list(length=limit)
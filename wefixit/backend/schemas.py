@@ -74,6 +74,7 @@ class PortfolioBase(BaseModel):
     title: str
     description: Optional[str] = None
     image_url: Optional[str] = Field(None, alias="image")  # Accept "image" from frontend
+    category: Optional[str] = None
     link: Optional[str] = None
     tags: List[str] = []
     is_featured: bool = False
@@ -93,6 +94,7 @@ class PortfolioUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     image_url: Optional[str] = Field(None, alias="image")
+    category: Optional[str] = None
     link: Optional[str] = None
     tags: Optional[List[str]] = None
     is_featured: Optional[bool] = None
@@ -103,6 +105,17 @@ class PortfolioUpdate(BaseModel):
     )
 
 
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class PortfolioFacets(BaseModel):
+    total: int
+    categories: List[FacetCount]
+    tags: List[FacetCount]
+
+
 class PortfolioOut(PortfolioBase):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
     created_at: datetime
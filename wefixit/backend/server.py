@@ -0,0 +1,90 @@
+# backend/server.py
+"""Production entry point: `python -m backend.server`
+
+Runs gunicorn with uvicorn workers (uvloop + httptools). Per-worker
+resources (Mongo client, email outbox) are created in the app lifespan, so
+preloading the app in the gunicorn master is safe.
+"""
+import os
+
+from backend.config import settings
+
+APP = "backend.main:app"
+
+
+def worker_count() -> int:
+    if settings.WEB_CONCURRENCY > 0:
+        return settings.WEB_CONCURRENCY
+    try:
+        cpus = len(os.sched_getaffinity(0))  # respects container CPU pinning
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    return max(1, min(cpus * 2 + 1, settings.WEB_MAX_WORKERS))
+
+
+def gunicorn_options() -> dict:
+    return {
+        "bind": f"{settings.HOST}:{settings.PORT}",
+        "workers": worker_count(),
+        "worker_class": "backend.server.ProductionUvicornWorker",
+        "timeout": settings.WEB_TIMEOUT,
+        "graceful_timeout": settings.WEB_GRACEFUL_TIMEOUT,
+        "keepalive": settings.WEB_KEEPALIVE,
+        "max_requests": settings.WEB_MAX_REQUESTS,
+        "max_requests_jitter": max(1, settings.WEB_MAX_REQUESTS // 10),
+        "preload_app": settings.WEB_PRELOAD,
+        # Access records come from RequestIdMiddleware (JSON, with the
+        # request id, through the log queue) rather than gunicorn's
+        # synchronous writes
+        "accesslog": None,
+        "errorlog": "-",
+    }
+
+
+try:
+    from gunicorn.app.base import BaseApplication
+    from uvicorn.workers import UvicornWorker
+except ImportError:  # gunicorn does not run on Windows; main() falls back to uvicorn
+    BaseApplication = None
+else:
+    class ProductionUvicornWorker(UvicornWorker):
+        CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "lifespan": "on", "access_log": False}
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            # Let in-flight requests finish on SIGTERM before the lifespan shutdown runs
+            self.config.timeout_graceful_shutdown = self.cfg.graceful_timeout
+
+    class GunicornApplication(BaseApplication):
+        def __init__(self, app_uri: str, options: dict):
+            self.app_uri = app_uri
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from gunicorn.util import import_app
+            return import_app(self.app_uri)
+
+
+def main():
+    if BaseApplication is not None and os.name != "nt":
+        GunicornApplication(APP, gunicorn_options()).run()
+        return
+
+    import uvicorn
+    uvicorn.run(
+        APP,
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=worker_count(),
+        access_log=False,
+        timeout_graceful_shutdown=settings.WEB_GRACEFUL_TIMEOUT,
+    )
+
+
+if __name__ == "__main__":
+    main()
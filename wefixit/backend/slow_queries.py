@@ -0,0 +1,258 @@
+# backend/slow_queries.py
+"""Slow-query log (Mongo backend only).
+
+mongo_monitoring.SlowQueryListener reports every command that took longer
+than SLOW_QUERY_THRESHOLD_MS. Each one is recorded with its normalized
+query shape (values replaced by "?") in the capped `slow_queries`
+collection. A sample of slow reads is re-run with
+`explain("executionStats")` in the background, at most once per shape per
+SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS. That records the winning plan's
+stages (COLLSCAN vs IXSCAN), the index used and docs examined vs returned.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "slow_queries"
+
+# Reads that explain() can safely re-run; writes are only logged
+EXPLAINABLE = ("find", "aggregate", "count", "distinct")
+LOGGED = EXPLAINABLE + ("update", "delete", "findAndModify")
+
+# Driver/session fields that are not part of the query itself
+_DRIVER_FIELDS = {"lsid", "txnNumber", "$db", "$clusterTime", "$readPreference", "readConcern", "writeConcern",
+                  "maxTimeMS", "autocommit", "startTransaction", "apiVersion", "apiStrict", "apiDeprecationErrors"}
+
+
+def _normalize(value: Any) -> Any:
+    """Keeps field names and operators, replaces values with "?" """
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        # Pipelines are lists of stages; $in / $all lists are one value
+        if value and all(isinstance(item, dict) for item in value):
+            return [_normalize(item) for item in value]
+        return "?"
+    return "?"
+
+
+def query_shape(command_name: str, command: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of a command that decide its plan, normalized"""
+    if command_name == "find":
+        parts = {"filter": command.get("filter", {}), "sort": command.get("sort"), "projection": command.get("projection")}
+    elif command_name == "aggregate":
+        parts = {"pipeline": command.get("pipeline", [])}
+    elif command_name == "count":
+        parts = {"filter": command.get("query", {})}
+    elif command_name == "distinct":
+        parts = {"key": command.get("key"), "filter": command.get("query", {})}
+    elif command_name == "update":
+        parts = {"filter": (command.get("updates") or [{}])[0].get("q", {})}
+    elif command_name == "delete":
+        parts = {"filter": (command.get("deletes") or [{}])[0].get("q", {})}
+    else:  # findAndModify
+        parts = {"filter": command.get("query", {}), "sort": command.get("sort")}
+    shape = {}
+    for key, value in parts.items():
+        if value is None:
+            continue
+        # Sort and projection specs are field lists: keep them as they are
+        shape[key] = value if key in ("sort", "projection", "key") else _normalize(value)
+    return shape
+
+
+def explainable_command(command_name: str, command: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """A copy of the command to hand to explain, or None when it should not be re-run"""
+    if command_name not in EXPLAINABLE:
+        return None
+    if command_name == "aggregate" and any("$out" in stage or "$merge" in stage for stage in command.get("pipeline", [])):
+        return None
+    return {key: value for key, value in command.items() if key not in _DRIVER_FIELDS}
+
+
+# ----------------------------
+# Explain output
+# ----------------------------
+def _find(document: Any, key: str) -> Optional[Dict[str, Any]]:
+    """First `key` anywhere in an explain document (aggregate nests it under $cursor)"""
+    if isinstance(document, dict):
+        if key in document:
+            return document[key]
+        children = document.values()
+    elif isinstance(document, list):
+        children = document
+    else:
+        return None
+    for child in children:
+        found = _find(child, key)
+        if found is not None:
+            return found
+    return None
+
+
+def _stages(plan: Dict[str, Any], stages: List[str], indexes: List[str]):
+    if "queryPlan" in plan:  # slot-based engine
+        plan = plan["queryPlan"]
+    if "stage" in plan:
+        stages.append(plan["stage"])
+    if "indexName" in plan:
+        indexes.append(plan["indexName"])
+    for child in ([plan["inputStage"]] if "inputStage" in plan else []) + plan.get("inputStages", []):
+        _stages(child, stages, indexes)
+
+
+def summarize_explain(explain: Dict[str, Any]) -> Dict[str, Any]:
+    stages: List[str] = []
+    indexes: List[str] = []
+    winning = _find(explain, "winningPlan")
+    if winning:
+        _stages(winning, stages, indexes)
+    stats = _find(explain, "executionStats") or {}
+    return {
+        "stages": stages,
+        "collscan": "COLLSCAN" in stages,
+        "indexes": indexes,
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "returned": stats.get("nReturned"),
+        "explain_ms": stats.get("executionTimeMillis"),
+    }
+
+
+# ----------------------------
+# Recorder
+# ----------------------------
+class SlowQueryLog:
+    """Takes reports from the listener (on Motor's threads) and records
+    them from a task on the event loop, so listeners never wait on I/O"""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._explained_at: Dict[str, float] = {}
+
+    def start(self):
+        if self._task is None and settings.STORAGE_BACKEND == "mongo" and settings.SLOW_QUERY_LOG_ENABLED:
+            self._loop = asyncio.get_running_loop()
+            self._queue = asyncio.Queue(maxsize=settings.SLOW_QUERY_QUEUE_SIZE)
+            self._task = asyncio.create_task(self._run(), name="slow-query-log")
+
+    async def stop(self):
+        if self._task is not None:
+            self._loop = None
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def report(self, database: str, command_name: str, command: Dict[str, Any], duration_ms: float):
+        """Called from the command listener, on any thread"""
+        loop = self._loop
+        if loop is not None:
+            item = (database, command_name, command, duration_ms, datetime.utcnow())
+            loop.call_soon_threadsafe(self._enqueue, item)
+
+    def _enqueue(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            pass  # under a flood of slow queries, sampling is good enough
+
+    async def _run(self):
+        from backend.database import get_db
+        capped = False
+        while True:
+            item = await self._queue.get()
+            try:
+                # An insert into a missing collection would create it uncapped
+                capped = capped or await self._ensure_collection(get_db())
+                if capped:
+                    await self._record(get_db(), *item)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not record slow query: {e!r}")
+
+    async def _ensure_collection(self, db) -> bool:
+        from pymongo.errors import CollectionInvalid
+        try:
+            await db.create_collection(COLLECTION, capped=True, size=settings.SLOW_QUERY_LOG_SIZE_MB * 1024 * 1024)
+        except CollectionInvalid:
+            pass  # already there
+        return True
+
+    def _should_explain(self, shape_id: str) -> bool:
+        now = time.monotonic()
+        if now - self._explained_at.get(shape_id, float("-inf")) < settings.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS:
+            return False
+        if random.random() >= settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE:
+            return False
+        self._explained_at[shape_id] = now
+        return True
+
+    async def _record(self, db, database: str, command_name: str, command: Dict[str, Any], duration_ms: float, at: datetime):
+        collection = command.get(command_name)
+        shape = query_shape(command_name, command)
+        key = json.dumps([collection, command_name, shape], sort_keys=True, default=str)
+        shape_id = hashlib.sha1(key.encode()).hexdigest()[:16]
+        entry = {
+            "at": at,
+            "database": database,
+            "collection": collection,
+            "command": command_name,
+            "shape_id": shape_id,
+            "shape": json.dumps(shape, sort_keys=True, default=str),
+            "duration_ms": round(duration_ms, 1),
+        }
+        to_explain = explainable_command(command_name, command)
+        if to_explain is not None and self._should_explain(shape_id):
+            import pymongo
+            try:
+                with pymongo.timeout(settings.SLOW_QUERY_EXPLAIN_TIMEOUT_SECONDS):
+                    explain = await db.client[database].command({"explain": to_explain, "verbosity": "executionStats"})
+                entry["plan"] = summarize_explain(explain)
+            except Exception as e:
+                entry["plan_error"] = repr(e)
+        await db[COLLECTION].insert_one(entry)
+
+
+slow_query_log = SlowQueryLog()
+
+
+async def summarize(db, since: timedelta, limit: int) -> List[Dict[str, Any]]:
+    """Worst query shapes by total time since `since` ago"""
+    pipeline = [
+        {"$match": {"at": {"$gte": datetime.utcnow() - since}}},
+        {"$sort": {"at": 1}},
+        {"$group": {
+            "_id": "$shape_id",
+            "collection": {"$last": "$collection"},
+            "command": {"$last": "$command"},
+            "shape": {"$last": "$shape"},
+            "count": {"$sum": 1},
+            "total_ms": {"$sum": "$duration_ms"},
+            "avg_ms": {"$avg": "$duration_ms"},
+            "max_ms": {"$max": "$duration_ms"},
+            "last_seen": {"$last": "$at"},
+            # Most entries have no plan, so $last would usually give nothing
+            "plans": {"$push": "$plan"},
+        }},
+        {"$sort": {"total_ms": -1}},
+        {"$limit": limit},
+    ]
+    summary = []
+    async for row in db[COLLECTION].aggregate(pipeline):
+        plans = [plan for plan in row.pop("plans") if plan]
+        row["shape_id"] = row.pop("_id")
+        row["total_ms"] = round(row["total_ms"], 1)
+        row["avg_ms"] = round(row["avg_ms"], 1)
+        row["latest_plan"] = plans[-1] if plans else None
+        summary.append(row)
+    return summary
@@ -0,0 +1,221 @@
+# backend/snapshots.py
+"""Static JSON snapshots of the public content: `python -m backend.snapshots`
+
+With SNAPSHOT_ENABLED, portfolio and review writes schedule a rebuild of
+precomputed JSON files in UPLOAD_DIR/SNAPSHOT_SUBDIR, served from
+/uploads/<SNAPSHOT_SUBDIR>/ by the static mount (short max-age plus ETag,
+unlike the immutable uploads). Each file has .gz (and, when brotli is
+installed, .br) sidecars. The frontend and the CDN can read public data
+without touching Python or the database; the API stays as a fallback.
+
+- home.json       same payload as GET /api/v1/home
+- portfolio.json  active items, as GET /api/v1/portfolio/?is_active=true
+- images/         inline base64 images of both, moved out to <sha256>.<ext>
+                  (content-addressed, so served immutable like the uploads)
+- reviews.json    published reviews (without emails)
+- projects.json   as GET /api/v1/projects/
+- manifest.json   size and sha256 of each file, plus a version hash of them all
+
+Admin edits schedule a rebuild, debounced (SNAPSHOT_DEBOUNCE_SECONDS) so a
+burst of edits is published once; visitor reviews are picked up by the
+next one, or by the periodic refresh (SNAPSHOT_REFRESH_SECONDS). Files are
+written to a temporary name and renamed into place, so readers never see
+a partial file. Nothing in them depends on the time or the worker.
+"""
+import asyncio
+import gzip
+import hashlib
+import base64
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, Optional
+
+from backend.compression import brotli
+from backend.config import settings
+from backend.home import REVIEW_FIELDS, build_payload, encode_json, project_out
+from backend.storage import get_storage, open_storage, close_storage
+
+logger = logging.getLogger(__name__)
+
+
+IMAGE_SUBDIR = "images"
+INLINE_IMAGE = re.compile(r"^data:image/([a-z0-9+.-]+);base64,(.*)$", re.I | re.S)
+IMAGE_PRUNE_AFTER_SECONDS = 3600  # unreferenced images outlive a slower worker's publish
+
+
+def snapshot_dir() -> str:
+    return os.path.join(settings.UPLOAD_DIR, settings.SNAPSHOT_SUBDIR)
+
+
+def _externalize_image(value: Optional[str], images: Dict[str, bytes]) -> Optional[str]:
+    """The URL of a content-addressed file for an inline data: image (its
+    bytes go into `images`); other values unchanged"""
+    match = INLINE_IMAGE.match(value or "")
+    if match is None:
+        return value
+    try:
+        data = base64.b64decode(match.group(2), validate=True)
+    except ValueError:
+        return value
+    extension = match.group(1).lower().replace("jpeg", "jpg").replace("svg+xml", "svg")
+    name = f"{IMAGE_SUBDIR}/{hashlib.sha256(data).hexdigest()}.{extension}"
+    images[name] = data
+    return f"/uploads/{settings.SNAPSHOT_SUBDIR}/{name}"
+
+
+async def build_snapshots(storage, images: Optional[Dict[str, bytes]] = None) -> Dict[str, Any]:
+    """{file name: payload} for every snapshot; image files referenced by
+    home.json and portfolio.json are collected into `images`"""
+    from backend.routers.portfolio import _doc_to_portfolio_out
+    from backend.routers.reviews import _doc_to_review_out
+
+    images = {} if images is None else images
+    home, (total, portfolio), reviews, projects = await asyncio.gather(
+        build_payload(storage, lambda value: _externalize_image(value, images)),
+        storage.portfolio.list(is_active=True, limit=settings.SNAPSHOT_MAX_ITEMS),
+        storage.reviews.list(published=True, limit=settings.SNAPSHOT_MAX_ITEMS, fields=REVIEW_FIELDS),
+        storage.projects.list(),
+    )
+    return {
+        "home.json": home,
+        "portfolio.json": {
+            "total": total,
+            "limit": settings.SNAPSHOT_MAX_ITEMS,
+            "offset": 0,
+            "items": [
+                _doc_to_portfolio_out({**doc, "image": _externalize_image(doc.get("image"), images)})
+                for doc in portfolio
+            ],
+        },
+        "reviews.json": [_doc_to_review_out(doc) for doc in reviews],
+        "projects.json": [project_out(doc) for doc in projects],
+    }
+
+
+def _write_atomic(path: str, data: bytes):
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, path)
+
+
+def write_snapshot(directory: str, name: str, body: bytes):
+    """The file first, then its sidecars: a sidecar older than its file is
+    ignored by the static mount, so clients never get a mismatched pair"""
+    path = os.path.join(directory, name)
+    _write_atomic(path, body)
+    _write_atomic(path + ".gz", gzip.compress(body, compresslevel=9, mtime=0))
+    if brotli is not None:
+        _write_atomic(path + ".br", brotli.compress(body, quality=11))
+
+
+def write_images(directory: str, images: Dict[str, bytes]):
+    """Content-addressed, so existing files are only touched (marking them
+    in use); images no file has referenced for a while are removed"""
+    image_dir = os.path.join(directory, IMAGE_SUBDIR)
+    os.makedirs(image_dir, exist_ok=True)
+    for name, data in images.items():
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            os.utime(path)
+        else:
+            _write_atomic(path, data)
+    cutoff = time.time() - IMAGE_PRUNE_AFTER_SECONDS
+    for entry in os.scandir(image_dir):
+        if f"{IMAGE_SUBDIR}/{entry.name}" not in images and entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass  # pruned by another worker
+
+
+def _write_all(files: Dict[str, bytes], images: Dict[str, bytes]):
+    directory = snapshot_dir()
+    os.makedirs(directory, exist_ok=True)
+    write_images(directory, images)  # before the files that reference them
+    for name, body in files.items():
+        write_snapshot(directory, name, body)
+
+
+async def publish(storage) -> Dict[str, Any]:
+    """Rebuilds and writes every snapshot; returns the manifest"""
+    images: Dict[str, bytes] = {}
+    payloads = await build_snapshots(storage, images)
+    files = {name: encode_json(payload) for name, payload in payloads.items()}
+    listed = {
+        name: {"bytes": len(body), "sha256": hashlib.sha256(body).hexdigest()}
+        for name, body in files.items()
+    }
+    manifest = {
+        "version": hashlib.sha256(encode_json(listed)).hexdigest()[:16],
+        "files": listed,
+        "images": len(images),
+    }
+    files["manifest.json"] = encode_json(manifest)  # last, once everything it lists is in place
+    await asyncio.to_thread(_write_all, files, images)
+    return manifest
+
+
+class SnapshotPublisher:
+    """Debounced, per-worker publisher. Workers that publish the same data
+    write identical files, so it does not matter which one handled the edit."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._changed_at = 0.0
+
+    def start(self):
+        if self._task is None and settings.SNAPSHOT_ENABLED:
+            self._task = asyncio.create_task(self._run(), name="snapshot-publisher")
+            self.schedule()  # publish what is there on startup
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def schedule(self):
+        """Called after an admin write to public content"""
+        if self._task is not None:
+            self._changed_at = time.monotonic()
+            self._wake.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.SNAPSHOT_REFRESH_SECONDS or None)
+            except asyncio.TimeoutError:
+                pass  # periodic refresh: picks up visitor reviews
+            # Wait until edits have stopped for the debounce period
+            while (quiet := time.monotonic() - self._changed_at) < settings.SNAPSHOT_DEBOUNCE_SECONDS:
+                await asyncio.sleep(settings.SNAPSHOT_DEBOUNCE_SECONDS - quiet)
+            self._wake.clear()
+            try:
+                manifest = await publish(await get_storage())
+                logger.info(f"📦 Published {len(manifest['files'])} snapshots to {snapshot_dir()}")
+            except Exception as e:  # the API keeps serving; the next edit retries
+                logger.error(f"❌ Snapshot publishing failed: {e!r}")
+
+
+publisher = SnapshotPublisher()
+
+
+async def _main():
+    storage = await open_storage()
+    try:
+        manifest = await publish(storage)
+    finally:
+        await close_storage()
+    for name, info in manifest["files"].items():
+        print(f"📦 {name}: {info['bytes']} bytes")
+    print(f"✅ Snapshots written to {snapshot_dir()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,143 @@
+# backend/startup_benchmark.py
+"""Cold-start benchmark: `python -m backend.startup_benchmark`
+
+Measures, in fresh interpreters:
+  * import time of backend.main (from `python -X importtime`), listing the
+    slowest modules it pulls in
+  * time from spawning uvicorn to the first served request
+
+Exits non-zero when either exceeds its budget, so CI catches regressions
+such as a heavy dependency creeping back onto the import path. The server
+run uses a throwaway SQLite database so no Mongo is needed.
+"""
+import argparse
+import http.client
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROBE_PATH = "/api/v1/health/live"
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _env(**extra) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = APP_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    env.update(extra)
+    return env
+
+
+# ----------------------------
+# Import time
+# ----------------------------
+def measure_import(module: str = "backend.main") -> Tuple[float, List[Tuple[float, str]]]:
+    """(cumulative ms for `module`, [(self ms, name)] of everything it imported)"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_DIR, env=_env(), capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    total_us = 0
+    modules = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, name = match.groups()
+        modules.append((int(self_us) / 1000, name))
+        if name == module:
+            total_us = int(cumulative_us)
+    return total_us / 1000, sorted(modules, reverse=True)
+
+
+# ----------------------------
+# Time to first request
+# ----------------------------
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _probe(port: int) -> bool:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+    try:
+        conn.request("GET", PROBE_PATH)
+        return conn.getresponse().status == 200
+    except OSError:
+        return False
+    finally:
+        conn.close()
+
+
+def measure_first_request(timeout: float = 30.0) -> float:
+    """ms from spawning a uvicorn worker until it answers PROBE_PATH"""
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _env(
+            STORAGE_BACKEND="sqlite",
+            DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            UPLOAD_DIR=os.path.join(tmp, "uploads"),
+            HEALTH_SMTP_CHECK_ENABLED="false",
+        )
+        started = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.main:app",
+             "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+            cwd=APP_DIR, env=env,
+        )
+        try:
+            while time.perf_counter() - started < timeout:
+                if server.poll() is not None:
+                    raise RuntimeError(f"server exited with code {server.returncode}")
+                if _probe(port):
+                    return (time.perf_counter() - started) * 1000
+                time.sleep(0.01)
+            raise RuntimeError(f"server did not answer within {timeout:.0f}s")
+        finally:
+            server.terminate()
+            server.wait(10)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="take the best of N runs")
+    parser.add_argument("--import-budget-ms", type=float,
+                        default=float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1500")))
+    parser.add_argument("--first-request-budget-ms", type=float,
+                        default=float(os.getenv("STARTUP_FIRST_REQUEST_BUDGET_MS", "4000")))
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to list")
+    args = parser.parse_args(argv)
+
+    imports = [measure_import() for _ in range(args.runs)]
+    import_ms, slowest = min(imports, key=lambda result: result[0])
+    first_request_ms = min(measure_first_request() for _ in range(args.runs))
+
+    print(f"import backend.main: {import_ms:8.1f} ms (budget {args.import_budget_ms:.0f} ms)")
+    for self_ms, name in slowest[:args.top]:
+        print(f"    {self_ms:8.1f} ms  {name}")
+    print(f"first request:       {first_request_ms:8.1f} ms (budget {args.first_request_budget_ms:.0f} ms)")
+
+    failed = False
+    if import_ms > args.import_budget_ms:
+        print("❌ Import time is over budget")
+        failed = True
+    if first_request_ms > args.first_request_budget_ms:
+        print("❌ Time to first request is over budget")
+        failed = True
+    if not failed:
+        print("✅ Startup within budget")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+# backend/static.py
+import mimetypes
+import stat
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from backend.compression import negotiate_encoding
+
+# Precompressed sidecars, in server preference order: "photo.png" -> "photo.png.br"
+SIDECAR_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with long-lived caching and precompressed sidecar files.
+
+    ETag/Last-Modified revalidation and HTTP Range requests come from
+    Starlette's FileResponse; this adds Cache-Control and serves `<file>.br`
+    or `<file>.gz` when the client accepts it and the sidecar is not older
+    than the original file.
+    """
+
+    def __init__(self, *args, max_age: int = 31536000, immutable: bool = True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = f"public, max-age={max_age}" + (", immutable" if immutable else "")
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await self._sidecar_response(path, scope)
+        if response is None:
+            response = await super().get_response(path, scope)
+        response.headers["Cache-Control"] = self.cache_control
+        response.headers.add_vary_header("Accept-Encoding")
+        return response
+
+    async def _sidecar_response(self, path: str, scope: Scope):
+        if scope["method"] not in ("GET", "HEAD"):
+            return None
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        candidates = [c for c in SIDECAR_SUFFIXES if negotiate_encoding(accept_encoding, (c,))]
+        if not candidates:
+            return None
+
+        _, original = await anyio.to_thread.run_sync(self.lookup_path, path)
+        if not original or not stat.S_ISREG(original.st_mode):
+            return None
+
+        for coding in candidates:
+            full_path, sidecar = await anyio.to_thread.run_sync(
+                self.lookup_path, path + SIDECAR_SUFFIXES[coding]
+            )
+            if not sidecar or not stat.S_ISREG(sidecar.st_mode):
+                continue
+            if sidecar.st_mtime < original.st_mtime:
+                continue  # stale sidecar, fall back to the original
+            response = self.file_response(full_path, sidecar, scope)
+            response.headers["Content-Type"] = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            response.headers["Content-Encoding"] = coding
+            return response
+        return None
@@ -0,0 +1,72 @@
+# backend/storage/__init__.py
+from typing import Optional
+
+from starlette.requests import Request
+
+from backend.config import settings
+from backend.resilience import mongo_breaker
+from backend.storage.base import Storage
+
+_storage: Optional[Storage] = None
+
+
+def sqlite_path(url: str) -> str:
+    """sqlite:///./wefixit.db -> ./wefixit.db, sqlite:// -> :memory:"""
+    path = url.split("://", 1)[-1]
+    return path[1:] if path.startswith("/") else (path or ":memory:")
+
+
+def create_storage() -> Storage:
+    if settings.STORAGE_BACKEND == "sqlite":
+        from backend.storage.sqlite import SQLiteStorage
+        return SQLiteStorage(sqlite_path(settings.DATABASE_URL))
+
+    from backend.database import get_db
+    from backend.storage.mongo import MongoStorage
+    return MongoStorage(get_db())
+
+
+async def open_storage() -> Storage:
+    """Create and open this worker's storage (called from the app lifespan)"""
+    global _storage
+    if _storage is None:
+        storage = create_storage()
+        await storage.open()
+        _storage = storage
+    return _storage
+
+
+async def close_storage():
+    global _storage
+    if _storage is not None:
+        await _storage.close()
+        _storage = None
+
+
+async def get_storage() -> Storage:
+    """FastAPI dependency; also opens the storage on first use in scripts"""
+    return _storage if _storage is not None else await open_storage()
+
+
+def storage_profile(name: str):
+    """FastAPI dependency factory: the storage with read/write profile `name`
+
+    public_storage = storage_profile("public")
+    async def list_things(storage=Depends(public_storage)): ...
+
+    Requests with a valid admin token get the "admin" profile on public
+    routes: the dashboard lists items through them right after an edit, and
+    a secondary may be up to maxStaleness (90s or more) behind.
+    """
+    async def dependency(request: Request) -> Storage:
+        storage = await get_storage()
+        if storage.name == "mongo":
+            mongo_breaker.before_call()  # 503 right away while Mongo is known to be down
+        profile = name
+        if name == "public":
+            from backend.auth import has_admin_token  # imports this module
+            if has_admin_token(dict(request.scope["headers"])):
+                profile = "admin"
+        return storage.with_profile(profile)
+
+    return dependency
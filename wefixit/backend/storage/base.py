@@ -0,0 +1,353 @@
+# backend/storage/base.py
+"""Repository interfaces shared by the storage backends.
+
+Repositories hand back plain documents shaped like the Mongo ones: a dict
+with an "_id" (ObjectId on Mongo, its hex string on SQLite) and naive UTC
+datetimes, so the routers' `_doc_to_*` helpers work unchanged.
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+Doc = Dict[str, Any]
+
+
+class _RecentMixin(ABC):
+    @abstractmethod
+    async def list_created_after(self, after_id: str, limit: int) -> List[Doc]:
+        """Documents with an _id greater than `after_id`, oldest first"""
+
+
+class _ArchiveMixin(ABC):
+    """Hot/cold split: handled submissions move to an archive table/collection"""
+
+    @abstractmethod
+    async def count_archivable(self, cutoff: datetime) -> int: ...
+
+    @abstractmethod
+    async def archive_batch(self, cutoff: datetime, limit: int) -> int:
+        """Move up to `limit` archivable documents created before `cutoff`
+        (oldest first) to the archive; returns how many were moved"""
+
+    @abstractmethod
+    async def list_archived(self, limit: int = 100, offset: int = 0) -> List[Doc]:
+        """Archived documents, newest first"""
+
+
+class PortfolioRepository(ABC):
+    @abstractmethod
+    async def list(
+        self,
+        is_active: Optional[bool] = None,
+        is_featured: Optional[bool] = None,
+        limit: int = 20,
+        offset: int = 0,
+        category: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        match_all_tags: bool = False,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[int, List[Doc]]:
+        """(total matching, one page newest first); `tags` matches items
+        with any of them, or all of them with `match_all_tags`. `fields`
+        limits the returned keys (plus _id)"""
+
+    @abstractmethod
+    async def facets(self, is_active: Optional[bool] = None, is_featured: Optional[bool] = None) -> Doc:
+        """{"total": n, "categories": [(value, count)], "tags": [(value, count)]},
+        most common first"""
+
+    @abstractmethod
+    async def asset_references(self, after_id: Optional[str], limit: int) -> List[Doc]:
+        """The next `limit` items by _id with only the fields that can point
+        at an upload (image, link, description); inline data: images come
+        back as None so the multi-MB payloads are never read. Used to
+        register the uploads of items saved before ownership tracking."""
+
+    @abstractmethod
+    async def get(self, item_id: str) -> Optional[Doc]: ...
+
+    @abstractmethod
+    async def get_many(self, item_ids: List[str], fields: Optional[List[str]] = None) -> List[Doc]:
+        """The items that exist among `item_ids`, in one query, in no
+        particular order; `fields` limits the returned keys (plus _id)"""
+
+    @abstractmethod
+    async def create(self, data: Doc) -> Doc: ...
+
+    @abstractmethod
+    async def update(self, item_id: str, updates: Doc) -> Optional[Doc]:
+        """Apply `updates` ($set semantics); None if the item does not exist"""
+
+    @abstractmethod
+    async def delete(self, item_id: str) -> bool: ...
+
+
+class ReviewRepository(_RecentMixin):
+    @abstractmethod
+    async def list(
+        self,
+        published: Optional[bool] = None,
+        limit: int = 50,
+        offset: int = 0,
+        fields: Optional[List[str]] = None,
+    ) -> List[Doc]: ...
+
+    @abstractmethod
+    async def stats(self, published: Optional[bool] = None) -> Doc:
+        """{"count": n, "average_rating": float or None}"""
+
+    @abstractmethod
+    async def get(self, review_id: str) -> Optional[Doc]: ...
+
+    @abstractmethod
+    async def get_many(self, review_ids: List[str], fields: Optional[List[str]] = None) -> List[Doc]:
+        """As PortfolioRepository.get_many"""
+
+    @abstractmethod
+    async def create(self, data: Doc) -> Doc: ...
+
+    @abstractmethod
+    async def update(self, review_id: str, updates: Doc) -> Optional[Doc]: ...
+
+    @abstractmethod
+    async def delete(self, review_id: str) -> bool: ...
+
+
+class ContactRepository(_RecentMixin, _ArchiveMixin):
+    @abstractmethod
+    async def create(self, data: Doc) -> Doc: ...
+
+    @abstractmethod
+    async def list(self, limit: int = 100, offset: int = 0) -> List[Doc]: ...
+
+    @abstractmethod
+    async def delete(self, contact_id: str) -> bool: ...
+
+    @abstractmethod
+    async def mark_read(self, contact_id: str) -> bool: ...
+
+
+class QuoteRepository(_RecentMixin, _ArchiveMixin):
+    @abstractmethod
+    async def create(self, data: Doc) -> Doc: ...
+
+    @abstractmethod
+    async def list(self, limit: int = 100, offset: int = 0) -> List[Doc]: ...
+
+    @abstractmethod
+    async def get(self, quote_id: str) -> Optional[Doc]: ...
+
+    @abstractmethod
+    async def delete(self, quote_id: str) -> bool: ...
+
+    @abstractmethod
+    async def add_reply(self, quote_id: str, reply: Doc) -> bool: ...
+
+    @abstractmethod
+    async def set_replies(self, quote_id: str, replies: List[Doc]) -> bool: ...
+
+
+class ProjectRepository(ABC):
+    @abstractmethod
+    async def list(self, fields: Optional[List[str]] = None) -> List[Doc]: ...
+
+
+class AdminRepository(ABC):
+    @abstractmethod
+    async def get_by_username(self, username: str) -> Optional[Doc]: ...
+
+    @abstractmethod
+    async def create(self, data: Doc) -> Doc: ...
+
+    @abstractmethod
+    async def set_password_hash(self, username: str, password_hash: str) -> bool: ...
+
+
+class IdempotencyRepository(ABC):
+    @abstractmethod
+    async def insert(self, record: Doc) -> bool:
+        """False if a record with the same _id already exists"""
+
+    @abstractmethod
+    async def replace_expired(self, record: Doc, now: datetime) -> bool:
+        """Overwrite the record with the same _id only if it has expired"""
+
+    @abstractmethod
+    async def get(self, record_id: str) -> Optional[Doc]: ...
+
+    @abstractmethod
+    async def complete(self, record_id: str, response: Doc, expires_at: datetime): ...
+
+    @abstractmethod
+    async def release(self, record_id: str): ...
+
+
+class RefreshTokenRepository(ABC):
+    """Hashed refresh tokens; _id is the token's public id"""
+
+    @abstractmethod
+    async def insert(self, record: Doc): ...
+
+    @abstractmethod
+    async def get(self, token_id: str) -> Optional[Doc]: ...
+
+    @abstractmethod
+    async def mark_used(self, token_id: str, used_at: datetime, replaced_by: str) -> bool:
+        """Consume a token; False if it was already used or revoked (so
+        two concurrent refreshes cannot both succeed)"""
+
+    @abstractmethod
+    async def revoke_family(self, family_id: str) -> int: ...
+
+    @abstractmethod
+    async def revoke_user(self, username: str) -> int: ...
+
+    @abstractmethod
+    async def list_active(self, username: str, now: datetime) -> List[Doc]:
+        """Unused, unrevoked, unexpired tokens: one per signed-in session"""
+
+
+class AssetRepository(ABC):
+    """Ownership of files in UPLOAD_DIR (_id = path relative to it). A file
+    gets a record once something that can be deleted (a portfolio item)
+    points at it; `released_at` is set while it has no owner left. Files
+    without a record are never swept."""
+
+    @abstractmethod
+    async def attach(self, paths: List[str], owner: str, now: datetime):
+        """Add `owner` to each path's owners (creating records as needed)"""
+
+    @abstractmethod
+    async def release(self, owner: str, keep: List[str], now: datetime) -> int:
+        """Drop `owner` from every record outside `keep`; those left without
+        owners are released as of `now`. Returns the records dropped from."""
+
+    @abstractmethod
+    async def list_released(self, before: datetime, after_id: Optional[str], limit: int) -> List[Doc]:
+        """The next `limit` records by _id released at or before `before`"""
+
+    @abstractmethod
+    async def forget(self, path: str, before: datetime) -> bool:
+        """Delete the record if it is still released since `before`; True
+        means the file may go"""
+
+
+class RollupRepository(ABC):
+    """Time-bucketed counters ("hour" / "day" buckets, naive UTC starts).
+    Counter names may be dotted ("service_type.web") for one level of nesting."""
+
+    @abstractmethod
+    async def increment(self, granularity: str, bucket: datetime, counters: Dict[str, int]): ...
+
+    @abstractmethod
+    async def list(self, granularity: str, start: datetime, end: datetime) -> List[Doc]:
+        """Buckets with start <= bucket < end, oldest first"""
+
+    @abstractmethod
+    async def replace_range(self, start: datetime, end: datetime, docs: List[Doc]):
+        """Drop every bucket (both granularities) in [start, end) and insert `docs`"""
+
+
+class JobRepository(ABC):
+    """Background jobs (see jobs.py); _id is a string. A job is "queued"
+    until its run_at, "running" while a worker holds its lease, then
+    "done" or "dead" (out of attempts)"""
+
+    @abstractmethod
+    async def enqueue(self, job: Doc) -> bool:
+        """False if a job with the same _id already exists"""
+
+    @abstractmethod
+    async def claim(self, queue: str, worker: str, now: datetime, lease_until: datetime) -> Optional[Doc]:
+        """Atomically lease the due job of `queue` with the earliest run_at
+        (or one whose lease has expired) and count the attempt"""
+
+    @abstractmethod
+    async def heartbeat(self, job_id: str, worker: str, lease_until: datetime) -> bool:
+        """Extend a lease; False if `worker` no longer holds it"""
+
+    @abstractmethod
+    async def finish(self, job_id: str, worker: str, updates: Doc) -> bool:
+        """Apply `updates` ($set) if `worker` still holds the lease"""
+
+    @abstractmethod
+    async def counts(self, now: datetime) -> Dict[str, Dict[str, int]]:
+        """{queue: {status: n}}; queued jobs that are not due yet are counted
+        as "scheduled" instead"""
+
+    @abstractmethod
+    async def list(self, queue: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> List[Doc]:
+        """Latest run_at first"""
+
+    @abstractmethod
+    async def requeue(self, job_id: str, now: datetime) -> bool:
+        """Run a dead (or done) job again, with fresh attempts"""
+
+
+class StateRepository(ABC):
+    """Small named records of process state shared between workers and
+    restarts (_id = the key), e.g. the live feed's change stream position"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Doc]: ...
+
+    @abstractmethod
+    async def save(self, key: str, values: Doc):
+        """Insert or replace the record `key` with `values`"""
+
+
+class MigrationRepository(ABC):
+    """Data migration bookkeeping (one record per version, _id = str(version))
+    plus the batched document access the migration runner needs"""
+
+    @abstractmethod
+    async def list(self) -> List[Doc]: ...
+
+    @abstractmethod
+    async def save(self, record: Doc):
+        """Insert or replace the record with the same _id"""
+
+    @abstractmethod
+    async def scan(self, collection: str, after_id: Optional[str], limit: int, query: Optional[Doc] = None) -> List[Doc]:
+        """The next `limit` documents of `collection` by _id after `after_id`.
+        `query` (a Mongo filter) narrows the scan where the backend can use
+        it; callers must still check each document."""
+
+    @abstractmethod
+    async def bulk_update(self, collection: str, changes: List[Tuple[Any, Doc, List[str]]]) -> int:
+        """Apply (_id, fields to set, fields to unset) for a whole batch;
+        returns the number of documents modified"""
+
+
+class Storage(ABC):
+    name: str
+    portfolio: PortfolioRepository
+    reviews: ReviewRepository
+    contacts: ContactRepository
+    quotes: QuoteRepository
+    projects: ProjectRepository
+    admins: AdminRepository
+    idempotency: IdempotencyRepository
+    refresh_tokens: RefreshTokenRepository
+    assets: AssetRepository
+    rollups: RollupRepository
+    jobs: JobRepository
+    state: StateRepository
+    migrations: MigrationRepository
+
+    async def open(self):
+        """Acquire connections / create the schema before serving"""
+
+    async def ensure_indexes(self):
+        """Create secondary indexes (may run in the background)"""
+
+    def with_profile(self, name: str) -> "Storage":
+        """This storage with the read/write profile `name` applied (see
+        database.PROFILES); backends without replicas return themselves"""
+        return self
+
+    @abstractmethod
+    async def ping(self): ...
+
+    async def close(self):
+        pass
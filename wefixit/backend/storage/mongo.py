@@ -0,0 +1,503 @@
+# backend/storage/mongo.py
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from backend.storage.base import (
+    AdminRepository, AssetRepository, ContactRepository, Doc, IdempotencyRepository,
+    MigrationRepository, PortfolioRepository, ProjectRepository, JobRepository, QuoteRepository, RefreshTokenRepository,
+    ReviewRepository, RollupRepository, StateRepository,
+    Storage,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _oid(value: str) -> Optional[ObjectId]:
+    return ObjectId(value) if ObjectId.is_valid(value) else None
+
+
+def _projection(fields: Optional[List[str]]) -> Optional[Dict[str, int]]:
+    return {field: 1 for field in fields} if fields else None
+
+
+class _Collection:
+    def __init__(self, db, name: str):
+        self.db = db
+        self.collection = db[name]
+
+    async def get(self, doc_id: str) -> Optional[Doc]:
+        oid = _oid(doc_id)
+        return await self.collection.find_one({"_id": oid}) if oid else None
+
+    async def get_many(self, doc_ids: List[str], fields: Optional[List[str]] = None) -> List[Doc]:
+        oids = [oid for oid in map(_oid, doc_ids) if oid is not None]
+        if not oids:
+            return []
+        return await self.collection.find({"_id": {"$in": oids}}, _projection(fields)).to_list(len(oids))
+
+    async def create(self, data: Doc) -> Doc:
+        result = await self.collection.insert_one(data)
+        data["_id"] = result.inserted_id
+        return data
+
+    async def update(self, doc_id: str, updates: Doc) -> Optional[Doc]:
+        oid = _oid(doc_id)
+        if oid is None:
+            return None
+        if not updates:
+            return await self.collection.find_one({"_id": oid})
+        return await self.collection.find_one_and_update(
+            {"_id": oid}, {"$set": updates}, return_document=ReturnDocument.AFTER
+        )
+
+    async def delete(self, doc_id: str) -> bool:
+        oid = _oid(doc_id)
+        if oid is None:
+            return False
+        result = await self.collection.delete_one({"_id": oid})
+        return result.deleted_count > 0
+
+    async def list_created_after(self, after_id: str, limit: int) -> List[Doc]:
+        cursor = self.collection.find({"_id": {"$gt": ObjectId(after_id)}}).sort("_id", ASCENDING).limit(limit)
+        return await cursor.to_list(limit)
+
+
+class _Archivable:
+    """Archive side of a collection: `<name>_archive`. Documents are copied
+    before they are deleted, so an interrupted batch is simply redone"""
+
+    archive_filter: Dict[str, Any] = {}
+
+    @property
+    def archive(self):
+        return self.db[f"{self.collection.name}_archive"]
+
+    def _archivable(self, cutoff: datetime) -> Dict[str, Any]:
+        return {**self.archive_filter, "created_at": {"$lt": cutoff}}
+
+    async def count_archivable(self, cutoff: datetime) -> int:
+        return await self.collection.count_documents(self._archivable(cutoff))
+
+    async def archive_batch(self, cutoff: datetime, limit: int) -> int:
+        cursor = self.collection.find(self._archivable(cutoff)).sort("created_at", ASCENDING).limit(limit)
+        docs = await cursor.to_list(limit)
+        if not docs:
+            return 0
+        archived_at = datetime.utcnow()
+        for doc in docs:
+            doc["archived_at"] = archived_at
+        try:
+            await self.archive.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            # Already archived by an earlier, interrupted batch
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+        await self.collection.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}})
+        return len(docs)
+
+    async def list_archived(self, limit=100, offset=0) -> List[Doc]:
+        cursor = self.archive.find().sort("created_at", DESCENDING).skip(offset).limit(limit)
+        return await cursor.to_list(limit)
+
+
+class MongoPortfolioRepository(_Collection, PortfolioRepository):
+    @staticmethod
+    def _filter(is_active=None, is_featured=None) -> Dict[str, Any]:
+        q: Dict[str, Any] = {}
+        if is_active is not None:
+            q["is_active"] = is_active
+        if is_featured is not None:
+            q["is_featured"] = is_featured
+        return q
+
+    async def list(
+        self, is_active=None, is_featured=None, limit=20, offset=0,
+        category=None, tags=None, match_all_tags=False, fields=None,
+    ) -> Tuple[int, List[Doc]]:
+        q = self._filter(is_active, is_featured)
+        if category is not None:
+            q["category"] = category
+        if tags:
+            q["tags"] = {"$all" if match_all_tags else "$in": tags}
+
+        total = await self.collection.count_documents(q)
+        cursor = self.collection.find(q, _projection(fields)).sort("created_at", DESCENDING).skip(offset).limit(limit)
+        return total, await cursor.to_list(limit)
+
+
+    async def facets(self, is_active=None, is_featured=None) -> Doc:
+        # One round trip; the tags branch walks the multikey index entries
+        pipeline = [
+            {"$match": self._filter(is_active, is_featured)},
+            {"$facet": {
+                "total": [{"$count": "n"}],
+                "categories": [
+                    {"$match": {"category": {"$nin": [None, ""]}}},
+                    {"$sortByCount": "$category"},
+                ],
+                "tags": [{"$unwind": "$tags"}, {"$sortByCount": "$tags"}],
+            }},
+        ]
+        result = (await self.collection.aggregate(pipeline).to_list(1))[0]
+        return {
+            "total": result["total"][0]["n"] if result["total"] else 0,
+            "categories": [(row["_id"], row["count"]) for row in result["categories"]],
+            "tags": [(row["_id"], row["count"]) for row in result["tags"]],
+        }
+
+    async def asset_references(self, after_id, limit) -> List[Doc]:
+        inline = {"$eq": [{"$substrCP": [{"$ifNull": ["$image", ""]}, 0, 5]}, "data:"]}
+        pipeline = [
+            {"$match": {"_id": {"$gt": ObjectId(after_id)}} if after_id else {}},
+            {"$sort": {"_id": ASCENDING}},
+            {"$limit": limit},
+            {"$project": {"link": 1, "description": 1, "image": {"$cond": [inline, None, "$image"]}}},
+        ]
+        return await self.collection.aggregate(pipeline).to_list(limit)
+
+
+class MongoReviewRepository(_Collection, ReviewRepository):
+    async def list(self, published=None, limit=50, offset=0, fields=None) -> List[Doc]:
+        q: Dict[str, Any] = {}
+        if published is not None:
+            q["published"] = published
+        cursor = self.collection.find(q, _projection(fields)).sort("created_at", DESCENDING).skip(offset).limit(limit)
+        return await cursor.to_list(limit)
+
+    async def stats(self, published=None) -> Doc:
+        match = {} if published is None else {"published": published}
+        pipeline = [
+            {"$match": match},
+            {"$group": {"_id": None, "count": {"$sum": 1}, "average_rating": {"$avg": "$rating"}}},
+        ]
+        rows = await self.collection.aggregate(pipeline).to_list(1)
+        if not rows:
+            return {"count": 0, "average_rating": None}
+        return {"count": rows[0]["count"], "average_rating": rows[0]["average_rating"]}
+
+
+class MongoContactRepository(_Archivable, _Collection, ContactRepository):
+    archive_filter = {"read": True}
+
+    async def list(self, limit=100, offset=0) -> List[Doc]:
+        return await self.collection.find().sort("created_at", DESCENDING).skip(offset).limit(limit).to_list(limit)
+
+    async def mark_read(self, contact_id: str) -> bool:
+        oid = _oid(contact_id)
+        if oid is None:
+            return False
+        result = await self.collection.update_one({"_id": oid}, {"$set": {"read": True}})
+        return result.matched_count > 0
+
+
+class MongoQuoteRepository(_Archivable, _Collection, QuoteRepository):
+    archive_filter = {"replies.0": {"$exists": True}}  # replied to
+
+    async def list(self, limit=100, offset=0) -> List[Doc]:
+        # Oldest first, like SQLite's ORDER BY id (ObjectIds grow with time)
+        return await self.collection.find().sort("_id", ASCENDING).skip(offset).limit(limit).to_list(limit)
+
+    async def add_reply(self, quote_id: str, reply: Doc) -> bool:
+        oid = _oid(quote_id)
+        if oid is None:
+            return False
+        result = await self.collection.update_one({"_id": oid}, {"$push": {"replies": reply}})
+        return result.matched_count > 0
+
+    async def set_replies(self, quote_id: str, replies: List[Doc]) -> bool:
+        return await self.update(quote_id, {"replies": replies}) is not None
+
+
+class MongoProjectRepository(_Collection, ProjectRepository):
+    async def list(self, fields=None) -> List[Doc]:
+        return await self.collection.find({}, _projection(fields)).to_list(None)
+
+
+class MongoAdminRepository(_Collection, AdminRepository):
+    async def get_by_username(self, username: str) -> Optional[Doc]:
+        return await self.collection.find_one({"username": username})
+
+    async def set_password_hash(self, username: str, password_hash: str) -> bool:
+        result = await self.collection.update_one(
+            {"username": username}, {"$set": {"password_hash": password_hash}}
+        )
+        return result.matched_count > 0
+
+
+class MongoIdempotencyRepository(_Collection, IdempotencyRepository):
+    async def insert(self, record: Doc) -> bool:
+        try:
+            await self.collection.insert_one(record)
+            return True
+        except DuplicateKeyError:
+            return False
+
+    async def replace_expired(self, record: Doc, now: datetime) -> bool:
+        result = await self.collection.replace_one(
+            {"_id": record["_id"], "expires_at": {"$lte": now}}, record
+        )
+        return result.modified_count > 0
+
+    async def get(self, record_id: str) -> Optional[Doc]:
+        return await self.collection.find_one({"_id": record_id})
+
+    async def complete(self, record_id: str, response: Doc, expires_at: datetime):
+        await self.collection.update_one(
+            {"_id": record_id},
+            {"$set": {"status": "completed", "response": response, "expires_at": expires_at}},
+        )
+
+    async def release(self, record_id: str):
+        await self.collection.delete_one({"_id": record_id, "status": "pending"})
+
+
+class MongoRefreshTokenRepository(_Collection, RefreshTokenRepository):
+    async def insert(self, record: Doc):
+        await self.collection.insert_one(record)
+
+    async def get(self, token_id: str) -> Optional[Doc]:
+        return await self.collection.find_one({"_id": token_id})
+
+    async def mark_used(self, token_id: str, used_at: datetime, replaced_by: str) -> bool:
+        result = await self.collection.update_one(
+            {"_id": token_id, "used_at": None, "revoked": False},
+            {"$set": {"used_at": used_at, "replaced_by": replaced_by}},
+        )
+        return result.modified_count > 0
+
+    async def revoke_family(self, family_id: str) -> int:
+        result = await self.collection.update_many({"family_id": family_id}, {"$set": {"revoked": True}})
+        return result.modified_count
+
+    async def revoke_user(self, username: str) -> int:
+        result = await self.collection.update_many(
+            {"username": username, "revoked": False}, {"$set": {"revoked": True}}
+        )
+        return result.modified_count
+
+    async def list_active(self, username: str, now: datetime) -> List[Doc]:
+        query = {"username": username, "used_at": None, "revoked": False, "expires_at": {"$gt": now}}
+        return await self.collection.find(query, {"token_hash": 0}).sort("created_at", DESCENDING).to_list(None)
+
+
+class MongoAssetRepository(_Collection, AssetRepository):
+    async def attach(self, paths: List[str], owner: str, now: datetime):
+        if not paths:
+            return
+        await self.collection.bulk_write([
+            UpdateOne(
+                {"_id": path},
+                {"$addToSet": {"owners": owner}, "$set": {"released_at": None}, "$setOnInsert": {"registered_at": now}},
+                upsert=True,
+            )
+            for path in paths
+        ], ordered=False)
+
+    async def release(self, owner: str, keep: List[str], now: datetime) -> int:
+        result = await self.collection.update_many({"owners": owner, "_id": {"$nin": keep}}, {"$pull": {"owners": owner}})
+        if result.modified_count:
+            # Per document, so an owner attached in between keeps its file
+            await self.collection.update_many({"owners": {"$size": 0}, "released_at": None}, {"$set": {"released_at": now}})
+        return result.modified_count
+
+    async def list_released(self, before: datetime, after_id: Optional[str], limit: int) -> List[Doc]:
+        q: Dict[str, Any] = {"released_at": {"$lte": before}}
+        if after_id is not None:
+            q["_id"] = {"$gt": after_id}
+        return await self.collection.find(q).sort("_id", ASCENDING).limit(limit).to_list(limit)
+
+    async def forget(self, path: str, before: datetime) -> bool:
+        result = await self.collection.delete_one({"_id": path, "released_at": {"$lte": before}})
+        return result.deleted_count > 0
+
+
+class MongoRollupRepository(_Collection, RollupRepository):
+    async def increment(self, granularity: str, bucket: datetime, counters: Dict[str, int]):
+        await self.collection.update_one(
+            {"_id": f"{granularity}:{bucket.isoformat()}"},
+            {"$inc": counters, "$setOnInsert": {"granularity": granularity, "bucket": bucket}},
+            upsert=True,
+        )
+
+    async def list(self, granularity: str, start: datetime, end: datetime) -> List[Doc]:
+        query = {"granularity": granularity, "bucket": {"$gte": start, "$lt": end}}
+        return await self.collection.find(query).sort("bucket", ASCENDING).to_list(None)
+
+    async def replace_range(self, start: datetime, end: datetime, docs: List[Doc]):
+        await self.collection.delete_many({"bucket": {"$gte": start, "$lt": end}})
+        if docs:
+            await self.collection.insert_many(docs, ordered=False)
+
+
+class MongoJobRepository(_Collection, JobRepository):
+    async def enqueue(self, job: Doc) -> bool:
+        try:
+            await self.collection.insert_one(job)
+            return True
+        except DuplicateKeyError:
+            return False
+
+    async def claim(self, queue: str, worker: str, now: datetime, lease_until: datetime) -> Optional[Doc]:
+        return await self.collection.find_one_and_update(
+            {
+                "queue": queue,
+                "$or": [
+                    {"status": "queued", "run_at": {"$lte": now}},
+                    {"status": "running", "lease_until": {"$lt": now}},  # its worker died
+                ],
+            },
+            {
+                "$set": {"status": "running", "worker": worker, "lease_until": lease_until, "started_at": now},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("run_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def heartbeat(self, job_id: str, worker: str, lease_until: datetime) -> bool:
+        result = await self.collection.update_one(
+            {"_id": job_id, "worker": worker, "status": "running"}, {"$set": {"lease_until": lease_until}}
+        )
+        return result.matched_count > 0
+
+    async def finish(self, job_id: str, worker: str, updates: Doc) -> bool:
+        result = await self.collection.update_one(
+            {"_id": job_id, "worker": worker, "status": "running"}, {"$set": updates}
+        )
+        return result.matched_count > 0
+
+    async def counts(self, now: datetime) -> Dict[str, Dict[str, int]]:
+        pipeline = [
+            {"$group": {
+                "_id": {
+                    "queue": "$queue",
+                    "status": {"$cond": [
+                        {"$and": [{"$eq": ["$status", "queued"]}, {"$gt": ["$run_at", now]}]}, "scheduled", "$status",
+                    ]},
+                },
+                "count": {"$sum": 1},
+            }},
+        ]
+        counts: Dict[str, Dict[str, int]] = {}
+        async for row in self.collection.aggregate(pipeline):
+            counts.setdefault(row["_id"]["queue"], {})[row["_id"]["status"]] = row["count"]
+        return counts
+
+    async def list(self, queue=None, status=None, limit=50) -> List[Doc]:
+        q = {key: value for key, value in (("queue", queue), ("status", status)) if value is not None}
+        return await self.collection.find(q).sort("run_at", DESCENDING).limit(limit).to_list(limit)
+
+    async def requeue(self, job_id: str, now: datetime) -> bool:
+        result = await self.collection.update_one(
+            {"_id": job_id, "status": {"$in": ["dead", "done"]}},
+            {"$set": {"status": "queued", "run_at": now, "attempts": 0, "expire_at": None}},
+        )
+        return result.modified_count > 0
+
+
+class MongoStateRepository(_Collection, StateRepository):
+    async def get(self, key: str) -> Optional[Doc]:
+        return await self.collection.find_one({"_id": key})
+
+    async def save(self, key: str, values: Doc):
+        await self.collection.replace_one({"_id": key}, {**values, "_id": key}, upsert=True)
+
+
+class MongoMigrationRepository(_Collection, MigrationRepository):
+    async def list(self) -> List[Doc]:
+        return await self.collection.find({}).to_list(None)
+
+    async def save(self, record: Doc):
+        await self.collection.replace_one({"_id": record["_id"]}, record, upsert=True)
+
+    async def scan(self, collection, after_id, limit, query=None) -> List[Doc]:
+        q = dict(query or {})
+        if after_id is not None:
+            q["_id"] = {"$gt": _oid(after_id) or after_id}
+        return await self.db[collection].find(q).sort("_id", ASCENDING).limit(limit).to_list(limit)
+
+    async def bulk_update(self, collection, changes) -> int:
+        operations = []
+        for doc_id, set_fields, unset_fields in changes:
+            update: Dict[str, Any] = {}
+            if set_fields:
+                update["$set"] = set_fields
+            if unset_fields:
+                update["$unset"] = {field: "" for field in unset_fields}
+            if update:
+                operations.append(UpdateOne({"_id": doc_id}, update))
+        if not operations:
+            return 0
+        result = await self.db[collection].bulk_write(operations, ordered=False)
+        return result.modified_count
+
+
+# (collection, keys, options) created on startup; failures are logged, not fatal
+INDEXES = [
+    ("idempotency_keys", [("expires_at", ASCENDING)], {"expireAfterSeconds": 0}),
+    ("refresh_tokens", [("expires_at", ASCENDING)], {"expireAfterSeconds": 0}),
+    ("refresh_tokens", [("username", ASCENDING), ("created_at", DESCENDING)], {}),
+    ("refresh_tokens", [("family_id", ASCENDING)], {}),
+    ("assets", [("owners", ASCENDING)], {}),
+    ("assets", [("released_at", ASCENDING)], {}),
+    ("analytics_rollups", [("granularity", ASCENDING), ("bucket", ASCENDING)], {}),
+    ("analytics_rollups", [("bucket", ASCENDING)], {}),
+    ("jobs", [("queue", ASCENDING), ("status", ASCENDING), ("run_at", ASCENDING)], {}),
+    ("jobs", [("queue", ASCENDING), ("status", ASCENDING), ("lease_until", ASCENDING)], {}),
+    ("jobs", [("expire_at", ASCENDING)], {"expireAfterSeconds": 0}),  # finished jobs
+    ("portfolio", [("is_active", ASCENDING), ("created_at", DESCENDING)], {}),
+    ("portfolio", [("is_featured", ASCENDING), ("created_at", DESCENDING)], {}),
+    ("portfolio", [("category", ASCENDING), ("created_at", DESCENDING)], {}),
+    ("portfolio", [("tags", ASCENDING), ("created_at", DESCENDING)], {}),  # multikey
+    ("reviews", [("published", ASCENDING), ("created_at", DESCENDING)], {}),
+    ("contacts", [("created_at", DESCENDING)], {}),
+    ("contacts", [("read", ASCENDING), ("created_at", ASCENDING)], {}),
+    ("quotes", [("created_at", ASCENDING)], {}),
+    ("contacts_archive", [("created_at", DESCENDING)], {}),
+    ("quotes_archive", [("created_at", DESCENDING)], {}),
+    ("admins", [("username", ASCENDING)], {}),
+]
+
+
+class MongoStorage(Storage):
+    name = "mongo"
+
+    def __init__(self, db, profile: str = "default"):
+        self.db = db
+        self.profile = profile
+        self._profiles: Dict[str, "MongoStorage"] = {profile: self}
+        self.portfolio = MongoPortfolioRepository(db, "portfolio")
+        self.reviews = MongoReviewRepository(db, "reviews")
+        self.contacts = MongoContactRepository(db, "contacts")
+        self.quotes = MongoQuoteRepository(db, "quotes")
+        self.projects = MongoProjectRepository(db, "projects")
+        self.admins = MongoAdminRepository(db, "admins")
+        self.idempotency = MongoIdempotencyRepository(db, "idempotency_keys")
+        self.refresh_tokens = MongoRefreshTokenRepository(db, "refresh_tokens")
+        self.assets = MongoAssetRepository(db, "assets")
+        self.rollups = MongoRollupRepository(db, "analytics_rollups")
+        self.jobs = MongoJobRepository(db, "jobs")
+        self.state = MongoStateRepository(db, "app_state")
+        self.migrations = MongoMigrationRepository(db, "migrations")
+
+    def with_profile(self, name: str) -> "MongoStorage":
+        storage = self._profiles.get(name)
+        if storage is None:
+            from backend.database import get_db
+            storage = self._profiles[name] = MongoStorage(get_db(name), name)
+        return storage
+
+    async def ensure_indexes(self):
+        for name, keys, options in INDEXES:
+            try:
+                await self.db[name].create_index(keys, **options)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not create index on {name}: {e}")
+
+    async def ping(self):
+        await self.db.command("ping")
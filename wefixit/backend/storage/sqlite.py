@@ -0,0 +1,971 @@
+# backend/storage/sqlite.py
+"""Embedded SQLite backend for single-node deployments and CI.
+
+Each table keeps the full document as extended JSON in `doc`, next to the
+columns we filter and sort on (with indexes on those columns). All access
+goes through one connection on a dedicated thread; the queries are fixed,
+parameterised SQL strings, so sqlite3's statement cache reuses the prepared
+statements instead of re-compiling them.
+
+Databases from the earlier SQLAlchemy layout (a `reviews` table of plain
+columns, `portfolio_items`, `admin_users`) are upgraded on open: their
+rows are copied into the document tables and the old `reviews` table is
+kept as `reviews_legacy`. PRAGMA user_version records the schema version.
+"""
+import asyncio
+import logging
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from bson import ObjectId, json_util
+
+from backend.storage.base import (
+    AdminRepository, AssetRepository, ContactRepository, Doc, IdempotencyRepository,
+    MigrationRepository, PortfolioRepository, ProjectRepository, JobRepository, QuoteRepository, RefreshTokenRepository,
+    ReviewRepository, RollupRepository, StateRepository,
+    Storage,
+)
+from backend.tracing import span
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS portfolio (
+    id TEXT PRIMARY KEY,
+    is_active INTEGER,
+    is_featured INTEGER,
+    created_at TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS portfolio_active_created ON portfolio (is_active, created_at DESC);
+CREATE INDEX IF NOT EXISTS portfolio_featured_created ON portfolio (is_featured, created_at DESC);
+CREATE INDEX IF NOT EXISTS portfolio_created ON portfolio (created_at DESC);
+CREATE INDEX IF NOT EXISTS portfolio_category_created ON portfolio (json_extract(doc, '$.category'), created_at DESC);
+
+CREATE TABLE IF NOT EXISTS reviews (
+    id TEXT PRIMARY KEY,
+    published INTEGER,
+    created_at TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reviews_published_created ON reviews (published, created_at DESC);
+CREATE INDEX IF NOT EXISTS reviews_created ON reviews (created_at DESC);
+
+CREATE TABLE IF NOT EXISTS contacts (
+    id TEXT PRIMARY KEY,
+    created_at TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS contacts_created ON contacts (created_at DESC);
+
+CREATE TABLE IF NOT EXISTS quotes (
+    id TEXT PRIMARY KEY,
+    created_at TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS quotes_created ON quotes (created_at DESC);
+
+CREATE TABLE IF NOT EXISTS contacts_archive (
+    id TEXT PRIMARY KEY,
+    created_at TEXT,
+    archived_at TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS contacts_archive_created ON contacts_archive (created_at DESC);
+
+CREATE TABLE IF NOT EXISTS quotes_archive (
+    id TEXT PRIMARY KEY,
+    created_at TEXT,
+    archived_at TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS quotes_archive_created ON quotes_archive (created_at DESC);
+
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    doc TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS admins (
+    id TEXT PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE,
+    doc TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    id TEXT PRIMARY KEY,
+    expires_at TEXT NOT NULL,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idempotency_keys_expires ON idempotency_keys (expires_at);
+
+CREATE TABLE IF NOT EXISTS refresh_tokens (
+    id TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    family_id TEXT NOT NULL,
+    expires_at TEXT NOT NULL,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS refresh_tokens_username ON refresh_tokens (username);
+CREATE INDEX IF NOT EXISTS refresh_tokens_family ON refresh_tokens (family_id);
+CREATE INDEX IF NOT EXISTS refresh_tokens_expires ON refresh_tokens (expires_at);
+
+CREATE TABLE IF NOT EXISTS assets (
+    id TEXT PRIMARY KEY,
+    released_at TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS assets_released ON assets (released_at);
+
+CREATE TABLE IF NOT EXISTS analytics_rollups (
+    id TEXT PRIMARY KEY,
+    granularity TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analytics_rollups_bucket ON analytics_rollups (granularity, bucket);
+CREATE INDEX IF NOT EXISTS analytics_rollups_range ON analytics_rollups (bucket);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    queue TEXT NOT NULL,
+    status TEXT NOT NULL,
+    run_at TEXT NOT NULL,
+    lease_until TEXT,
+    expire_at TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_due ON jobs (queue, status, run_at);
+CREATE INDEX IF NOT EXISTS jobs_lease ON jobs (queue, status, lease_until);
+CREATE INDEX IF NOT EXISTS jobs_expire ON jobs (expire_at);
+
+CREATE TABLE IF NOT EXISTS app_state (
+    id TEXT PRIMARY KEY,
+    doc TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS migrations (
+    id TEXT PRIMARY KEY,
+    doc TEXT NOT NULL
+);
+"""
+
+
+# ----------------------------
+# Encoding helpers
+# ----------------------------
+def _timestamp(value: Any) -> Optional[str]:
+    """Sortable text for a datetime column (naive UTC, like BSON dates)"""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat(timespec="milliseconds")
+    return value
+
+
+def _flag(value: Any) -> Optional[int]:
+    return None if value is None else int(bool(value))
+
+
+def _dumps(doc: Doc) -> str:
+    return json_util.dumps(doc)
+
+
+def _project(docs: List[Doc], fields: Optional[List[str]]) -> List[Doc]:
+    if not fields:
+        return docs
+    keep = {"_id", *fields}
+    return [{key: value for key, value in doc.items() if key in keep} for doc in docs]
+
+
+def _loads(raw: str) -> Doc:
+    doc = json_util.loads(raw)
+    if isinstance(doc.get("_id"), ObjectId):
+        doc["_id"] = str(doc["_id"])
+    return doc
+
+
+# ----------------------------
+# Schema upgrade
+# ----------------------------
+def _columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _legacy_time(value: Any) -> datetime:
+    """SQLAlchemy DATETIME text ("2024-01-01 10:00:00[.ffffff]") as naive UTC"""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return datetime.utcnow()
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+def _legacy_id(created_at: Optional[datetime]) -> str:
+    """An ObjectId carrying the row's creation time, so ids still sort in
+    creation order (see list_created_after)"""
+    stamp = ObjectId.from_datetime(created_at.replace(tzinfo=timezone.utc)) if created_at else ObjectId()
+    return str(ObjectId(stamp.binary[:4] + ObjectId().binary[4:]))
+
+
+def _legacy_review(row: sqlite3.Row) -> Doc:
+    return {
+        "name": row["name"],
+        "rating": row["rating"],
+        "comment": row["comment"],
+        "published": bool(row["published"]) if row["published"] is not None else True,
+        "created_at": _legacy_time(row["created_at"]),
+        "legacy_id": row["id"],
+    }
+
+
+def _legacy_portfolio(row: sqlite3.Row) -> Doc:
+    tags = row["tags"]
+    try:
+        tags = json_util.loads(tags) if isinstance(tags, str) else tags
+    except ValueError:
+        tags = None
+    return {
+        "title": row["title"],
+        "description": row["description"],
+        "image": row["image_url"],
+        "link": row["link"],
+        "tags": tags if isinstance(tags, list) else [],
+        "is_featured": bool(row["is_featured"]),
+        "is_active": bool(row["is_active"]) if row["is_active"] is not None else True,
+        "created_at": _legacy_time(row["created_at"]),
+        "legacy_id": row["id"],
+    }
+
+
+def _legacy_admin(row: sqlite3.Row) -> Doc:
+    return {"username": row["username"], "password_hash": row["password_hash"], "legacy_id": row["id"]}
+
+
+def _upgrade(conn: sqlite3.Connection):
+    """Create the schema, first moving a legacy `reviews` table (no doc
+    column) out of the way and then copying the legacy rows in, all in one
+    transaction; the other workers wait on the write lock"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            conn.execute("COMMIT")  # another worker upgraded it meanwhile
+            return
+        reviews = _columns(conn, "reviews")
+        moved = bool(reviews) and "doc" not in reviews
+        if moved:
+            conn.execute("ALTER TABLE reviews RENAME TO reviews_legacy")
+        for statement in SCHEMA.split(";"):
+            if statement.strip():
+                conn.execute(statement)
+        legacy = [
+            ("reviews_legacy", SQLiteReviewRepository, _legacy_review),
+            ("portfolio_items", SQLitePortfolioRepository, _legacy_portfolio),
+            ("admin_users", SQLiteAdminRepository, _legacy_admin),
+        ]
+        for source, repository, to_doc in legacy:
+            if not _columns(conn, source) or (source == "reviews_legacy" and not moved):
+                continue
+            table = repository(None)
+            rows = conn.execute(f"SELECT * FROM {source} ORDER BY id").fetchall()
+            for row in rows:
+                doc = to_doc(row)
+                doc["_id"] = _legacy_id(doc.get("created_at"))
+                conn.execute(table._insert_sql, [doc["_id"], *table._values(doc)])
+            logger.info(f"🔧 Copied {len(rows)} rows from legacy table {source} into {table.table}")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+class SQLiteConnection:
+    """Async facade over a single sqlite3 connection owned by one thread"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None, cached_statements=256
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")  # other gunicorn workers may hold the write lock
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            _upgrade(conn)
+        else:
+            conn.executescript(SCHEMA)
+        self._conn = conn
+
+    async def _run(self, fn: Callable, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def open(self):
+        await self._run(self._open)
+
+    async def close(self):
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=False)
+
+    async def fetchall(self, sql: str, params: Sequence = ()) -> List[sqlite3.Row]:
+        with span("sqlite.query", **{"db.system": "sqlite", "db.statement": sql}):
+            return await self._run(lambda: self._conn.execute(sql, params).fetchall())
+
+    async def fetchone(self, sql: str, params: Sequence = ()) -> Optional[sqlite3.Row]:
+        with span("sqlite.query", **{"db.system": "sqlite", "db.statement": sql}):
+            return await self._run(lambda: self._conn.execute(sql, params).fetchone())
+
+    async def execute(self, sql: str, params: Sequence = ()) -> int:
+        """Run one write statement; returns the number of affected rows"""
+        with span("sqlite.execute", **{"db.system": "sqlite", "db.statement": sql}):
+            return await self._run(lambda: self._conn.execute(sql, params).rowcount)
+
+    async def transaction(self, fn: Callable[[sqlite3.Connection], Any]):
+        """Run `fn(conn)` atomically on the connection thread"""
+
+        def run():
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+        with span("sqlite.transaction", **{"db.system": "sqlite"}):
+            return await self._run(run)
+
+
+class _Table:
+    """A document table: `columns` maps indexed column -> extractor(doc)"""
+
+    table: str = ""
+    columns: Dict[str, Callable[[Doc], Any]] = {}
+
+    def __init__(self, conn: SQLiteConnection):
+        self.conn = conn
+        names = ["id", *self.columns, "doc"]
+        self._insert_sql = (
+            f"INSERT INTO {self.table} ({', '.join(names)}) "
+            f"VALUES ({', '.join('?' for _ in names)})"
+        )
+        sets = ", ".join(f"{name} = ?" for name in [*self.columns, "doc"])
+        self._update_sql = f"UPDATE {self.table} SET {sets} WHERE id = ?"
+
+    def _values(self, doc: Doc) -> List[Any]:
+        return [extract(doc) for extract in self.columns.values()] + [_dumps(doc)]
+
+    async def _select(self, where: str = "", params: Sequence = (), suffix: str = "") -> List[Doc]:
+        sql = f"SELECT doc FROM {self.table}"
+        if where:
+            sql += f" WHERE {where}"
+        rows = await self.conn.fetchall(f"{sql} {suffix}", params)
+        return [_loads(row["doc"]) for row in rows]
+
+    async def _count(self, where: str = "", params: Sequence = ()) -> int:
+        sql = f"SELECT COUNT(*) AS n FROM {self.table}"
+        if where:
+            sql += f" WHERE {where}"
+        return (await self.conn.fetchone(sql, params))["n"]
+
+    async def get(self, doc_id: str) -> Optional[Doc]:
+        docs = await self._select("id = ?", (str(doc_id),))
+        return docs[0] if docs else None
+
+    async def get_many(self, doc_ids: List[str], fields: Optional[List[str]] = None) -> List[Doc]:
+        if not doc_ids:
+            return []
+        placeholders = ", ".join("?" for _ in doc_ids)
+        return _project(await self._select(f"id IN ({placeholders})", [str(i) for i in doc_ids]), fields)
+
+    async def create(self, data: Doc) -> Doc:
+        data["_id"] = str(data.get("_id") or ObjectId())
+        await self.conn.execute(self._insert_sql, [data["_id"], *self._values(data)])
+        return data
+
+    async def update(self, doc_id: str, updates: Doc) -> Optional[Doc]:
+        def run(conn: sqlite3.Connection):
+            row = conn.execute(f"SELECT doc FROM {self.table} WHERE id = ?", (str(doc_id),)).fetchone()
+            if row is None:
+                return None
+            doc = _loads(row["doc"])
+            doc.update(updates)
+            conn.execute(self._update_sql, [*self._values(doc), doc["_id"]])
+            return doc
+
+        return await self.conn.transaction(run)
+
+    async def delete(self, doc_id: str) -> bool:
+        return await self.conn.execute(f"DELETE FROM {self.table} WHERE id = ?", (str(doc_id),)) > 0
+
+    async def list_created_after(self, after_id: str, limit: int) -> List[Doc]:
+        # ObjectId hex strings sort in creation order
+        return await self._select("id > ?", (str(after_id), limit), "ORDER BY id ASC LIMIT ?")
+
+
+def _conditions(filters: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+    clauses, params = [], []
+    for column, value in filters.items():
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    return clauses, params
+
+
+def _where(filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    clauses, params = _conditions(filters)
+    return " AND ".join(clauses), params
+
+
+class _Archivable:
+    """Archive side of a table: `<table>_archive`, moved in one transaction"""
+
+    archive_where = ""
+
+    async def count_archivable(self, cutoff: datetime) -> int:
+        return await self._count(f"created_at < ? AND {self.archive_where}", (_timestamp(cutoff),))
+
+    async def archive_batch(self, cutoff: datetime, limit: int) -> int:
+        now = datetime.utcnow()
+
+        def run(conn: sqlite3.Connection):
+            rows = conn.execute(
+                f"SELECT id, created_at, doc FROM {self.table} "
+                f"WHERE created_at < ? AND {self.archive_where} ORDER BY created_at LIMIT ?",
+                (_timestamp(cutoff), limit),
+            ).fetchall()
+            archived = []
+            for row in rows:
+                doc = _loads(row["doc"])
+                doc["archived_at"] = now
+                archived.append((row["id"], row["created_at"], _timestamp(now), _dumps(doc)))
+            conn.executemany(
+                f"INSERT OR IGNORE INTO {self.table}_archive (id, created_at, archived_at, doc) VALUES (?, ?, ?, ?)",
+                archived,
+            )
+            conn.executemany(f"DELETE FROM {self.table} WHERE id = ?", [(row["id"],) for row in rows])
+            return len(rows)
+
+        return await self.conn.transaction(run)
+
+    async def list_archived(self, limit=100, offset=0) -> List[Doc]:
+        rows = await self.conn.fetchall(
+            f"SELECT doc FROM {self.table}_archive ORDER BY created_at DESC LIMIT ? OFFSET ?", (limit, offset)
+        )
+        return [_loads(row["doc"]) for row in rows]
+
+
+class SQLitePortfolioRepository(_Table, PortfolioRepository):
+    table = "portfolio"
+    columns = {
+        "is_active": lambda d: _flag(d.get("is_active", True)),
+        "is_featured": lambda d: _flag(d.get("is_featured", False)),
+        "created_at": lambda d: _timestamp(d.get("created_at")),
+    }
+
+    async def list(
+        self, is_active=None, is_featured=None, limit=20, offset=0,
+        category=None, tags=None, match_all_tags=False, fields=None,
+    ):
+        where, params = _where({"is_active": _flag(is_active), "is_featured": _flag(is_featured)})
+        clauses = [where] if where else []
+        if category is not None:
+            clauses.append("json_extract(doc, '$.category') = ?")  # expression index
+            params.append(category)
+        if tags:
+            tags = sorted(set(tags))
+            marks = ", ".join("?" for _ in tags)
+            if match_all_tags:
+                clauses.append(
+                    f"(SELECT COUNT(DISTINCT value) FROM json_each(portfolio.doc, '$.tags') "
+                    f"WHERE value IN ({marks})) = ?"
+                )
+                params.extend([*tags, len(tags)])
+            else:
+                clauses.append(f"EXISTS (SELECT 1 FROM json_each(portfolio.doc, '$.tags') WHERE value IN ({marks}))")
+                params.extend(tags)
+        where = " AND ".join(clauses)
+
+        total = await self._count(where, params)
+        docs = await self._select(
+            where, [*params, limit, offset], "ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        )
+        return total, _project(docs, fields)
+
+    async def facets(self, is_active=None, is_featured=None):
+        clauses, params = _conditions({"is_active": _flag(is_active), "is_featured": _flag(is_featured)})
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        categories = await self.conn.fetchall(
+            "SELECT category AS value, COUNT(*) AS n FROM "
+            f"(SELECT json_extract(doc, '$.category') AS category FROM portfolio {where}) "
+            "WHERE category IS NOT NULL AND category != '' GROUP BY category ORDER BY n DESC, value",
+            params,
+        )
+        tags = await self.conn.fetchall(
+            "SELECT tag.value AS value, COUNT(*) AS n FROM portfolio, json_each(portfolio.doc, '$.tags') AS tag "
+            f"{where} GROUP BY tag.value ORDER BY n DESC, tag.value",
+            params,
+        )
+        return {
+            "total": await self._count(" AND ".join(clauses), params),
+            "categories": [(row["value"], row["n"]) for row in categories],
+            "tags": [(row["value"], row["n"]) for row in tags],
+        }
+
+    async def asset_references(self, after_id, limit):
+        rows = await self.conn.fetchall(
+            "SELECT id, json_extract(doc, '$.link') AS link, json_extract(doc, '$.description') AS description, "
+            "CASE WHEN substr(json_extract(doc, '$.image'), 1, 5) = 'data:' THEN NULL "
+            "ELSE json_extract(doc, '$.image') END AS image "
+            "FROM portfolio WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id or "", limit),
+        )
+        return [
+            {"_id": row["id"], "image": row["image"], "link": row["link"], "description": row["description"]}
+            for row in rows
+        ]
+
+
+class SQLiteReviewRepository(_Table, ReviewRepository):
+    table = "reviews"
+    columns = {
+        "published": lambda d: _flag(d.get("published", True)),
+        "created_at": lambda d: _timestamp(d.get("created_at")),
+    }
+
+    async def list(self, published=None, limit=50, offset=0, fields=None):
+        where, params = _where({"published": _flag(published)})
+        docs = await self._select(
+            where, [*params, limit, offset], "ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        )
+        return _project(docs, fields)
+
+    async def stats(self, published=None):
+        where, params = _where({"published": _flag(published)})
+        row = await self.conn.fetchone(
+            "SELECT COUNT(*) AS n, AVG(json_extract(doc, '$.rating')) AS average_rating "
+            f"FROM reviews {'WHERE ' + where if where else ''}",
+            params,
+        )
+        return {"count": row["n"], "average_rating": row["average_rating"]}
+
+
+class SQLiteContactRepository(_Archivable, _Table, ContactRepository):
+    table = "contacts"
+    columns = {"created_at": lambda d: _timestamp(d.get("created_at"))}
+    archive_where = "json_extract(doc, '$.read') = 1"
+
+    async def list(self, limit=100, offset=0):
+        return await self._select("", (limit, offset), "ORDER BY created_at DESC LIMIT ? OFFSET ?")
+
+    async def mark_read(self, contact_id: str) -> bool:
+        return await self.update(contact_id, {"read": True}) is not None
+
+
+class SQLiteQuoteRepository(_Archivable, _Table, QuoteRepository):
+    table = "quotes"
+    columns = {"created_at": lambda d: _timestamp(d.get("created_at"))}
+    archive_where = "json_array_length(doc, '$.replies') > 0"  # replied to
+
+    async def list(self, limit=100, offset=0):
+        return await self._select("", (limit, offset), "ORDER BY id LIMIT ? OFFSET ?")
+
+    async def add_reply(self, quote_id: str, reply: Doc) -> bool:
+        def run(conn: sqlite3.Connection):
+            row = conn.execute("SELECT doc FROM quotes WHERE id = ?", (str(quote_id),)).fetchone()
+            if row is None:
+                return False
+            doc = _loads(row["doc"])
+            doc.setdefault("replies", []).append(reply)
+            conn.execute(self._update_sql, [*self._values(doc), doc["_id"]])
+            return True
+
+        return await self.conn.transaction(run)
+
+    async def set_replies(self, quote_id: str, replies: List[Doc]) -> bool:
+        return await self.update(quote_id, {"replies": replies}) is not None
+
+
+class SQLiteProjectRepository(_Table, ProjectRepository):
+    table = "projects"
+    columns = {}
+
+    async def list(self, fields=None):
+        return _project(await self._select(), fields)
+
+
+class SQLiteAdminRepository(_Table, AdminRepository):
+    table = "admins"
+    columns = {"username": lambda d: d["username"]}
+
+    async def get_by_username(self, username: str) -> Optional[Doc]:
+        docs = await self._select("username = ?", (username,))
+        return docs[0] if docs else None
+
+    async def set_password_hash(self, username: str, password_hash: str) -> bool:
+        admin = await self.get_by_username(username)
+        if admin is None:
+            return False
+        return await self.update(admin["_id"], {"password_hash": password_hash}) is not None
+
+
+class SQLiteIdempotencyRepository(_Table, IdempotencyRepository):
+    table = "idempotency_keys"
+    columns = {"expires_at": lambda d: _timestamp(d["expires_at"])}
+
+    async def insert(self, record: Doc) -> bool:
+        # No TTL monitor here: purge expired rows as we go (uses the expires_at index)
+        await self.conn.execute(
+            "DELETE FROM idempotency_keys WHERE expires_at <= ?", (_timestamp(record["created_at"]),)
+        )
+        try:
+            await self.create(dict(record))
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    async def replace_expired(self, record: Doc, now: datetime) -> bool:
+        return await self.conn.execute(
+            f"{self._update_sql} AND expires_at <= ?",
+            [*self._values(record), record["_id"], _timestamp(now)],
+        ) > 0
+
+    async def complete(self, record_id: str, response: Doc, expires_at: datetime):
+        await self.update(
+            record_id, {"status": "completed", "response": response, "expires_at": expires_at}
+        )
+
+    async def release(self, record_id: str):
+        await self.conn.execute(
+            "DELETE FROM idempotency_keys WHERE id = ? AND json_extract(doc, '$.status') = 'pending'",
+            (record_id,),
+        )
+
+
+class SQLiteRefreshTokenRepository(_Table, RefreshTokenRepository):
+    table = "refresh_tokens"
+    columns = {
+        "username": lambda d: d["username"],
+        "family_id": lambda d: d["family_id"],
+        "expires_at": lambda d: _timestamp(d["expires_at"]),
+    }
+
+    async def insert(self, record: Doc):
+        # No TTL monitor here: purge expired rows as we go (uses the expires_at index)
+        await self.conn.execute(
+            "DELETE FROM refresh_tokens WHERE expires_at <= ?", (_timestamp(record["created_at"]),)
+        )
+        await self.create(dict(record))
+
+    async def _set_where(self, where: str, params: Sequence, updates: Doc) -> int:
+        def run(conn: sqlite3.Connection):
+            rows = conn.execute(f"SELECT doc FROM refresh_tokens WHERE {where}", params).fetchall()
+            for row in rows:
+                doc = _loads(row["doc"])
+                doc.update(updates)
+                conn.execute(self._update_sql, [*self._values(doc), doc["_id"]])
+            return len(rows)
+
+        return await self.conn.transaction(run)
+
+    async def mark_used(self, token_id: str, used_at: datetime, replaced_by: str) -> bool:
+        return await self._set_where(
+            "id = ? AND json_extract(doc, '$.used_at') IS NULL AND json_extract(doc, '$.revoked') = 0",
+            (token_id,), {"used_at": used_at, "replaced_by": replaced_by},
+        ) > 0
+
+    async def revoke_family(self, family_id: str) -> int:
+        return await self._set_where("family_id = ?", (family_id,), {"revoked": True})
+
+    async def revoke_user(self, username: str) -> int:
+        return await self._set_where(
+            "username = ? AND json_extract(doc, '$.revoked') = 0", (username,), {"revoked": True}
+        )
+
+    async def list_active(self, username: str, now: datetime) -> List[Doc]:
+        docs = await self._select(
+            "username = ? AND expires_at > ? AND json_extract(doc, '$.used_at') IS NULL "
+            "AND json_extract(doc, '$.revoked') = 0",
+            (username, _timestamp(now)),
+        )
+        for doc in docs:
+            doc.pop("token_hash", None)
+        return sorted(docs, key=lambda doc: doc["created_at"], reverse=True)
+
+
+class SQLiteAssetRepository(_Table, AssetRepository):
+    table = "assets"
+    columns = {"released_at": lambda d: _timestamp(d.get("released_at"))}
+
+    async def attach(self, paths: List[str], owner: str, now: datetime):
+        def run(conn: sqlite3.Connection):
+            for path in paths:
+                row = conn.execute("SELECT doc FROM assets WHERE id = ?", (path,)).fetchone()
+                doc = _loads(row["doc"]) if row else {"_id": path, "owners": [], "registered_at": now}
+                if owner not in doc["owners"]:
+                    doc["owners"].append(owner)
+                doc["released_at"] = None
+                if row:
+                    conn.execute(self._update_sql, [*self._values(doc), path])
+                else:
+                    conn.execute(self._insert_sql, [path, *self._values(doc)])
+
+        await self.conn.transaction(run)
+
+    async def release(self, owner: str, keep: List[str], now: datetime) -> int:
+        def run(conn: sqlite3.Connection):
+            rows = conn.execute(
+                "SELECT assets.doc FROM assets, json_each(assets.doc, '$.owners') AS owner WHERE owner.value = ?",
+                (owner,),
+            ).fetchall()
+            dropped = 0
+            for row in rows:
+                doc = _loads(row["doc"])
+                if doc["_id"] in keep:
+                    continue
+                doc["owners"].remove(owner)
+                if not doc["owners"]:
+                    doc["released_at"] = now
+                conn.execute(self._update_sql, [*self._values(doc), doc["_id"]])
+                dropped += 1
+            return dropped
+
+        return await self.conn.transaction(run)
+
+    async def list_released(self, before: datetime, after_id: Optional[str], limit: int) -> List[Doc]:
+        return await self._select(
+            "released_at <= ? AND id > ?", (_timestamp(before), after_id or "", limit), "ORDER BY id LIMIT ?"
+        )
+
+    async def forget(self, path: str, before: datetime) -> bool:
+        return await self.conn.execute(
+            "DELETE FROM assets WHERE id = ? AND released_at <= ?", (path, _timestamp(before))
+        ) > 0
+
+
+def _increment(doc: Doc, counters: Dict[str, int]):
+    for name, amount in counters.items():
+        target = doc
+        *parents, leaf = name.split(".")
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[leaf] = target.get(leaf, 0) + amount
+
+
+class SQLiteRollupRepository(_Table, RollupRepository):
+    table = "analytics_rollups"
+    columns = {
+        "granularity": lambda d: d["granularity"],
+        "bucket": lambda d: _timestamp(d["bucket"]),
+    }
+
+    async def increment(self, granularity: str, bucket: datetime, counters: Dict[str, int]):
+        rollup_id = f"{granularity}:{bucket.isoformat()}"
+
+        def run(conn: sqlite3.Connection):
+            row = conn.execute("SELECT doc FROM analytics_rollups WHERE id = ?", (rollup_id,)).fetchone()
+            doc = _loads(row["doc"]) if row else {"_id": rollup_id, "granularity": granularity, "bucket": bucket}
+            _increment(doc, counters)
+            if row:
+                conn.execute(self._update_sql, [*self._values(doc), rollup_id])
+            else:
+                conn.execute(self._insert_sql, [rollup_id, *self._values(doc)])
+
+        await self.conn.transaction(run)
+
+    async def list(self, granularity: str, start: datetime, end: datetime) -> List[Doc]:
+        return await self._select(
+            "granularity = ? AND bucket >= ? AND bucket < ?",
+            (granularity, _timestamp(start), _timestamp(end)),
+            "ORDER BY bucket",
+        )
+
+    async def replace_range(self, start: datetime, end: datetime, docs: List[Doc]):
+        def run(conn: sqlite3.Connection):
+            conn.execute(
+                "DELETE FROM analytics_rollups WHERE bucket >= ? AND bucket < ?", (_timestamp(start), _timestamp(end))
+            )
+            conn.executemany(self._insert_sql, [[doc["_id"], *self._values(doc)] for doc in docs])
+
+        await self.conn.transaction(run)
+
+
+class SQLiteJobRepository(_Table, JobRepository):
+    table = "jobs"
+    columns = {
+        "queue": lambda d: d["queue"],
+        "status": lambda d: d["status"],
+        "run_at": lambda d: _timestamp(d["run_at"]),
+        "lease_until": lambda d: _timestamp(d.get("lease_until")),
+        "expire_at": lambda d: _timestamp(d.get("expire_at")),
+    }
+
+    async def enqueue(self, job: Doc) -> bool:
+        # No TTL monitor here: purge expired finished jobs as we go
+        await self.conn.execute("DELETE FROM jobs WHERE expire_at <= ?", (_timestamp(job["created_at"]),))
+        try:
+            await self.create(dict(job))
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    async def claim(self, queue: str, worker: str, now: datetime, lease_until: datetime) -> Optional[Doc]:
+        def run(conn: sqlite3.Connection):
+            row = conn.execute(
+                "SELECT doc FROM jobs WHERE queue = ? AND ((status = 'queued' AND run_at <= ?) "
+                "OR (status = 'running' AND lease_until < ?)) ORDER BY run_at LIMIT 1",
+                (queue, _timestamp(now), _timestamp(now)),
+            ).fetchone()
+            if row is None:
+                return None
+            doc = _loads(row["doc"])
+            doc.update(status="running", worker=worker, lease_until=lease_until, started_at=now)
+            doc["attempts"] = doc.get("attempts", 0) + 1
+            conn.execute(self._update_sql, [*self._values(doc), doc["_id"]])
+            return doc
+
+        return await self.conn.transaction(run)
+
+    async def _update_leased(self, job_id: str, worker: str, updates: Doc) -> bool:
+        def run(conn: sqlite3.Connection):
+            row = conn.execute("SELECT doc FROM jobs WHERE id = ? AND status = 'running'", (job_id,)).fetchone()
+            doc = _loads(row["doc"]) if row else None
+            if doc is None or doc.get("worker") != worker:
+                return False
+            doc.update(updates)
+            conn.execute(self._update_sql, [*self._values(doc), doc["_id"]])
+            return True
+
+        return await self.conn.transaction(run)
+
+    async def heartbeat(self, job_id: str, worker: str, lease_until: datetime) -> bool:
+        return await self._update_leased(job_id, worker, {"lease_until": lease_until})
+
+    async def finish(self, job_id: str, worker: str, updates: Doc) -> bool:
+        return await self._update_leased(job_id, worker, updates)
+
+    async def counts(self, now: datetime) -> Dict[str, Dict[str, int]]:
+        rows = await self.conn.fetchall(
+            "SELECT queue, CASE WHEN status = 'queued' AND run_at > ? THEN 'scheduled' ELSE status END AS state, "
+            "COUNT(*) AS n FROM jobs GROUP BY queue, state",
+            (_timestamp(now),),
+        )
+        counts: Dict[str, Dict[str, int]] = {}
+        for row in rows:
+            counts.setdefault(row["queue"], {})[row["state"]] = row["n"]
+        return counts
+
+    async def list(self, queue=None, status=None, limit=50) -> List[Doc]:
+        where, params = _where({"queue": queue, "status": status})
+        return await self._select(where, [*params, limit], "ORDER BY run_at DESC LIMIT ?")
+
+    async def requeue(self, job_id: str, now: datetime) -> bool:
+        def run(conn: sqlite3.Connection):
+            row = conn.execute("SELECT doc FROM jobs WHERE id = ? AND status IN ('dead', 'done')", (job_id,)).fetchone()
+            if row is None:
+                return False
+            doc = _loads(row["doc"])
+            doc.update(status="queued", run_at=now, attempts=0, expire_at=None)
+            conn.execute(self._update_sql, [*self._values(doc), doc["_id"]])
+            return True
+
+        return await self.conn.transaction(run)
+
+
+class SQLiteStateRepository(_Table, StateRepository):
+    table = "app_state"
+
+    async def save(self, key: str, values: Doc):
+        await self.conn.execute(
+            f"INSERT OR REPLACE INTO {self.table} (id, doc) VALUES (?, ?)", (key, _dumps({**values, "_id": key}))
+        )
+
+
+class SQLiteMigrationRepository(_Table, MigrationRepository):
+    table = "migrations"
+
+    def __init__(self, conn: SQLiteConnection, tables: Dict[str, _Table]):
+        super().__init__(conn)
+        self.tables = tables  # the only tables scan / bulk_update may touch
+
+    async def list(self):
+        return await self._select(suffix="ORDER BY id")
+
+    async def save(self, record: Doc):
+        await self.conn.execute(
+            f"INSERT OR REPLACE INTO {self.table} (id, doc) VALUES (?, ?)", (str(record["_id"]), _dumps(record))
+        )
+
+    def _table(self, collection: str) -> _Table:
+        if collection not in self.tables:
+            raise ValueError(f"Unknown collection: {collection}")
+        return self.tables[collection]
+
+    async def scan(self, collection, after_id, limit, query=None):
+        # No Mongo filters here: every document is handed back for checking
+        return await self._table(collection)._select("id > ?", (after_id or "", limit), "ORDER BY id LIMIT ?")
+
+    async def bulk_update(self, collection, changes):
+        table = self._table(collection)
+
+        def run(conn: sqlite3.Connection):
+            modified = 0
+            for doc_id, set_fields, unset_fields in changes:
+                row = conn.execute(f"SELECT doc FROM {table.table} WHERE id = ?", (str(doc_id),)).fetchone()
+                if row is None:
+                    continue
+                doc = _loads(row["doc"])
+                doc.update(set_fields or {})
+                for field in unset_fields or ():
+                    doc.pop(field, None)
+                conn.execute(table._update_sql, [*table._values(doc), doc["_id"]])
+                modified += 1
+            return modified
+
+        return await self.conn.transaction(run)
+
+
+class SQLiteStorage(Storage):
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.conn = SQLiteConnection(path)
+        self.portfolio = SQLitePortfolioRepository(self.conn)
+        self.reviews = SQLiteReviewRepository(self.conn)
+        self.contacts = SQLiteContactRepository(self.conn)
+        self.quotes = SQLiteQuoteRepository(self.conn)
+        self.projects = SQLiteProjectRepository(self.conn)
+        self.admins = SQLiteAdminRepository(self.conn)
+        self.idempotency = SQLiteIdempotencyRepository(self.conn)
+        self.refresh_tokens = SQLiteRefreshTokenRepository(self.conn)
+        self.assets = SQLiteAssetRepository(self.conn)
+        self.rollups = SQLiteRollupRepository(self.conn)
+        self.jobs = SQLiteJobRepository(self.conn)
+        self.state = SQLiteStateRepository(self.conn)
+        self.migrations = SQLiteMigrationRepository(self.conn, {
+            "portfolio": self.portfolio, "reviews": self.reviews, "contacts": self.contacts,
+            "quotes": self.quotes, "projects": self.projects,
+        })
+
+    async def open(self):
+        await self.conn.open()
+        logger.info(f"✅ SQLite storage ready at {self.conn.path}")
+
+    async def ping(self):
+        await self.conn.fetchone("SELECT 1")
+
+    async def close(self):
+        await self.conn.close()
@@ -0,0 +1,184 @@
+# backend/tracing.py
+"""Lightweight request tracing.
+
+Each sampled HTTP request gets a root span. Code running inside it can open
+child spans with `span("name")` (Mongo commands, SMTP, bcrypt, image
+encoding), which nest through a contextvar. Motor runs pymongo in threads
+with a copy of the request's context, so those spans attach correctly.
+W3C `traceparent` headers are honoured on the way in and returned as
+`traceresponse`. Finished spans go to an exporter: one JSON line each on
+stdout or in TRACE_FILE.
+"""
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "status")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, **attributes):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = attributes
+        self.status = "ok"
+
+    def child(self, name: str, **attributes) -> "Span":
+        return Span(name, self.trace_id, self.span_id, **attributes)
+
+    def end(self, error: Optional[BaseException] = None):
+        if error is not None:
+            self.status = "error"
+            self.attributes["error"] = repr(error)
+        self.end_ns = time.time_ns()
+        exporter.export(self)
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start_ns / 1e9,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Child span of the current one; a no-op outside a sampled trace"""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    child = parent.child(name, **attributes)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        _current.reset(token)
+        child.end(error=e)
+        raise
+    _current.reset(token)
+    child.end()
+
+
+# ----------------------------
+# Exporters
+# ----------------------------
+class _Exporter:
+    """Writes finished spans as JSON lines from a background thread, so
+    request handling never waits on the console or the disk"""
+
+    def __init__(self):
+        self._queue: "queue.SimpleQueue[Optional[Span]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    def export(self, finished: Span):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._write, name="trace-exporter", daemon=True)
+            self._thread.start()
+        self._queue.put(finished)
+
+    def _write(self):
+        if settings.TRACE_EXPORTER == "file":
+            stream = open(settings.TRACE_FILE, "a", encoding="utf-8")
+        else:
+            stream = sys.stdout
+        while True:
+            finished = self._queue.get()
+            try:
+                stream.write(json.dumps(finished.to_dict(), default=str) + "\n")
+                if self._queue.empty():
+                    stream.flush()
+            except Exception as e:  # never let the exporter die
+                logger.warning(f"⚠️ Could not export span {finished.name}: {e!r}")
+
+
+exporter = _Exporter()
+
+
+# ----------------------------
+# HTTP entry point
+# ----------------------------
+class TracingMiddleware:
+    """Root span per sampled request.
+
+    An incoming `traceparent` continues the caller's trace and follows its
+    sampled flag; otherwise TRACE_SAMPLE_RATE decides.
+    """
+
+    def __init__(self, app, sample_rate: float):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        match = TRACEPARENT.match(headers.get(b"traceparent", b"").decode("latin-1").strip().lower())
+        if match:
+            trace_id, parent_id, flags = match.groups()
+            sampled = bool(int(flags, 16) & 1)
+        else:
+            trace_id, parent_id = os.urandom(16).hex(), None
+            sampled = random.random() < self.sample_rate
+        if not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        root = Span(
+            f"{scope['method']} {scope['path']}", trace_id, parent_id,
+            **{"http.method": scope["method"], "http.target": scope["path"]},
+        )
+        token = _current.set(root)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                root.attributes["http.status_code"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"traceresponse", root.traceparent().encode())
+                ]
+            await send(message)
+
+        error = None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _current.reset(token)
+            root.end(error=error)
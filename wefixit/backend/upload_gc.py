@@ -0,0 +1,219 @@
+# backend/upload_gc.py
+"""Garbage collection of orphaned uploads: `python -m backend.upload_gc [--dry-run] [--register]`
+
+Only files the app knows it owns are ever deleted. When a portfolio item
+is saved, `track_uploads` records which files under UPLOAD_DIR it points
+at (an /uploads/ URL in its image, link or description) in the `assets`
+collection, with the item as an owner. When the item stops pointing at a
+file, or is deleted, the item is dropped from the owners, and a file
+left without owners is released. A sweep deletes files released more than
+GC_GRACE_HOURS ago, in batches, together with their precompressed .br /
+.gz sidecars. A file pointed at again within the grace period is kept.
+
+Files that no item has ever pointed at have no record and are left
+alone: the frontend's own images in uploads/, the snapshot directory
+(see snapshots.py) and GC_EXCLUDE_DIRS. `--register` records the uploads
+of items saved before ownership was tracked.
+
+Inline (data: URI) images live in the portfolio document itself and go
+away with it, so the database side needs no sweeping.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from urllib.parse import unquote
+
+from backend.config import settings
+from backend.static import SIDECAR_SUFFIXES
+from backend.storage import get_storage, open_storage, close_storage
+from backend.storage.base import Doc
+
+logger = logging.getLogger(__name__)
+
+SIDECARS = tuple(SIDECAR_SUFFIXES.values())
+
+UPLOAD_URL = re.compile(r"/uploads/([^\s\"'<>?#]+)")  # in free text: up to whitespace, quotes, brackets
+
+
+# ----------------------------
+# Ownership
+# ----------------------------
+def _upload_path(reference: str) -> Optional[str]:
+    """The file under UPLOAD_DIR an /uploads/ URL names, if it exists and may be swept"""
+    path = os.path.normpath(unquote(reference)).replace(os.sep, "/")
+    if path.startswith(("../", "/")) or path == "..":
+        return None
+    if path.split("/", 1)[0] in (settings.SNAPSHOT_SUBDIR, *settings.GC_EXCLUDE_DIRS):
+        return None
+    return path if os.path.isfile(os.path.join(settings.UPLOAD_DIR, path)) else None
+
+
+def upload_paths(doc: Doc) -> List[str]:
+    """The uploads a portfolio item points at"""
+    references = []
+    for field in ("image", "link"):
+        value = doc.get(field)
+        if isinstance(value, str) and not value.startswith("data:") and "/uploads/" in value:
+            # The whole field is one URL, so names with spaces are fine here
+            references.append(re.split(r"[?#]", value.split("/uploads/", 1)[1])[0])
+    references.extend(UPLOAD_URL.findall(doc.get("description") or ""))
+    paths: List[str] = []
+    for reference in references:
+        path = _upload_path(reference)
+        if path and path not in paths:
+            paths.append(path)
+    return paths
+
+
+async def track_uploads(storage, owner: str, doc: Optional[Doc] = None):
+    """Records the uploads `owner` points at now (none once it is deleted).
+    Runs after the write and never fails it: a missed attach leaves the
+    file untracked, a missed release leaves it owned, and neither deletes."""
+    try:
+        paths = upload_paths(doc) if doc else []
+        now = datetime.utcnow()
+        await storage.assets.attach(paths, owner, now)
+        await storage.assets.release(owner, paths, now)
+    except Exception as e:
+        logger.error(f"❌ Could not track uploads of {owner}: {e!r}")
+
+
+def portfolio_owner(item_id) -> str:
+    return f"portfolio:{item_id}"
+
+
+async def register_existing(storage, batch_size: int) -> int:
+    """Tracks the uploads of every portfolio item; returns the items that point at one"""
+    tracked = 0
+    after_id: Optional[str] = None
+    while True:
+        batch = await storage.portfolio.asset_references(after_id, batch_size)
+        for doc in batch:
+            if upload_paths(doc):
+                await track_uploads(storage, portfolio_owner(doc["_id"]), doc)
+                tracked += 1
+        if len(batch) < batch_size:
+            return tracked
+        after_id = str(batch[-1]["_id"])
+
+
+# ----------------------------
+# Sweep
+# ----------------------------
+def _size(root: str, path: str) -> int:
+    total = 0
+    for candidate in [path] + [path + suffix for suffix in SIDECARS]:
+        try:
+            total += os.stat(os.path.join(root, candidate)).st_size
+        except FileNotFoundError:
+            pass
+    return total
+
+
+def _delete(root: str, path: str) -> int:
+    """Removes a file and its sidecars; returns the bytes freed"""
+    freed = 0
+    for candidate in [path] + [path + suffix for suffix in SIDECARS]:
+        full = os.path.join(root, candidate)
+        try:
+            size = os.stat(full).st_size
+            os.remove(full)
+            freed += size
+        except FileNotFoundError:
+            pass  # sidecar never existed, or another run got there first
+    return freed
+
+
+async def run_once(
+    storage,
+    grace_hours: Optional[float] = None,
+    batch_size: Optional[int] = None,
+    dry_run: bool = False,
+) -> Dict[str, int]:
+    """One sweep of the released uploads; returns counts and the bytes
+    reclaimed (or that would be, on a dry run)"""
+    grace = settings.GC_GRACE_HOURS if grace_hours is None else grace_hours
+    batch_size = batch_size or settings.GC_BATCH_SIZE
+    root = settings.UPLOAD_DIR
+    cutoff = datetime.utcnow() - timedelta(hours=grace)
+    report = {"released": 0, "deleted": 0, "bytes_reclaimed": 0}
+
+    after_id: Optional[str] = None
+    while True:
+        batch = await storage.assets.list_released(cutoff, after_id, batch_size)
+        report["released"] += len(batch)
+        for record in batch:
+            path = record["_id"]
+            if dry_run:
+                size = await asyncio.to_thread(_size, root, path)
+            elif await storage.assets.forget(path, cutoff):  # not attached again meanwhile
+                size = await asyncio.to_thread(_delete, root, path)
+                logger.info(f"🗑️ Deleted orphaned upload {path} ({size} bytes)")
+            else:
+                continue
+            report["deleted"] += 1
+            report["bytes_reclaimed"] += size
+        if len(batch) < batch_size:
+            return report
+        after_id = batch[-1]["_id"]
+        await asyncio.sleep(settings.GC_BATCH_PAUSE_SECONDS)
+
+
+class UploadGC:
+    """Periodic in-app run (GC_ENABLED). Several workers may sweep at once:
+    `forget` lets exactly one of them delete each file."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None and settings.GC_ENABLED:
+            self._task = asyncio.create_task(self._run(), name="upload-gc")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.GC_INTERVAL_SECONDS)
+            try:
+                report = await run_once(await get_storage())
+                if report["deleted"]:
+                    logger.info(f"🗑️ Upload GC: {report}")
+            except Exception as e:  # try again next interval
+                logger.error(f"❌ Upload GC run failed: {e!r}")
+
+
+upload_gc = UploadGC()
+
+
+async def _main(args):
+    storage = await open_storage()
+    try:
+        if args.register:
+            tracked = await register_existing(storage, args.batch_size or settings.GC_BATCH_SIZE)
+            print(f"📎 Registered the uploads of {tracked} portfolio item(s)")
+        report = await run_once(storage, grace_hours=args.grace_hours, batch_size=args.batch_size, dry_run=args.dry_run)
+    finally:
+        await close_storage()
+    verb = "Would delete" if args.dry_run else "Deleted"
+    print(
+        f"🗑️ {verb} {report['deleted']} orphaned upload(s), {report['bytes_reclaimed'] / 1024 / 1024:.1f} MB "
+        f"({report['released']} released for over the grace period)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete uploads no portfolio item points at any more")
+    parser.add_argument("--dry-run", action="store_true", help="report only; nothing is deleted")
+    parser.add_argument("--register", action="store_true", help="first record the uploads existing items point at")
+    parser.add_argument("--grace-hours", type=float, help=f"default GC_GRACE_HOURS={settings.GC_GRACE_HOURS}")
+    parser.add_argument("--batch-size", type=int, help=f"records / deletions per batch (default {settings.GC_BATCH_SIZE})")
+    asyncio.run(_main(parser.parse_args()))
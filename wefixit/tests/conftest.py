@@ -0,0 +1,71 @@
+# tests/conftest.py
+"""Shared fixtures. Async tests run on anyio's pytest plugin (asyncio only).
+
+`storage` is parametrized over both backends: SQLite in memory always, and
+Mongo when one answers at MONGO_TEST_URL (a throwaway database is created
+and dropped per test), so the same contract runs against each.
+`replica_set` is a client for a replica set at MONGO_REPLSET_TEST_URL
+(e.g. a single `mongod --replSet rs0` after rs.initiate()), else a skip.
+"""
+import os
+import secrets
+
+import pytest
+
+MONGO_TEST_URL = os.getenv("MONGO_TEST_URL", "mongodb://localhost:27017")
+MONGO_REPLSET_TEST_URL = os.getenv("MONGO_REPLSET_TEST_URL", "mongodb://localhost:27017/?replicaSet=rs0")
+
+_unreachable = {}  # url -> skip reason, so a missing server costs one timeout per run
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+async def _mongo_client(url: str, **options):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    if url in _unreachable:
+        pytest.skip(_unreachable[url])
+    client = AsyncIOMotorClient(url, serverSelectionTimeoutMS=1000, **options)
+    try:
+        await client.admin.command("ping")
+    except Exception as e:
+        client.close()
+        _unreachable[url] = f"No MongoDB at {url}: {e.__class__.__name__}"
+        pytest.skip(_unreachable[url])
+    return client
+
+
+@pytest.fixture(params=["sqlite", "mongo"])
+async def storage(request):
+    if request.param == "sqlite":
+        from backend.storage.sqlite import SQLiteStorage
+
+        storage = SQLiteStorage(":memory:")
+        await storage.open()
+        yield storage
+        await storage.close()
+        return
+
+    from backend.storage.mongo import MongoStorage
+
+    client = await _mongo_client(MONGO_TEST_URL)
+    name = f"wefixit_test_{secrets.token_hex(4)}"
+    storage = MongoStorage(client[name])
+    await storage.ensure_indexes()
+    try:
+        yield storage
+    finally:
+        await client.drop_database(name)
+        client.close()
+
+
+@pytest.fixture
+async def replica_set():
+    client = await _mongo_client(MONGO_REPLSET_TEST_URL)
+    try:
+        yield client
+    finally:
+        client.close()
@@ -0,0 +1,72 @@
+# tests/test_database_profiles.py
+"""Read/write profiles (database.PROFILES) and which one a request gets"""
+import secrets
+
+import pytest
+from pymongo.read_preferences import Primary, SecondaryPreferred
+
+from backend import database, storage as storage_module
+from backend.auth import create_access_token
+from backend.config import settings
+from backend.database import profile_options
+
+pytestmark = pytest.mark.anyio
+
+
+def test_profile_options():
+    public = profile_options("public")
+    assert public["read_preference"] == SecondaryPreferred(max_staleness=90)
+    assert public["read_concern"].level == "local"
+
+    admin = profile_options("admin")
+    assert admin["read_preference"] == Primary()
+    assert admin["write_concern"].document == {"w": "majority"}
+    assert profile_options("submission")["write_concern"].document == {"w": 1}
+    with pytest.raises(ValueError):
+        profile_options("nope")
+
+
+class _Request:
+    def __init__(self, headers):
+        self.scope = {"headers": headers}
+
+
+class _ProfiledStorage:
+    name = "sqlite"  # no breaker check
+
+    def with_profile(self, name):
+        return name
+
+
+async def test_admins_read_public_routes_from_the_primary(monkeypatch):
+    monkeypatch.setattr(storage_module, "_storage", _ProfiledStorage())
+    public = storage_module.storage_profile("public")
+    bearer = f"Bearer {create_access_token('admin')}".encode()
+
+    assert await public(_Request([])) == "public"
+    assert await public(_Request([(b"authorization", b"Bearer forged")])) == "public"
+    assert await public(_Request([(b"authorization", bearer)])) == "admin"
+    assert await storage_module.storage_profile("submission")(_Request([(b"authorization", bearer)])) == "submission"
+
+
+async def test_profiles_on_a_replica_set(replica_set, monkeypatch):
+    from backend.storage.mongo import MongoStorage
+
+    name = f"wefixit_test_{secrets.token_hex(4)}"
+    monkeypatch.setattr(database, "_client", replica_set)
+    monkeypatch.setattr(database, "_databases", {})
+    monkeypatch.setattr(settings, "MONGO_DB", name)
+    try:
+        storage = MongoStorage(database.get_db())
+        admin, public = storage.with_profile("admin"), storage.with_profile("public")
+        assert admin.db.read_preference == Primary()
+        assert public.db.read_preference.document == {"mode": "secondaryPreferred", "maxStalenessSeconds": 90}
+
+        # Majority-acknowledged on the set, and readable back on the primary at once
+        item = await admin.portfolio.create({"title": "Deck", "is_active": True, "tags": []})
+        assert (await admin.portfolio.get(str(item["_id"])))["title"] == "Deck"
+        # The server accepts the staleness bound (it rejects anything under 90s)
+        total, _ = await public.portfolio.list()
+        assert total in (0, 1)
+    finally:
+        await replica_set.drop_database(name)
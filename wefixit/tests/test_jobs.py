@@ -0,0 +1,75 @@
+# tests/test_jobs.py
+"""Job workers outlive storage errors; job payloads are validated"""
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from backend import analytics, jobs
+from backend.config import settings
+from backend.jobs import JobRunner
+from backend.storage.sqlite import SQLiteStorage
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def storage(monkeypatch):
+    storage = SQLiteStorage(":memory:")
+    await storage.open()
+
+    async def get_storage():
+        return storage
+
+    monkeypatch.setattr(jobs, "get_storage", get_storage)
+    monkeypatch.setattr(settings, "JOB_POLL_INTERVAL_SECONDS", 0.01)
+    yield storage
+    await storage.close()
+
+
+async def test_worker_survives_a_failing_finish(storage, monkeypatch):
+    ran = []
+    monkeypatch.setitem(jobs.handlers, "test.echo", jobs.Handler("test.echo", ran.append, "test", None, None))
+    finish = storage.jobs.finish
+    failures = [RuntimeError("database is locked")]
+
+    async def flaky_finish(*args, **kwargs):
+        if failures:
+            raise failures.pop()
+        return await finish(*args, **kwargs)
+
+    monkeypatch.setattr(storage.jobs, "finish", flaky_finish)
+    await jobs.enqueue("test.echo", {"n": 1}, storage=storage)
+    await jobs.enqueue("test.echo", {"n": 2}, storage=storage)
+
+    runner = JobRunner()
+    runner._wake["test"] = asyncio.Event()
+    worker = asyncio.create_task(runner._worker("test"))
+    try:
+        while len(ran) < 2:
+            await asyncio.sleep(0.01)
+        assert not worker.done()  # the slot kept going after the first finish failed
+    finally:
+        runner._stopping = True
+        await asyncio.wait_for(worker, 1)
+    assert sorted(payload["n"] for payload in ran) == [1, 2]
+
+
+async def test_recompute_job_parses_since(monkeypatch):
+    seen = []
+
+    async def recompute(storage, since):
+        seen.append(since)
+
+    async def get_storage():
+        return None
+
+    monkeypatch.setattr(analytics, "recompute", recompute)
+    monkeypatch.setattr("backend.storage.get_storage", get_storage)
+    await analytics.recompute_job({"since": "2024-03-01"})
+    await analytics.recompute_job({"since": "2024-03-01T12:00:00+02:00"})
+    await analytics.recompute_job({})
+    assert seen[:2] == [datetime(2024, 3, 1), datetime(2024, 3, 1, 10)]
+    assert isinstance(seen[2], datetime)
+    with pytest.raises(ValueError):
+        await analytics.recompute_job({"since": 20240301})
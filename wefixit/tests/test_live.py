@@ -0,0 +1,107 @@
+# tests/test_live.py
+"""The dashboard feed resumes its change stream across restarts"""
+import asyncio
+import time
+
+import pytest
+
+from backend import live
+from backend.config import settings
+from backend.live import STATE_KEY, LiveFeed
+from backend.storage.sqlite import SQLiteStorage
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeStream:
+    """A change stream that yields `changes` (token, change) and then waits"""
+
+    def __init__(self, changes, resume_after):
+        self.changes = changes
+        self.resume_token = resume_after
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def __aiter__(self):
+        for token, change in self.changes:
+            self.resume_token = token
+            yield change
+        await asyncio.Event().wait()
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.resumed_after = []
+        self.changes = []
+
+    def watch(self, pipeline, full_document, resume_after):
+        self.resumed_after.append(resume_after)
+        return FakeStream(self.changes, resume_after)
+
+
+def _change(n: int):
+    return {"_data": f"8{n:03d}"}, {
+        "ns": {"coll": "contacts"}, "operationType": "insert",
+        "documentKey": {"_id": f"id{n}"}, "fullDocument": {"name": f"n{n}"},
+    }
+
+
+@pytest.fixture
+async def mongo_like(monkeypatch):
+    """SQLite for the feed's state, a fake change stream for its events"""
+    storage = SQLiteStorage(":memory:")
+    await storage.open()
+    storage.name = "mongo"
+    database = FakeDatabase()
+
+    async def get_storage():
+        return storage
+
+    monkeypatch.setattr(live, "get_storage", get_storage)
+    monkeypatch.setattr(live, "get_db", lambda: database)
+    monkeypatch.setattr(settings, "LIVE_TOKEN_SAVE_INTERVAL_SECONDS", 3600)
+    yield storage, database
+    await storage.close()
+
+
+async def _started(feed: LiveFeed, database: FakeDatabase, runs: int, last_event_id=None):
+    queue = feed.subscribe(last_event_id)
+    while len(database.resumed_after) < runs:
+        await asyncio.sleep(0.01)
+    return queue
+
+
+async def test_resumes_after_a_restart(mongo_like):
+    storage, database = mongo_like
+    database.changes = [_change(1), _change(2)]
+    feed = LiveFeed()
+    queue = await _started(feed, database, 1)
+    events = [await asyncio.wait_for(queue.get(), 1) for _ in range(2)]
+    assert database.resumed_after == [None]
+    assert [event["event_id"] for event in events] == ["8001", "8002"]
+    await feed.stop()  # the worker restarts; the position is saved on the way out
+
+    database.changes = []
+    restarted = LiveFeed()
+    await _started(restarted, database, 2)
+    assert database.resumed_after[1] == {"_data": "8002"}
+    await restarted.stop()
+
+
+async def test_stale_position_starts_from_now_unless_the_client_says_otherwise(mongo_like):
+    storage, database = mongo_like
+    await storage.state.save(STATE_KEY, {"resume_token": {"_data": "8001"}, "saved_at": time.time() - 3600})
+
+    feed = LiveFeed()
+    await _started(feed, database, 1)
+    assert database.resumed_after == [None]
+    await feed.stop()
+
+    feed = LiveFeed()
+    await _started(feed, database, 2, last_event_id="8042")
+    assert database.resumed_after[1] == {"_data": "8042"}
+    await feed.stop()
@@ -0,0 +1,33 @@
+# tests/test_logs.py
+"""The access log: one structured record per request, from RequestIdMiddleware"""
+import logging
+
+import httpx
+import pytest
+
+from backend.logs import RequestIdMiddleware
+
+pytestmark = pytest.mark.anyio
+
+
+async def _app(scope, receive, send):
+    if scope["path"] == "/boom":
+        raise RuntimeError("boom")
+    await send({"type": "http.response.start", "status": 201, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def test_access_record_per_request(caplog):
+    caplog.set_level(logging.INFO, logger="backend.access")
+    app = RequestIdMiddleware(_app, access_log=True)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        response = await http.get("/api/v1/live/events?ticket=secret", headers={"X-Request-ID": "abc-123"})
+        with pytest.raises(RuntimeError):
+            await http.get("/boom")
+
+    assert response.headers["x-request-id"] == "abc-123"
+    ok, failed = [r for r in caplog.records if r.name == "backend.access"]
+    assert ok.getMessage() == "GET /api/v1/live/events 201"
+    assert "secret" not in str(ok.fields)  # no query string
+    assert ok.fields["status"] == 201 and ok.fields["duration_ms"] >= 0
+    assert failed.fields["status"] == 500
@@ -0,0 +1,41 @@
+# tests/test_migrations.py
+"""Pending migrations keep /ready down; a new database has none"""
+import pytest
+
+from backend import health, migrations
+from backend.health import DOWN, OK, HealthMonitor
+from backend.storage.sqlite import SQLiteStorage
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def storage(monkeypatch):
+    storage = SQLiteStorage(":memory:")
+    await storage.open()
+
+    async def get_storage():
+        return storage
+
+    monkeypatch.setattr(health, "get_storage", get_storage)
+    yield storage
+    await storage.close()
+
+
+async def test_empty_database_needs_no_migrations(storage):
+    assert await migrations.mark_empty_applied(storage) == []
+    assert {row["status"] for row in await migrations.status(storage)} == {"applied"}
+
+
+async def test_readiness_waits_for_pending_migrations(storage):
+    await storage.reviews.create({"name": "Old", "rating": 5, "message": "Great", "created_at": "2023-04-01T10:00:00Z"})
+    monitor = HealthMonitor()
+
+    _, check = await monitor._check_migrations()
+    assert check == {"status": DOWN, "pending": [1, 2]}  # the other collections are empty
+
+    await migrations.run(storage)
+    _, check = await monitor._check_migrations()
+    assert check == {"status": OK}
+    review = (await storage.reviews.list())[0]
+    assert review["comment"] == "Great" and "message" not in review
@@ -0,0 +1,208 @@
+# tests/test_resilience.py
+"""Fault injection for the request deadline and the circuit breakers,
+against local fake servers that hang or drop every connection"""
+import asyncio
+import contextvars
+import socket
+import threading
+import time
+
+import httpx
+import pytest
+from pymongo import _csot, timeout
+
+from backend import mailer, resilience
+from backend.config import settings
+from backend.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, DeadlineMiddleware, detached_context
+
+
+class FakeServer:
+    """TCP on 127.0.0.1 that accepts and then never answers ("hang") or
+    closes the connection at once ("drop")"""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.connections = 0
+        self._listener = socket.create_server(("127.0.0.1", 0))
+        self._listener.settimeout(0.05)
+        self.port = self._listener.getsockname()[1]
+        self._held = []
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stopped.set()
+        self._thread.join()
+        for conn in self._held:
+            conn.close()
+        self._listener.close()
+
+    def _serve(self):
+        while not self._stopped.is_set():
+            try:
+                conn, _ = self._listener.accept()
+            except socket.timeout:
+                continue
+            self.connections += 1
+            if self.mode == "hang":
+                self._held.append(conn)
+            else:
+                conn.close()
+
+
+@pytest.fixture
+def smtp(monkeypatch):
+    """Points the mailer at a fake relay, with a fresh breaker (2 failures, 60s)"""
+    breaker = CircuitBreaker("smtp", failure_threshold=2, reset_timeout=60)
+    monkeypatch.setattr(mailer, "smtp_breaker", breaker)
+    monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "SMTP_TIMEOUT_SECONDS", 0.3)
+
+    def connect(server: FakeServer):
+        monkeypatch.setattr(settings, "SMTP_PORT", server.port)
+        return breaker
+
+    return connect
+
+
+@pytest.fixture
+def mongo_breaker(monkeypatch):
+    breaker = CircuitBreaker("mongo", failure_threshold=5, reset_timeout=60)
+    monkeypatch.setattr(resilience, "mongo_breaker", breaker)
+    return breaker
+
+
+def _send():
+    mailer.send_email("admin@example.com", "Test", "body", "Tests")
+
+
+# ----------------------------
+# SMTP
+# ----------------------------
+def test_smtp_send_times_out_on_a_hanging_relay(smtp):
+    with FakeServer("hang") as server:
+        breaker = smtp(server)
+        started = time.monotonic()
+        with pytest.raises(OSError):
+            _send()
+        assert time.monotonic() - started < 2
+        assert breaker.failures == 1 and breaker.state == CLOSED
+
+
+def test_smtp_breaker_opens_and_fails_fast(smtp):
+    with FakeServer("drop") as server:
+        breaker = smtp(server)
+        for _ in range(2):
+            with pytest.raises(OSError):
+                _send()
+        assert breaker.state == OPEN
+
+        with pytest.raises(CircuitOpenError) as error:
+            _send()
+        assert error.value.retry_after > 0
+        assert server.connections == 2  # the open circuit never dialled out
+
+
+def test_breaker_half_open_probe():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    breaker.before_call()  # the trial call
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # one trial at a time
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.snapshot() == {"state": CLOSED, "failures": 0}
+
+
+# ----------------------------
+# Mongo deadline
+# ----------------------------
+def _asgi(handler):
+    async def app(scope, receive, send):
+        body = b""
+        if scope["method"] != "GET":
+            while True:
+                message = await receive()
+                body += message.get("body", b"")
+                if not message.get("more_body"):
+                    break
+        await handler(body)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    return app
+
+
+@pytest.mark.anyio
+async def test_deadline_turns_a_hanging_mongo_into_a_quick_504(mongo_breaker):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    with FakeServer("hang") as server:
+        client = AsyncIOMotorClient(f"mongodb://127.0.0.1:{server.port}/?directConnection=true")
+
+        async def query(body):
+            await client.wefixit.portfolio.find_one({})
+
+        app = DeadlineMiddleware(_asgi(query), deadline=0.3, exclude_paths=[])
+        started = time.monotonic()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+            response = await http.get("/api/v1/portfolio/")
+        client.close()
+
+    assert response.status_code == 504
+    assert response.json() == {"detail": "Database deadline exceeded"}
+    assert time.monotonic() - started < 3
+    assert mongo_breaker.failures == 1
+
+
+@pytest.mark.anyio
+async def test_deadline_starts_after_the_body_is_read():
+    remaining = []
+
+    async def record(body):
+        remaining.append((body, _csot.remaining()))
+
+    app = DeadlineMiddleware(_asgi(record), deadline=0.3, exclude_paths=[])
+    chunks = [b"slow ", b"upload"]
+
+    async def slow_receive():
+        await asyncio.sleep(0.25)  # together longer than the deadline
+        chunk = chunks.pop(0)
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200
+
+    scope = {
+        "type": "http", "method": "POST", "path": "/api/v1/portfolio/",
+        "headers": [(b"content-length", b"11")],
+    }
+    await app(scope, slow_receive, send)
+    body, left = remaining[0]
+    assert body == b"slow upload"
+    assert left is not None and 0.2 < left <= 0.3
+
+    # Nothing to read: the clock runs from the start
+    await app({**scope, "method": "GET", "headers": []}, slow_receive, send)
+    assert 0.2 < remaining[1][1] <= 0.3
+    assert _csot.get_timeout() is None  # reset after the request
+
+
+def test_detached_context_drops_the_deadline():
+    with timeout(5):
+        assert contextvars.copy_context().run(_csot.get_timeout) == 5
+        assert detached_context().run(_csot.get_timeout) is None
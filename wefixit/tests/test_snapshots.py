@@ -0,0 +1,71 @@
+# tests/test_snapshots.py
+"""Snapshots are reproducible and keep inline images out of the JSON files"""
+import base64
+import json
+import os
+
+import pytest
+
+from backend import snapshots
+from backend.config import settings
+from backend.storage.sqlite import SQLiteStorage
+
+pytestmark = pytest.mark.anyio
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+
+@pytest.fixture
+async def storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    storage = SQLiteStorage(":memory:")
+    await storage.open()
+    yield storage
+    await storage.close()
+
+
+def _read(name: str) -> bytes:
+    with open(os.path.join(snapshots.snapshot_dir(), name), "rb") as f:
+        return f.read()
+
+
+async def test_publish_is_reproducible_and_moves_images_out(storage):
+    inline = "data:image/png;base64," + base64.b64encode(PNG).decode()
+    await storage.portfolio.create({"title": "Deck", "image": inline, "is_active": True, "is_featured": True, "tags": [], "created_at": "2024-01-01T00:00:00"})
+    await storage.portfolio.create({"title": "Fence", "image": "/uploads/fence.png", "is_active": True, "tags": [], "created_at": "2024-01-02T00:00:00"})
+
+    first = await snapshots.publish(storage)
+    files = {name: _read(name) for name in [*first["files"], "manifest.json"]}
+    second = await snapshots.publish(storage)
+    assert second == first
+    assert {name: _read(name) for name in files} == files  # any worker writes the same bytes
+
+    items = {item["title"]: item for item in json.loads(files["portfolio.json"])["items"]}
+    assert b"base64" not in files["portfolio.json"]
+    assert b"base64" not in files["home.json"]
+    assert json.loads(files["home.json"])["featured_portfolio"][0]["image"] == items["Deck"]["image"]
+    assert items["Fence"]["image"] == "/uploads/fence.png"
+    url = items["Deck"]["image"]
+    assert url.startswith(f"/uploads/{settings.SNAPSHOT_SUBDIR}/images/") and url.endswith(".png")
+    assert _read(url.split(f"/{settings.SNAPSHOT_SUBDIR}/", 1)[1]) == PNG
+    assert first["images"] == 1
+
+
+async def test_images_are_served_immutable(storage, monkeypatch):
+    from httpx import ASGITransport, AsyncClient
+
+    from backend.main import create_app
+
+    monkeypatch.setattr(settings, "SNAPSHOT_ENABLED", True)
+    inline = "data:image/png;base64," + base64.b64encode(PNG).decode()
+    await storage.portfolio.create({"title": "Deck", "image": inline, "is_active": True, "tags": [], "created_at": "2024-01-01T00:00:00"})
+    await snapshots.publish(storage)
+    url = json.loads(_read("portfolio.json"))["items"][0]["image"]
+
+    async with AsyncClient(transport=ASGITransport(app=create_app()), base_url="http://test") as client:
+        image = await client.get(url)
+        listing = await client.get(f"/uploads/{settings.SNAPSHOT_SUBDIR}/portfolio.json")
+    assert image.content == PNG
+    assert "immutable" in image.headers["cache-control"]
+    assert f"max-age={settings.STATIC_CACHE_MAX_AGE}" in image.headers["cache-control"]
+    assert "immutable" not in listing.headers["cache-control"]
@@ -0,0 +1,60 @@
+# tests/test_sqlite_legacy.py
+"""Opening a database left by the earlier SQLAlchemy layout"""
+import sqlite3
+
+import pytest
+
+from backend.storage.sqlite import SCHEMA_VERSION, SQLiteStorage
+
+pytestmark = pytest.mark.anyio
+
+LEGACY = """
+CREATE TABLE admin_users (id INTEGER NOT NULL, username VARCHAR(50) NOT NULL, password_hash VARCHAR(255) NOT NULL,
+    is_superuser BOOLEAN, PRIMARY KEY (id));
+CREATE TABLE reviews (id INTEGER NOT NULL, name VARCHAR(100) NOT NULL, rating FLOAT NOT NULL, comment TEXT NOT NULL,
+    published BOOLEAN, created_at DATETIME DEFAULT CURRENT_TIMESTAMP, PRIMARY KEY (id));
+CREATE INDEX ix_reviews_published ON reviews (published);
+CREATE TABLE portfolio_items (id INTEGER NOT NULL, title VARCHAR(150) NOT NULL, description TEXT NOT NULL,
+    image_url VARCHAR(500), link VARCHAR(500), tags JSON, is_featured BOOLEAN, is_active BOOLEAN,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP, PRIMARY KEY (id));
+INSERT INTO admin_users VALUES (1, 'admin', '$2b$12$hash', 1);
+INSERT INTO reviews VALUES (1, 'Ann', 5, 'Great', 1, '2023-04-01 10:00:00');
+INSERT INTO reviews VALUES (2, 'Bob', 3, 'Fine', 0, '2023-05-01 10:00:00.250000');
+INSERT INTO portfolio_items VALUES (1, 'Deck', 'Cedar', '/uploads/deck.jpg', NULL, '["wood"]', 1, 1, '2023-03-01 09:00:00');
+"""
+
+
+async def test_legacy_database_is_upgraded(tmp_path):
+    path = str(tmp_path / "wefixit.db")
+    with sqlite3.connect(path) as conn:
+        conn.executescript(LEGACY)
+
+    storage = SQLiteStorage(path)
+    await storage.open()
+    try:
+        reviews = await storage.reviews.list()
+        assert [(r["name"], r["comment"], r["published"]) for r in reviews] == [("Bob", "Fine", False), ("Ann", "Great", True)]
+        assert reviews[0]["_id"] > reviews[1]["_id"]  # ids keep creation order
+        assert len(await storage.reviews.list(published=True)) == 1
+
+        total, items = await storage.portfolio.list()
+        assert total == 1 and items[0]["image"] == "/uploads/deck.jpg" and items[0]["tags"] == ["wood"]
+        assert (await storage.portfolio.facets())["tags"] == [("wood", 1)]
+        assert (await storage.admins.get_by_username("admin"))["password_hash"] == "$2b$12$hash"
+
+        created = await storage.reviews.create({"name": "New", "rating": 4, "comment": "Good", "published": True})
+        assert (await storage.reviews.get(created["_id"]))["comment"] == "Good"
+    finally:
+        await storage.close()
+
+    # Opened again: already upgraded, nothing copied twice
+    storage = SQLiteStorage(path)
+    await storage.open()
+    try:
+        assert len(await storage.reviews.list()) == 3
+        assert (await storage.portfolio.list())[0] == 1
+    finally:
+        await storage.close()
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        assert conn.execute("SELECT COUNT(*) FROM reviews_legacy").fetchone()[0] == 2
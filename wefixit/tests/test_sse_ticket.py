@@ -0,0 +1,42 @@
+# tests/test_sse_ticket.py
+"""EventSource tickets: short-lived, single-use, never an access token"""
+import pytest
+from fastapi import HTTPException
+
+from backend import deps
+from backend.auth import create_access_token, create_sse_ticket, decode_token
+from backend.storage.sqlite import SQLiteStorage
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def storage(monkeypatch):
+    async def get_admin_by_username(username):
+        return {"username": username} if username == "admin" else None
+
+    monkeypatch.setattr(deps, "get_admin_by_username", get_admin_by_username)
+    storage = SQLiteStorage(":memory:")
+    await storage.open()
+    yield storage
+    await storage.close()
+
+
+async def test_ticket_works_once(storage):
+    ticket = create_sse_ticket("admin")
+    admin = await deps.get_current_admin_sse(token=None, ticket=ticket, storage=storage)
+    assert admin["username"] == "admin"
+
+    with pytest.raises(HTTPException) as error:
+        await deps.get_current_admin_sse(token=None, ticket=ticket, storage=storage)
+    assert error.value.detail == "Ticket already used"
+
+
+async def test_tokens_are_not_interchangeable(storage):
+    with pytest.raises(HTTPException):
+        decode_token(create_sse_ticket("admin"))
+    with pytest.raises(HTTPException):
+        await deps.get_current_admin_sse(token=None, ticket=create_access_token("admin"), storage=storage)
+    with pytest.raises(HTTPException) as error:
+        await deps.get_current_admin_sse(token=None, ticket=None, storage=storage)
+    assert error.value.status_code == 401
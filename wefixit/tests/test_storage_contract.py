@@ -0,0 +1,312 @@
+# tests/test_storage_contract.py
+"""The repository contract (storage/base.py), run against every backend"""
+from datetime import datetime, timedelta
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+T0 = datetime(2024, 5, 1, 12, 0, 0)
+
+
+def ids(docs):
+    return [str(doc["_id"]) for doc in docs]
+
+
+# ----------------------------
+# CRUD
+# ----------------------------
+async def test_crud(storage):
+    item = await storage.portfolio.create({"title": "Kitchen", "is_active": True, "is_featured": False, "created_at": T0})
+    item_id = str(item["_id"])
+
+    assert (await storage.portfolio.get(item_id))["title"] == "Kitchen"
+    updated = await storage.portfolio.update(item_id, {"title": "Kitchen refit", "tags": ["wood"]})
+    assert updated["title"] == "Kitchen refit" and updated["tags"] == ["wood"]
+    assert (await storage.portfolio.update(item_id, {}))["title"] == "Kitchen refit"
+
+    assert await storage.portfolio.delete(item_id)
+    assert await storage.portfolio.get(item_id) is None
+    assert not await storage.portfolio.delete(item_id)
+    assert await storage.portfolio.update(item_id, {"title": "gone"}) is None
+
+
+async def test_unknown_and_malformed_ids(storage):
+    for missing in ("0" * 24, "not-an-id"):
+        assert await storage.reviews.get(missing) is None
+        assert await storage.reviews.update(missing, {"rating": 1}) is None
+        assert not await storage.reviews.delete(missing)
+
+
+async def test_contact_and_quote_updates(storage):
+    contact = await storage.contacts.create({"email": "a@example.com", "read": False, "created_at": T0})
+    assert await storage.contacts.mark_read(str(contact["_id"]))
+    assert (await storage.contacts.list())[0]["read"] is True
+
+    quote = await storage.quotes.create({"name": "Q", "created_at": T0})
+    quote_id = str(quote["_id"])
+    assert await storage.quotes.add_reply(quote_id, {"content": "first"})
+    assert await storage.quotes.add_reply(quote_id, {"content": "second"})
+    assert [r["content"] for r in (await storage.quotes.get(quote_id))["replies"]] == ["first", "second"]
+    assert await storage.quotes.set_replies(quote_id, [])
+    assert (await storage.quotes.get(quote_id))["replies"] == []
+    assert not await storage.quotes.add_reply("0" * 24, {"content": "nobody"})
+
+
+# ----------------------------
+# Ordering and paging
+# ----------------------------
+async def test_portfolio_list_newest_first_with_total(storage):
+    for i in range(5):
+        await storage.portfolio.create({
+            "title": f"p{i}", "is_active": i != 4, "is_featured": i % 2 == 0,
+            "category": "bath" if i < 2 else "kitchen", "tags": ["a", "b"] if i == 1 else ["a"],
+            "created_at": T0 + timedelta(days=i),
+        })
+
+    total, page = await storage.portfolio.list(is_active=True, limit=2, offset=1)
+    assert total == 4 and [doc["title"] for doc in page] == ["p2", "p1"]
+
+    total, page = await storage.portfolio.list(is_featured=True, limit=10)
+    assert total == 3 and [doc["title"] for doc in page] == ["p4", "p2", "p0"]
+
+    total, page = await storage.portfolio.list(category="bath", tags=["a", "b"], match_all_tags=True)
+    assert total == 1 and page[0]["title"] == "p1"
+
+    _, page = await storage.portfolio.list(limit=1, fields=["title"])
+    assert set(page[0]) == {"_id", "title"}
+
+
+async def test_review_list_newest_first(storage):
+    for i in range(4):
+        await storage.reviews.create({"name": f"r{i}", "rating": i + 1, "published": i != 0, "created_at": T0 + timedelta(hours=i)})
+
+    assert [doc["name"] for doc in await storage.reviews.list(published=True, limit=2)] == ["r3", "r2"]
+    assert [doc["name"] for doc in await storage.reviews.list(limit=2, offset=2)] == ["r1", "r0"]
+    assert await storage.reviews.stats(published=True) == {"count": 3, "average_rating": 3.0}
+    assert await storage.reviews.stats(published=False) == {"count": 1, "average_rating": 1.0}
+
+
+async def test_contact_list_newest_first_and_quote_list_oldest_first(storage):
+    for i in range(5):
+        await storage.contacts.create({"name": f"c{i}", "created_at": T0 + timedelta(minutes=i)})
+        await storage.quotes.create({"name": f"q{i}", "created_at": T0 + timedelta(minutes=i)})
+
+    assert [doc["name"] for doc in await storage.contacts.list(limit=2, offset=1)] == ["c3", "c2"]
+    assert [doc["name"] for doc in await storage.quotes.list(limit=2, offset=1)] == ["q1", "q2"]
+    assert [doc["name"] for doc in await storage.quotes.list(offset=4)] == ["q4"]
+
+
+async def test_list_created_after(storage):
+    created = [await storage.reviews.create({"name": f"r{i}", "created_at": T0}) for i in range(3)]
+    after = await storage.reviews.list_created_after(str(created[0]["_id"]), 10)
+    assert ids(after) == ids(created[1:])
+
+
+# ----------------------------
+# get_many
+# ----------------------------
+async def test_get_many(storage):
+    items = [await storage.portfolio.create({"title": f"p{i}", "link": f"/p{i}", "created_at": T0}) for i in range(3)]
+    wanted = [str(items[2]["_id"]), "0" * 24, "bogus", str(items[0]["_id"])]
+
+    found = await storage.portfolio.get_many(wanted)
+    assert sorted(ids(found)) == sorted([str(items[0]["_id"]), str(items[2]["_id"])])
+
+    projected = await storage.portfolio.get_many(wanted, fields=["title"])
+    assert all(set(doc) == {"_id", "title"} for doc in projected)
+
+    assert await storage.portfolio.get_many([]) == []
+    assert await storage.reviews.get_many(["bogus"]) == []
+
+
+# ----------------------------
+# Idempotency keys
+# ----------------------------
+def _claim(record_id, now, ttl=60):
+    return {"_id": record_id, "status": "pending", "created_at": now, "expires_at": now + timedelta(seconds=ttl)}
+
+
+async def test_idempotency_claims(storage):
+    now = datetime.utcnow().replace(microsecond=0)
+    assert await storage.idempotency.insert(_claim("k1", now))
+    assert not await storage.idempotency.insert(_claim("k1", now))
+
+    # Not expired yet: cannot be taken over
+    assert not await storage.idempotency.replace_expired(_claim("k1", now), now)
+    # Expired: can
+    assert await storage.idempotency.replace_expired(_claim("k1", now + timedelta(seconds=120)), now + timedelta(seconds=61))
+
+    await storage.idempotency.complete("k1", {"ok": True}, now + timedelta(days=1))
+    record = await storage.idempotency.get("k1")
+    assert record["status"] == "completed" and record["response"] == {"ok": True}
+
+    await storage.idempotency.release("k1")  # only pending claims are released
+    assert await storage.idempotency.get("k1") is not None
+
+    assert await storage.idempotency.insert(_claim("k2", now))
+    await storage.idempotency.release("k2")
+    assert await storage.idempotency.get("k2") is None
+
+
+# ----------------------------
+# Refresh tokens
+# ----------------------------
+def _token(token_id, username="admin", family_id=None, created_at=None, expires_in=timedelta(days=7)):
+    created_at = created_at or datetime.utcnow().replace(microsecond=0)
+    return {
+        "_id": token_id, "username": username, "family_id": family_id or token_id, "token_hash": "h",
+        "created_at": created_at, "expires_at": created_at + expires_in,
+        "used_at": None, "replaced_by": None, "revoked": False,
+    }
+
+
+async def test_refresh_tokens(storage):
+    now = datetime.utcnow().replace(microsecond=0)
+    await storage.refresh_tokens.insert(_token("t1", created_at=now - timedelta(minutes=2)))
+    await storage.refresh_tokens.insert(_token("t2", family_id="t1", created_at=now - timedelta(minutes=1)))
+    await storage.refresh_tokens.insert(_token("t3", created_at=now))
+    await storage.refresh_tokens.insert(_token("t4", username="other", created_at=now))
+
+    assert await storage.refresh_tokens.mark_used("t1", now, "t2")
+    assert not await storage.refresh_tokens.mark_used("t1", now, "t9")  # a token is consumed once
+    assert (await storage.refresh_tokens.get("t1"))["replaced_by"] == "t2"
+
+    active = await storage.refresh_tokens.list_active("admin", now)
+    assert ids(active) == ["t3", "t2"]
+    assert all("token_hash" not in doc for doc in active)
+
+    assert await storage.refresh_tokens.revoke_family("t1") == 2
+    assert not await storage.refresh_tokens.mark_used("t2", now, "t9")
+    assert ids(await storage.refresh_tokens.list_active("admin", now)) == ["t3"]
+
+    assert await storage.refresh_tokens.revoke_user("admin") == 1
+    assert await storage.refresh_tokens.list_active("admin", now) == []
+    assert ids(await storage.refresh_tokens.list_active("other", now)) == ["t4"]
+    assert await storage.refresh_tokens.list_active("other", now + timedelta(days=8)) == []
+
+
+# ----------------------------
+# Upload ownership
+# ----------------------------
+async def test_asset_ownership(storage):
+    now = datetime.utcnow().replace(microsecond=0)
+    await storage.assets.attach(["a.png", "shared.png"], "portfolio:1", now)
+    await storage.assets.attach(["shared.png"], "portfolio:2", now)
+    await storage.assets.attach([], "portfolio:3", now)
+
+    assert await storage.assets.release("portfolio:1", ["a.png"], now) == 1  # shared.png still has portfolio:2
+    assert await storage.assets.list_released(now, None, 10) == []
+
+    assert await storage.assets.release("portfolio:2", [], now) == 1
+    assert await storage.assets.release("portfolio:1", [], now + timedelta(hours=1)) == 1
+    assert ids(await storage.assets.list_released(now, None, 10)) == ["shared.png"]
+    assert ids(await storage.assets.list_released(now + timedelta(hours=1), None, 10)) == ["a.png", "shared.png"]
+    assert ids(await storage.assets.list_released(now + timedelta(hours=1), "a.png", 10)) == ["shared.png"]
+
+    # Pointed at again: no longer released, and cannot be forgotten
+    await storage.assets.attach(["a.png"], "portfolio:4", now + timedelta(hours=2))
+    assert not await storage.assets.forget("a.png", now + timedelta(hours=3))
+    assert await storage.assets.forget("shared.png", now)
+    assert not await storage.assets.forget("shared.png", now)
+    assert await storage.assets.list_released(now + timedelta(days=1), None, 10) == []
+
+
+# ----------------------------
+# Jobs
+# ----------------------------
+def _job(job_id, run_at, queue="default"):
+    return {
+        "_id": job_id, "name": "test", "queue": queue, "payload": {}, "status": "queued", "run_at": run_at,
+        "attempts": 0, "max_attempts": 3, "lease_until": None, "worker": None, "last_error": None,
+        "created_at": T0, "expire_at": None,
+    }
+
+
+async def test_job_claim_and_finish(storage):
+    now = datetime.utcnow().replace(microsecond=0)
+    assert await storage.jobs.enqueue(_job("late", now - timedelta(seconds=10)))
+    assert await storage.jobs.enqueue(_job("early", now - timedelta(seconds=20)))
+    assert await storage.jobs.enqueue(_job("future", now + timedelta(hours=1)))
+    assert await storage.jobs.enqueue(_job("elsewhere", now - timedelta(hours=1), queue="email"))
+    assert not await storage.jobs.enqueue(_job("early", now))
+
+    lease = now + timedelta(seconds=30)
+    first = await storage.jobs.claim("default", "w1", now, lease)
+    assert first["_id"] == "early" and first["attempts"] == 1 and first["status"] == "running"
+    assert (await storage.jobs.claim("default", "w2", now, lease))["_id"] == "late"
+    assert await storage.jobs.claim("default", "w3", now, lease) is None  # "future" is not due
+
+    assert await storage.jobs.heartbeat("early", "w1", lease + timedelta(seconds=30))
+    assert not await storage.jobs.heartbeat("early", "w2", lease)
+    assert not await storage.jobs.finish("early", "w2", {"status": "done"})  # not its lease
+    assert await storage.jobs.finish("early", "w1", {"status": "done", "expire_at": now + timedelta(hours=1)})
+    assert not await storage.jobs.finish("early", "w1", {"status": "done"})  # no longer running
+
+    counts = await storage.jobs.counts(now)
+    assert counts["default"] == {"done": 1, "running": 1, "scheduled": 1}
+    assert counts["email"] == {"queued": 1}
+
+
+async def test_job_expired_lease_is_reclaimed(storage):
+    now = datetime.utcnow().replace(microsecond=0)
+    await storage.jobs.enqueue(_job("j", now))
+    await storage.jobs.claim("default", "dead-worker", now, now + timedelta(seconds=5))
+
+    later = now + timedelta(seconds=10)
+    taken = await storage.jobs.claim("default", "w2", later, later + timedelta(seconds=5))
+    assert taken["worker"] == "w2" and taken["attempts"] == 2
+    assert not await storage.jobs.finish("j", "dead-worker", {"status": "done"})
+
+
+async def test_job_requeue_and_list(storage):
+    now = datetime.utcnow().replace(microsecond=0)
+    await storage.jobs.enqueue(_job("j", now))
+    assert not await storage.jobs.requeue("j", now)  # still queued
+    await storage.jobs.claim("default", "w", now, now + timedelta(seconds=5))
+    await storage.jobs.finish("j", "w", {"status": "dead", "last_error": "boom"})
+    assert [doc["_id"] for doc in await storage.jobs.list(status="dead")] == ["j"]
+
+    assert await storage.jobs.requeue("j", now)
+    job = (await storage.jobs.list(queue="default"))[0]
+    assert job["status"] == "queued" and job["attempts"] == 0
+
+
+# ----------------------------
+# State
+# ----------------------------
+async def test_state_records(storage):
+    assert await storage.state.get("live-feed") is None
+    await storage.state.save("live-feed", {"resume_token": {"_data": "8001"}, "saved_at": 1.5})
+    await storage.state.save("live-feed", {"resume_token": {"_data": "8002"}, "saved_at": 2.5})
+    assert await storage.state.get("live-feed") == {"_id": "live-feed", "resume_token": {"_data": "8002"}, "saved_at": 2.5}
+
+
+# ----------------------------
+# Migrations
+# ----------------------------
+async def test_migration_records(storage):
+    await storage.migrations.save({"_id": "1", "name": "first", "status": "running"})
+    await storage.migrations.save({"_id": "1", "name": "first", "status": "applied"})
+    assert [(doc["_id"], doc["status"]) for doc in await storage.migrations.list()] == [("1", "applied")]
+
+
+async def test_migration_scan_and_bulk_update(storage):
+    created = [await storage.reviews.create({"name": f"r{i}", "message": f"m{i}", "created_at": T0}) for i in range(5)]
+
+    seen, after_id = [], None
+    while True:
+        batch = await storage.migrations.scan("reviews", after_id, 2)
+        seen.extend(batch)
+        if len(batch) < 2:
+            break
+        after_id = str(batch[-1]["_id"])
+    assert ids(seen) == ids(created)
+
+    changes = [(doc["_id"], {"comment": doc["message"]}, ["message"]) for doc in seen[:3]]
+    assert await storage.migrations.bulk_update("reviews", changes) == 3
+    assert await storage.migrations.bulk_update("reviews", []) == 0
+
+    migrated = await storage.reviews.get(str(created[0]["_id"]))
+    assert migrated["comment"] == "m0" and "message" not in migrated
+    assert "message" in await storage.reviews.get(str(created[4]["_id"]))
@@ -0,0 +1,72 @@
+# tests/test_upload_gc.py
+"""Ownership tracking and the sweep, on SQLite and a temporary UPLOAD_DIR"""
+import os
+
+import pytest
+
+from backend.config import settings
+from backend.upload_gc import portfolio_owner, run_once, track_uploads, upload_paths
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "GC_BATCH_PAUSE_SECONDS", 0)
+    for name in ("frontend.png", "Screenshot (1).png", "Screenshot (1).png.gz", "old.jpg", "snapshots/home.json"):
+        path = tmp_path / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(b"x" * 10)
+    return tmp_path
+
+
+@pytest.fixture
+async def sqlite():
+    from backend.storage.sqlite import SQLiteStorage
+
+    storage = SQLiteStorage(":memory:")
+    await storage.open()
+    yield storage
+    await storage.close()
+
+
+def test_upload_paths(uploads):
+    doc = {
+        "image": "https://api.example.com/uploads/Screenshot (1).png?v=2",
+        "link": "/uploads/old.jpg",
+        "description": 'See <img src="/uploads/old.jpg"> and /uploads/missing.png, /uploads/../secret, /uploads/snapshots/home.json',
+    }
+    assert upload_paths(doc) == ["Screenshot (1).png", "old.jpg"]
+    assert upload_paths({"image": "data:image/png;base64,AAAA", "link": "/uploads/Screenshot%20(1).png"}) == [
+        "Screenshot (1).png"
+    ]
+
+
+async def test_only_released_uploads_are_swept(uploads, sqlite):
+    await track_uploads(sqlite, portfolio_owner("a"), {"image": "/uploads/Screenshot%20(1).png"})
+    await track_uploads(sqlite, portfolio_owner("b"), {"link": "/uploads/old.jpg"})
+
+    # Item a is deleted, item b swaps its link for an external one
+    await track_uploads(sqlite, portfolio_owner("a"))
+    await track_uploads(sqlite, portfolio_owner("b"), {"link": "https://example.com"})
+
+    # Still within the grace period
+    assert (await run_once(sqlite, grace_hours=1))["deleted"] == 0
+
+    dry = await run_once(sqlite, grace_hours=0, dry_run=True)
+    assert dry == {"released": 2, "deleted": 2, "bytes_reclaimed": 30}  # the .gz sidecar included
+    assert os.path.exists(uploads / "old.jpg")
+
+    assert await run_once(sqlite, grace_hours=0, batch_size=1) == {"released": 2, "deleted": 2, "bytes_reclaimed": 30}
+    assert sorted(p.name for p in uploads.rglob("*") if p.is_file()) == ["frontend.png", "home.json"]
+    assert (await run_once(sqlite, grace_hours=0))["released"] == 0
+
+
+async def test_attached_again_is_kept(uploads, sqlite):
+    await track_uploads(sqlite, portfolio_owner("a"), {"link": "/uploads/old.jpg"})
+    await track_uploads(sqlite, portfolio_owner("a"))
+    await track_uploads(sqlite, portfolio_owner("b"), {"description": "now at /uploads/old.jpg"})
+
+    assert (await run_once(sqlite, grace_hours=0))["deleted"] == 0
+    assert os.path.exists(uploads / "old.jpg")